@@ -0,0 +1,274 @@
+"""
+Async counterparts of the GraphQL views for ASGI deployments.
+
+Requires Django 3.1+ for native async view support, `as_view` returns a coroutine function
+so Django serves the views asynchronously.
+"""
+import asyncio
+from functools import update_wrapper
+from inspect import isawaitable
+from typing import cast
+
+import django
+
+from ariadne.exceptions import HttpBadRequestError
+from ariadne.format_error import format_error
+from ariadne.types import GraphQLResult
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpRequest, HttpResponseBadRequest
+from django.utils.decorators import classonlymethod, method_decorator
+from django.views.decorators.csrf import csrf_exempt
+from graphql import GraphQLSchema
+
+from .context import get_request_context, share_request_context
+from .graphql import graphql
+from .metrics import BATCH, measure, record_response, record_saved_executions
+from .slow_operations import SlowOperationExtension, profile
+from .tracing import SampledApolloTracingExtension
+from .views import BaseGraphQLView, BatchGraphQLView, HttpError, get_operation_name
+
+
+class AsyncViewMixin:
+    """
+    Marks the view function as a coroutine function, Django only detects async handlers of
+    class based views from 4.1.
+    """
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        if django.VERSION < (3, 1):
+            raise ImproperlyConfigured("%s requires Django 3.1 or later." % cls.__name__)
+        view = super().as_view(**initkwargs)
+
+        async def async_view(request, *args, **kwargs):
+            # responses of sync handlers, such as `http_method_not_allowed`, aren't awaitable
+            response = view(request, *args, **kwargs)
+            if isawaitable(response):
+                response = await response
+            return response
+
+        # keeps `view_class`, `view_initkwargs` and `csrf_exempt`
+        update_wrapper(async_view, view)
+        return async_view
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncBaseGraphQLView(AsyncViewMixin, BaseGraphQLView):
+    """
+    GraphQL view executing queries with graphql-core's async executor, resolvers may
+    return awaitables, see `Resolver.as_async_resolver`.
+    """
+
+    extensions = [SampledApolloTracingExtension]
+    slow_operation_extension = SlowOperationExtension
+
+    async def get(self, request: HttpRequest, *args, **kwargs):
+        if not self.is_query_request(request):
+            # Rendering the playground may touch the session or the database
+            return await sync_to_async(super(BaseGraphQLView, self).get)(request, *args, **kwargs)
+
+        try:
+            data = self.extract_data_from_query_params(request)
+        except HttpBadRequestError as error:
+            return HttpResponseBadRequest(error.message)
+
+        not_allowed = await sync_to_async(self.check_query_operation)(data)
+        if not_allowed is not None:
+            return not_allowed
+
+        success, result = await self.execute_query(request, data)
+        return self.render_query_result(request, success, result, get_operation_name(data))
+
+    async def post(self, request: HttpRequest, *args, **kwargs):
+        if not self.schema:
+            raise ValueError("GraphQLView was initialized without schema.")
+
+        try:
+            data = self.extract_data_from_request(request)
+        except HttpBadRequestError as error:
+            return HttpResponseBadRequest(error.message)
+
+        success, result = await self.execute_query(request, data)
+        return self.render_query_result(request, success, result, get_operation_name(data))
+
+    async def execute_query(self, request: HttpRequest, data: dict) -> GraphQLResult:
+        if callable(self.context_value):
+            context_value = self.context_value(request)  # pylint: disable=not-callable
+            share_request_context(context_value, request)
+        else:
+            context_value = self.context_value or request
+
+        # queries run on other threads through `sync_to_async`, they can't be counted here
+        operation = data if isinstance(data, dict) else {}
+        with measure(
+            self.metrics, get_operation_name(data), track_db=False
+        ) as measurement, profile(
+            self.slow_operation_log,
+            operation.get("query"),
+            operation.get("variables"),
+            operation.get("operationName"),
+            track_db=False,
+        ):
+            success, result = await graphql(
+                cast(GraphQLSchema, self.schema),
+                data,
+                context_value=context_value,
+                root_value=self.root_value,
+                validation_rules=self.validation_rules,
+                debug=settings.DEBUG,
+                logger=self.logger,
+                error_formatter=self.error_formatter or format_error,
+                extensions=self.get_extensions(),
+                middleware=self.middleware,
+                document_cache=self.document_cache,
+                persisted_query_store=self.persisted_query_store,
+                response_cache=self.response_cache,
+                cache_control=self.cache_control,
+            )
+            measurement.failed = not success or bool(result.get("errors"))
+        return success, result
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncBatchGraphQLView(AsyncViewMixin, BatchGraphQLView):
+    """
+    Batch GraphQL view executing each entry with graphql-core's async executor, batch entries
+    are run concurrently on the event loop.
+
+    Entries parsed with `incremental_parsing` are all decoded before executing the batch,
+    `stream_batch` isn't supported.
+    """
+
+    extensions = [SampledApolloTracingExtension]
+    slow_operation_extension = SlowOperationExtension
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        if initkwargs.get("stream_batch", cls.stream_batch):
+            raise ImproperlyConfigured("%s doesn't support stream_batch." % cls.__name__)
+        return super().as_view(**initkwargs)
+
+    async def dispatch(self, request, *args, **kwargs):
+        # Resolve the lazy user outside of the event loop before `LoginRequiredMixin` checks it
+        await sync_to_async(lambda: request.user.is_authenticated)()
+        response = super().dispatch(request, *args, **kwargs)
+        if isawaitable(response):
+            response = await response
+        return response
+
+    async def get(self, request: HttpRequest, *args, **kwargs):
+        return await self.handle_query(request, *args, **kwargs)
+
+    async def post(self, request: HttpRequest, *args, **kwargs):
+        return await self.handle_query(request, *args, **kwargs)
+
+    async def handle_query(self, request, *args, **kwargs):
+        if not self.schema:
+            raise ValueError("GraphQLView was initialized without schema.")
+        try:
+            self.check_body_size(request)
+            data = self.extract_data_from_request(request)
+
+            if self.batch:
+                responses = await self.get_batch_responses(request, data)
+            else:
+                responses = await self.get_response(request, data)
+
+            response = self.render_responses(request, responses)
+            record_response(
+                self.metrics, BATCH if self.batch else get_operation_name(data), response
+            )
+            return response
+
+        except HttpError as e:
+            return self.render_http_error(request, e)
+
+    async def get_batch_responses(self, request, data):
+        # entries decoded incrementally, invalid ones fail the batch before it is executed
+        data = list(data)
+        entries, duplicates = self.deduplicate_entries(request, data)
+        record_saved_executions(self.metrics, self.saved_executions)
+        if self.has_mutations(request, entries):
+            # mutations run in order, entries after one must see its changes
+            results = [await self.get_response(request, entry) for _, entry in entries]
+        else:
+            results = await asyncio.gather(
+                *[self.get_response(request, entry) for _, entry in entries]
+            )
+
+        responses = [None] * len(data)
+        for (index, _), response in zip(entries, results):
+            responses[index] = response
+            for duplicate in duplicates.get(index, ()):
+                responses[duplicate] = self.copy_response(response, data[duplicate])
+        return responses
+
+    def deduplicate_entries(self, request, data):
+        """
+        Return the `(index, entry)` pairs to execute and a mapping of executed indexes to the
+        indexes of their duplicates, `saved_executions` counts the skipped entries.
+        """
+        self.saved_executions = 0
+        if not self.deduplicate_batch:
+            return list(enumerate(data)), {}
+
+        entries, duplicates, seen = [], {}, {}
+        for index, entry in enumerate(data):
+            key = self.get_deduplication_key(request, entry)
+            if key is not None and key in seen:
+                duplicates.setdefault(seen[key], []).append(index)
+                self.saved_executions += 1
+                continue
+            if key is not None:
+                seen[key] = index
+            entries.append((index, entry))
+        return entries, duplicates
+
+    def has_mutations(self, request, entries):
+        return any(self.is_mutation_entry(request, entry) for _, entry in entries)
+
+    async def get_response(self, request, data):
+        params = self.get_graphql_params(request, data)
+        if request.method == "GET":
+            # may look the persisted query up in the cache
+            await sync_to_async(self.check_query_operation)(request, params)
+
+        request_context = get_request_context(request)
+        with measure(self.metrics, params["operation_name"], track_db=False) as measurement:
+            with request_context.time_operation(params["id"], params["operation_name"]), profile(
+                self.slow_operation_log,
+                params["query"],
+                params["variables"],
+                params["operation_name"],
+                track_db=False,
+            ):
+                execution_result_passed, execution_result = await self.execute_graphql_request(
+                    request, params
+                )
+            measurement.failed = not execution_result_passed or bool(
+                execution_result.get("errors")
+            )
+        if not self.is_query(params):
+            request_context.clear()
+
+        return self.build_response(request, params, execution_result_passed, execution_result)
+
+    async def execute_graphql_request(self, request, data):
+        return await graphql(
+            cast(GraphQLSchema, self.schema),
+            self.get_execution_data(data),
+            context_value=self.get_context_value(request),
+            root_value=self.root_value,
+            debug=settings.DEBUG,
+            logger=self.logger,
+            validation_rules=self.validation_rules,
+            error_formatter=self.error_formatter or format_error,
+            extensions=self.get_extensions(),
+            middleware=self.middleware,
+            document_cache=self.document_cache,
+            persisted_query_store=self.persisted_query_store,
+            response_cache=self.response_cache,
+            cache_control=self.cache_control,
+        )
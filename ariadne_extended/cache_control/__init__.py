@@ -0,0 +1,8 @@
+from .policy import (
+    CacheControl,
+    CacheHints,
+    CachePolicy,
+    add_version_token,
+    get_cache_hints,
+    set_cache_hint,
+)
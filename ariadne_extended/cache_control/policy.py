@@ -0,0 +1,274 @@
+"""
+HTTP caching of query responses.
+
+The cache policy of an operation is the lowest `maxAge` hinted by the fields it selects, with
+the `@cacheControl` directive or from resolvers with `set_cache_hint`. It is sent as the
+`Cache-Control` header, and responses to GET requests get an `ETag` so clients sending
+`If-None-Match` receive a 304 when the result didn't change.
+"""
+import hashlib
+import json
+from collections import OrderedDict, namedtuple
+from threading import Lock
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from graphql.execution.values import get_directive_values
+from graphql.language import (
+    FieldNode,
+    FragmentSpreadNode,
+    InlineFragmentNode,
+    OperationDefinitionNode,
+    OperationType,
+)
+from graphql.type import get_named_type, is_composite_type
+
+from ..context import find_request_context
+
+PUBLIC = "PUBLIC"
+PRIVATE = "PRIVATE"
+
+# `max_age` is `None` when no field restricted it
+CachePolicy = namedtuple("CachePolicy", ["max_age", "scope"])
+
+
+class CacheHints:
+    """
+    Cache policy and version tokens collected while executing the operations of a request,
+    batch entries executed on several threads share the same hints.
+    """
+
+    def __init__(self):
+        self.max_age = None
+        self.scope = PUBLIC
+        self.version_tokens = []
+        self._lock = Lock()
+
+    def restrict(self, max_age=None, scope=None):
+        with self._lock:
+            if max_age is not None and (self.max_age is None or max_age < self.max_age):
+                self.max_age = max_age
+            if scope == PRIVATE:
+                self.scope = PRIVATE
+
+    def add_version_token(self, token):
+        with self._lock:
+            self.version_tokens.append(str(token))
+
+    def get_policy(self):
+        return CachePolicy(self.max_age, self.scope)
+
+
+def get_cache_hints(context):
+    """
+    Return the `CacheHints` of the request of a context value, `None` when there is no
+    request to cache the response of, eg. a dict context value without `request`.
+    """
+    request_context = find_request_context(context)
+    if request_context is None:
+        return None
+    with request_context._lock:
+        if request_context.cache_hints is None:
+            request_context.cache_hints = CacheHints()
+        return request_context.cache_hints
+
+
+def set_cache_hint(info, max_age=None, scope=None):
+    """
+    Restrict the cache policy of the response from a resolver, eg. for values computed at
+    runtime whose freshness isn't known from the schema.
+    """
+    hints = get_cache_hints(info.context)
+    if hints is not None:
+        hints.restrict(max_age, scope)
+
+
+def add_version_token(info, token):
+    """
+    Add a cheap version of the data being resolved, such as an `updated_at` timestamp.
+
+    When tokens are provided the ETag is derived from them instead of the serialized response,
+    so a 304 is returned without encoding the result. Every resolver contributing data to the
+    response must then add a token, or changes to its data would not change the ETag.
+    """
+    hints = get_cache_hints(info.context)
+    if hints is not None:
+        hints.add_version_token(token)
+
+
+class CacheControl:
+    """
+    Computes the cache policy of operations and sets the caching headers of responses, set it
+    as the `cache_control` attribute of a view to enable it.
+
+    Root fields, and fields returning object types, without a hint have a `maxAge` of
+    `default_max_age`. Mutations, and responses with errors, are never cached.
+    """
+
+    def __init__(self, default_max_age=0, etags=True, maxsize=1000):
+        self.default_max_age = default_max_age
+        self.etags = etags
+        self.maxsize = maxsize
+        self._policies = OrderedDict()
+        self._lock = Lock()
+
+    def hint_document(self, schema, document, operation_name=None, context_value=None):
+        """
+        Restrict the hints of the request with the static policy of the executed operation.
+        """
+        hints = get_cache_hints(context_value)
+        if hints is None:
+            return
+        policy = self.get_policy(schema, document, operation_name)
+        hints.restrict(policy.max_age, policy.scope)
+
+    def get_policy(self, schema, document, operation_name=None):
+        query = document.loc.source.body if document.loc else None
+        key = (schema, query, operation_name)
+        if query is not None and self.maxsize:
+            with self._lock:
+                policy = self._policies.get(key)
+                if policy is not None:
+                    self._policies.move_to_end(key)
+                    return policy
+
+        policy = self.analyze(schema, document, operation_name)
+
+        if query is not None and self.maxsize:
+            with self._lock:
+                self._policies[key] = policy
+                while len(self._policies) > self.maxsize:
+                    self._policies.popitem(last=False)
+        return policy
+
+    def analyze(self, schema, document, operation_name=None):
+        operations = [d for d in document.definitions if isinstance(d, OperationDefinitionNode)]
+        if operation_name:
+            operations = [o for o in operations if o.name and o.name.value == operation_name]
+        if len(operations) != 1 or operations[0].operation != OperationType.QUERY:
+            return CachePolicy(0, PUBLIC)
+
+        fragments = {
+            definition.name.value: definition
+            for definition in document.definitions
+            if not isinstance(definition, OperationDefinitionNode)
+        }
+        hints = CacheHints()
+        self.hint_selection_set(
+            schema, fragments, hints, schema.query_type, operations[0].selection_set, True
+        )
+        return hints.get_policy()
+
+    def hint_selection_set(
+        self, schema, fragments, hints, parent_type, selection_set, root, visited=()
+    ):
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                self.hint_field(schema, fragments, hints, parent_type, selection, root)
+            elif isinstance(selection, InlineFragmentNode):
+                fragment_type = parent_type
+                if selection.type_condition:
+                    fragment_type = schema.get_type(selection.type_condition.name.value)
+                self.hint_selection_set(
+                    schema, fragments, hints, fragment_type, selection.selection_set, root, visited
+                )
+            elif isinstance(selection, FragmentSpreadNode):
+                name = selection.name.value
+                fragment = fragments.get(name)
+                if fragment is None or name in visited:
+                    continue
+                fragment_type = schema.get_type(fragment.type_condition.name.value)
+                self.hint_selection_set(
+                    schema,
+                    fragments,
+                    hints,
+                    fragment_type,
+                    fragment.selection_set,
+                    root,
+                    visited + (name,),
+                )
+
+    def hint_field(self, schema, fragments, hints, parent_type, node, root):
+        fields = getattr(parent_type, "fields", None) or {}
+        field_def = fields.get(node.name.value)
+        if field_def is None:
+            return
+
+        named_type = get_named_type(field_def.type)
+        max_age, scope, inherit = self.get_hint(schema, named_type)
+        field_max_age, field_scope, field_inherit = self.get_hint(schema, field_def)
+        if field_max_age is not None or field_inherit:
+            max_age, inherit = field_max_age, field_inherit
+        scope = field_scope or scope
+
+        if max_age is None and not inherit and (root or is_composite_type(named_type)):
+            max_age = self.default_max_age
+        hints.restrict(max_age, scope)
+
+        if node.selection_set:
+            self.hint_selection_set(
+                schema, fragments, hints, named_type, node.selection_set, False
+            )
+
+    @staticmethod
+    def get_hint(schema, definition):
+        """
+        Return the `(max_age, scope, inherit_max_age)` hinted by the directive of a field or
+        type definition.
+        """
+        directive = schema.get_directive("cacheControl")
+        ast_node = getattr(definition, "ast_node", None)
+        if directive is None or ast_node is None:
+            return None, None, False
+        values = get_directive_values(directive, ast_node) or {}
+        return values.get("maxAge"), values.get("scope"), bool(values.get("inheritMaxAge"))
+
+    def get_version_etag(self, request, hints):
+        if not hints.version_tokens:
+            return None
+        user = getattr(request, "user", None)
+        key = json.dumps(
+            [request.get_full_path(), getattr(user, "pk", None), sorted(hints.version_tokens)],
+            default=str,
+        )
+        return quote_etag(hashlib.sha1(key.encode("utf-8")).hexdigest())
+
+    @staticmethod
+    def get_content_etag(content):
+        return quote_etag(hashlib.sha1(content).hexdigest())
+
+    def patch_response(self, request, render, cacheable=True):
+        """
+        Return the response built by `render`, or a 304 when the client already has it, with
+        its caching headers set.
+        """
+        if not cacheable:
+            return render()
+
+        hints = get_cache_hints(request)
+        conditional = self.etags and request.method in ("GET", "HEAD")
+        etag = self.get_version_etag(request, hints) if conditional else None
+        response = None
+        if conditional and etag is None:
+            response = render()
+            etag = self.get_content_etag(response.content)
+        if conditional:
+            response = get_conditional_response(request, etag=etag, response=response)
+        if response is None:
+            response = render()
+
+        if etag is not None:
+            response["ETag"] = etag
+        self.patch_cache_headers(response, hints.get_policy())
+        return response
+
+    @staticmethod
+    def patch_cache_headers(response, policy):
+        private = policy.scope == PRIVATE
+        if policy.max_age:
+            directives = {"private": True} if private else {"public": True}
+            patch_cache_control(response, max_age=policy.max_age, **directives)
+        elif private:
+            patch_cache_control(response, no_cache=True, private=True)
+        else:
+            patch_cache_control(response, no_cache=True)
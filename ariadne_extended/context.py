@@ -0,0 +1,132 @@
+"""
+State shared by every operation executed for the same HTTP request.
+
+The context value of a request is built once and shared by all the entries of a batch, along
+with a `RequestContext` holding caches, loaders and timings so entries hitting the same
+objects only pay for them once. Mutations clear the caches and loaders once they ran, later
+entries never see data cached before the mutation.
+"""
+from threading import Lock, RLock
+from time import perf_counter
+
+
+def get_request(context):
+    """
+    Return the request of a context value, the context value is usually the request itself.
+    """
+    if isinstance(context, dict):
+        return context.get("request", context)
+    return getattr(context, "request", context)
+
+
+class RequestContext:
+    def __init__(self):
+        self.caches = {}
+        self.loaders = {}
+        # `{"id", "operationName", "duration"}` of each executed operation
+        self.timings = []
+        # `cache_control.CacheHints` of the response, kept when the caches are cleared
+        self.cache_hints = None
+        self._context_value = None
+        self._has_context_value = False
+        self._context_lock = Lock()
+        self._lock = RLock()
+
+    def get_context_value(self, factory):
+        """
+        Return the context value, built by `factory` the first time it is needed.
+        """
+        with self._context_lock:
+            if not self._has_context_value:
+                self._context_value = factory()
+                self._has_context_value = True
+            return self._context_value
+
+    def get_cache(self, namespace):
+        """
+        Return the dict used as cache for `namespace`, eg. objects loaded by primary key.
+        """
+        with self._lock:
+            return self.caches.setdefault(namespace, {})
+
+    def get_loader(self, key, factory):
+        """
+        Return the loader registered for `key`, created by `factory` when missing.
+        """
+        with self._lock:
+            loader = self.loaders.get(key)
+            if loader is None:
+                loader = self.loaders[key] = factory()
+            return loader
+
+    def clear(self):
+        """
+        Drop the caches and loaders, called once a mutation changed the data they hold.
+        """
+        with self._lock:
+            self.caches = {}
+            self.loaders = {}
+
+    def time_operation(self, id=None, operation_name=None):
+        return OperationTimer(self, id, operation_name)
+
+
+class OperationTimer:
+    def __init__(self, request_context, id=None, operation_name=None):
+        self.request_context = request_context
+        self.timing = {"id": id, "operationName": operation_name, "duration": None}
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self.timing
+
+    def __exit__(self, *exc_info):
+        self.timing["duration"] = perf_counter() - self.start
+        with self.request_context._lock:
+            self.request_context.timings.append(self.timing)
+
+
+_attach_lock = Lock()
+
+
+def get_request_context(context):
+    """
+    Return the `RequestContext` of a request, or of the request of a context value.
+    """
+    request = get_request(context)
+    request_context = getattr(request, "_graphql_request_context", None)
+    if request_context is None:
+        with _attach_lock:
+            request_context = getattr(request, "_graphql_request_context", None)
+            if request_context is None:
+                request_context = RequestContext()
+                setattr(request, "_graphql_request_context", request_context)
+    return request_context
+
+
+def find_request_context(context):
+    """
+    Return the `RequestContext` of a context value, `None` when there is no request able to
+    hold it, eg. a dict context value without `request`.
+    """
+    try:
+        return get_request_context(context)
+    except AttributeError:
+        return None
+
+
+def share_request_context(context_value, request):
+    """
+    Attach the `RequestContext` of `request` to a context value built for the request
+    without a `request` of its own, so the state recorded by resolvers, such as cache hints,
+    reaches the view.
+    """
+    request_context = get_request_context(request)
+    holder = get_request(context_value)
+    if holder is not request and getattr(holder, "_graphql_request_context", None) is None:
+        try:
+            setattr(holder, "_graphql_request_context", request_context)
+        except AttributeError:
+            # such as a dict context value, without a request to hold the state
+            pass
+    return context_value
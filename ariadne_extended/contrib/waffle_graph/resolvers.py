@@ -1,4 +1,5 @@
 from ariadne_extended.resolvers import ListModelResolver, Resolver
+from ariadne_extended.response_cache import track_model_access
 from waffle import get_waffle_flag_model
 from waffle.models import Sample, Switch
 from waffle.utils import get_setting
@@ -9,6 +10,7 @@ from .types import query, waffle_item_interface, waffle_type
 class WaffleResolver(ListModelResolver):
     def get_queryset(self):
         # Not a true QS, will ask cache for saved model objects
+        track_model_access(self.model)
         return self.model.get_all()
 
 
@@ -26,6 +28,8 @@ class SampleResolver(WaffleResolver):
 
 class AllWaffleTypesResolver(Resolver):
     def list(self, *args, **kwargs):
+        for model in (Switch, Sample, get_waffle_flag_model()):
+            track_model_access(model)
         return Switch.get_all() + Sample.get_all() + get_waffle_flag_model().get_all()
 
 
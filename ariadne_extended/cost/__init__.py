@@ -0,0 +1,7 @@
+from .validation import (
+    CostLimitExceeded,
+    DepthLimitExceeded,
+    QueryCost,
+    QueryCostValidator,
+    cost_validator,
+)
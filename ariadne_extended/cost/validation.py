@@ -0,0 +1,336 @@
+"""
+Static query cost analysis.
+
+Field costs are declared in the schema with the `@cost` directive or with a `cost_map`, list
+multipliers come from pagination arguments such as `first` and `last`.
+"""
+from collections import OrderedDict, namedtuple
+from threading import Lock
+
+from graphql import GraphQLError
+from graphql.execution.values import get_directive_values
+from graphql.language import (
+    FieldNode,
+    FragmentSpreadNode,
+    InlineFragmentNode,
+    IntValueNode,
+    OperationDefinitionNode,
+    OperationType,
+    VariableNode,
+)
+from graphql.type import (
+    GraphQLList,
+    get_named_type,
+    get_nullable_type,
+    is_composite_type,
+)
+from graphql.utilities import value_from_ast
+from graphql.validation import ValidationRule
+
+QueryCost = namedtuple("QueryCost", ["cost", "depth"])
+
+
+class CostLimitExceeded(GraphQLError):
+    def __init__(self, maximum_cost, cost):
+        super().__init__(
+            "The query exceeds the maximum cost of %d. Actual cost is %d" % (maximum_cost, cost),
+            extensions={"code": "COST_LIMIT_EXCEEDED", "cost": cost, "maximumCost": maximum_cost},
+        )
+
+
+class DepthLimitExceeded(GraphQLError):
+    def __init__(self, maximum_depth, depth):
+        super().__init__(
+            "The query exceeds the maximum depth of %d. Actual depth is %d"
+            % (maximum_depth, depth),
+            extensions={
+                "code": "DEPTH_LIMIT_EXCEEDED",
+                "depth": depth,
+                "maximumDepth": maximum_depth,
+            },
+        )
+
+
+class _Analysis:
+    """
+    State of a single document walk.
+    """
+
+    def __init__(self, schema, fragments, variables, variable_definitions):
+        self.schema = schema
+        self.fragments = fragments
+        self.variables = variables
+        self.variable_definitions = variable_definitions
+        # Variables that changed the cost, they make up the cache key of the estimate
+        self.used_variables = set()
+
+
+class QueryCostValidator:
+    """
+    Estimates the cost and depth of operations and rejects the ones exceeding the configured
+    maximums.
+
+    Instances can be added to a view's `validation_rules`, they are called with the schema,
+    document and operation data of each request once the document passed the static rules.
+    Estimates are cached per document and values of the variables used as multipliers, so
+    hot operations skip the analysis.
+
+    `cost_map` declares field costs without the `@cost` directive, eg.
+    `{"Query": {"things": {"complexity": 2, "multipliers": ["first", "last"]}}}`
+    """
+
+    def __init__(
+        self,
+        maximum_cost=None,
+        maximum_depth=None,
+        default_cost=0,
+        default_complexity=1,
+        default_list_size=1,
+        multipliers=("first", "last"),
+        cost_map=None,
+        maxsize=1000,
+        max_shapes=64,
+    ):
+        self.maximum_cost = maximum_cost
+        self.maximum_depth = maximum_depth
+        # cost of leaf fields and of fields returning objects
+        self.default_cost = default_cost
+        self.default_complexity = default_complexity
+        # multiplier of lists without a multiplier argument value
+        self.default_list_size = default_list_size
+        self.multipliers = tuple(multipliers)
+        self.cost_map = cost_map or {}
+        self.maxsize = maxsize
+        # distinct variable values cached per document
+        self.max_shapes = max_shapes
+        self._estimates = OrderedDict()
+        # `{(schema, type name, field name): complexity}`, see `get_field_complexity`
+        self._complexities = {}
+        self._lock = Lock()
+
+    def __call__(self, schema, document, data, context_value=None):
+        data = data if isinstance(data, dict) else {}
+        query_cost = self.estimate(
+            schema, document, data.get("variables"), data.get("operationName")
+        )
+        return self.get_errors(query_cost)
+
+    def get_errors(self, query_cost):
+        errors = []
+        if self.maximum_depth is not None and query_cost.depth > self.maximum_depth:
+            errors.append(DepthLimitExceeded(self.maximum_depth, query_cost.depth))
+        if self.maximum_cost is not None and query_cost.cost > self.maximum_cost:
+            errors.append(CostLimitExceeded(self.maximum_cost, query_cost.cost))
+        return errors
+
+    def get_validation_rule(self, variables=None, operation_name=None):
+        """
+        Return a validation rule class checking the cost of documents, for use with executors
+        that only accept validation rule classes.
+        """
+        validator = self
+
+        class QueryCostRule(ValidationRule):
+            def enter_document(self, node, *_args):
+                query_cost = validator.estimate(
+                    self.context.schema, node, variables, operation_name
+                )
+                for error in validator.get_errors(query_cost):
+                    self.report_error(error)
+                return self.BREAK
+
+        return QueryCostRule
+
+    def get_cache_key(self, schema, document, operation_name):
+        query = document.loc.source.body if document.loc else None
+        return (schema, query, operation_name)
+
+    def estimate(self, schema, document, variables=None, operation_name=None):
+        """
+        Return the `QueryCost` of the selected operation of a document.
+        """
+        variables = variables or {}
+        key = self.get_cache_key(schema, document, operation_name)
+        cacheable = key[1] is not None and self.maxsize
+        if cacheable:
+            with self._lock:
+                entry = self._estimates.get(key)
+                if entry is not None:
+                    self._estimates.move_to_end(key)
+                    used_variables, estimates = entry
+                    shape = self.get_variables_shape(used_variables, variables)
+                    if shape in estimates:
+                        return estimates[shape]
+
+        analysis = self.analyze(schema, document, variables, operation_name)
+        query_cost, used_variables = analysis
+
+        if cacheable:
+            shape = self.get_variables_shape(used_variables, variables)
+            with self._lock:
+                entry = self._estimates.setdefault(key, (used_variables, {}))
+                if len(entry[1]) >= self.max_shapes:
+                    entry[1].clear()
+                entry[1][shape] = query_cost
+                self._estimates.move_to_end(key)
+                while len(self._estimates) > self.maxsize:
+                    self._estimates.popitem(last=False)
+
+        return query_cost
+
+    @staticmethod
+    def get_variables_shape(used_variables, variables):
+        return tuple(repr(variables.get(name)) for name in sorted(used_variables))
+
+    def analyze(self, schema, document, variables, operation_name=None):
+        """
+        Walk the operation, returns the `QueryCost` and the names of the variables used.
+        """
+        if schema is None:
+            raise ValueError("A schema is required to analyze the query cost.")
+        operations = [d for d in document.definitions if isinstance(d, OperationDefinitionNode)]
+        if operation_name:
+            operations = [o for o in operations if o.name and o.name.value == operation_name]
+        if len(operations) != 1:
+            # Ambiguous or unknown operations are reported by the executor
+            return QueryCost(0, 0), frozenset()
+        operation = operations[0]
+
+        fragments = {
+            definition.name.value: definition
+            for definition in document.definitions
+            if not isinstance(definition, OperationDefinitionNode)
+        }
+        variable_definitions = {
+            definition.variable.name.value: definition
+            for definition in operation.variable_definitions or ()
+        }
+        root_type = {
+            OperationType.QUERY: schema.query_type,
+            OperationType.MUTATION: schema.mutation_type,
+            OperationType.SUBSCRIPTION: schema.subscription_type,
+        }[operation.operation]
+        analysis = _Analysis(schema, fragments, variables, variable_definitions)
+        cost, depth = self.selection_set_cost(analysis, root_type, operation.selection_set, 0)
+        return QueryCost(cost, depth), frozenset(analysis.used_variables)
+
+    def selection_set_cost(self, analysis, parent_type, selection_set, depth, visited=()):
+        cost = 0
+        max_depth = depth
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                field_cost, field_depth = self.field_cost(analysis, parent_type, selection, depth)
+            elif isinstance(selection, InlineFragmentNode):
+                fragment_type = parent_type
+                if selection.type_condition:
+                    fragment_type = analysis.schema.get_type(selection.type_condition.name.value)
+                field_cost, field_depth = self.selection_set_cost(
+                    analysis, fragment_type, selection.selection_set, depth, visited
+                )
+            elif isinstance(selection, FragmentSpreadNode):
+                name = selection.name.value
+                fragment = analysis.fragments.get(name)
+                if fragment is None or name in visited:
+                    continue
+                fragment_type = analysis.schema.get_type(fragment.type_condition.name.value)
+                field_cost, field_depth = self.selection_set_cost(
+                    analysis, fragment_type, fragment.selection_set, depth, visited + (name,)
+                )
+            else:
+                continue
+            cost += field_cost
+            max_depth = max(max_depth, field_depth)
+        return cost, max_depth
+
+    def field_cost(self, analysis, parent_type, node, depth):
+        field_name = node.name.value
+        fields = getattr(parent_type, "fields", None) or {}
+        field_def = fields.get(field_name)
+        if field_name.startswith("__") or field_def is None:
+            return 0, depth
+
+        named_type = get_named_type(field_def.type)
+        child_cost, child_depth = 0, depth + 1
+        if node.selection_set:
+            child_cost, child_depth = self.selection_set_cost(
+                analysis, named_type, node.selection_set, depth + 1
+            )
+
+        complexity, multipliers = self.get_field_cost(analysis.schema, parent_type, field_def)
+        if complexity is None:
+            complexity = (
+                self.default_complexity if is_composite_type(named_type) else self.default_cost
+            )
+        multiplier = self.get_multiplier(analysis, field_def, node, multipliers)
+        return (complexity + child_cost) * multiplier, child_depth
+
+    def get_field_cost(self, schema, parent_type, field_def):
+        """
+        Return the declared `(complexity, multipliers)` of a field, `None` when undeclared.
+        """
+        for name, definition in self.cost_map.get(parent_type.name, {}).items():
+            if parent_type.fields.get(name) is field_def:
+                return definition.get("complexity"), definition.get("multipliers")
+
+        directive = schema.get_directive("cost")
+        if directive is not None and field_def.ast_node is not None:
+            values = get_directive_values(directive, field_def.ast_node) or {}
+            return values.get("complexity"), values.get("multipliers")
+        return None, None
+
+    def get_field_complexity(self, schema, parent_type, field_name):
+        """
+        Return the cost of resolving a field once, for each object when it returns a list.
+        """
+        key = (schema, parent_type.name, field_name)
+        complexity = self._complexities.get(key)
+        if complexity is None:
+            field_def = (getattr(parent_type, "fields", None) or {}).get(field_name)
+            if field_def is None:
+                complexity = 0
+            else:
+                complexity, _ = self.get_field_cost(schema, parent_type, field_def)
+            if complexity is None:
+                complexity = (
+                    self.default_complexity
+                    if is_composite_type(get_named_type(field_def.type))
+                    else self.default_cost
+                )
+            self._complexities[key] = complexity
+        return complexity
+
+    def get_multiplier(self, analysis, field_def, node, multipliers=None):
+        if multipliers is None:
+            multipliers = [name for name in self.multipliers if name in field_def.args]
+
+        values = []
+        arguments = {argument.name.value: argument.value for argument in node.arguments or ()}
+        for name in multipliers:
+            value = None
+            value_node = arguments.get(name)
+            if isinstance(value_node, IntValueNode):
+                value = int(value_node.value)
+            elif isinstance(value_node, VariableNode):
+                variable_name = value_node.name.value
+                analysis.used_variables.add(variable_name)
+                value = analysis.variables.get(variable_name)
+                definition = analysis.variable_definitions.get(variable_name)
+                if value is None and definition is not None and definition.default_value:
+                    value = value_from_ast(definition.default_value, field_def.args[name].type)
+            elif value_node is None and name in field_def.args:
+                value = field_def.args[name].default_value
+            if isinstance(value, int) and not isinstance(value, bool):
+                values.append(value)
+
+        if values:
+            return max(max(values), 0)
+        if multipliers or isinstance(get_nullable_type(field_def.type), GraphQLList):
+            return self.default_list_size
+        return 1
+
+
+def cost_validator(maximum_cost=None, maximum_depth=None, variables=None, **kwargs):
+    """
+    Shortcut returning a validation rule class for the given limits and variables.
+    """
+    return QueryCostValidator(maximum_cost, maximum_depth, **kwargs).get_validation_rule(variables)
@@ -10,6 +10,10 @@ class RelayModelMixin(ListModelMixin):
             return self.ordering
         return ("id",)
 
+    def get_required_fields(self):
+        # cursors are built from the ordering fields of the nodes
+        return tuple(order.lstrip("-") for order in self.get_ordering())
+
     def paginate_queryset(self, queryset, **kwargs):
         kwargs.update(
             dict(
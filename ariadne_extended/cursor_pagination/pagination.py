@@ -56,6 +56,10 @@ class CursorPage(Sequence):
     def __len__(self):
         return len(self.items)
 
+    def __iter__(self):
+        # querysets of unpaginated pages are fetched once, not an item at a time
+        return iter(self.items)
+
     def __getitem__(self, key):
         try:
             return self.items.__getitem__(key)
@@ -0,0 +1,78 @@
+"""
+Bounded LRU cache of parsed and validated GraphQL documents.
+"""
+from collections import OrderedDict, namedtuple
+from threading import Lock
+
+from ariadne.graphql import parse_query, validate_query
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "evictions", "maxsize", "currsize"])
+
+
+class DocumentCache:
+    """
+    Thread safe LRU cache of `(DocumentNode, validation_errors)` keyed on the query text, the
+    schema instance and the custom validation rules used to validate the document.
+
+    Documents are never mutated by execution so a cached document can be shared between
+    requests and threads.
+    """
+
+    def __init__(self, maxsize=1000):
+        self.maxsize = maxsize
+        self._documents = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_key(self, schema, query, validation_rules=None):
+        return (schema, query, tuple(validation_rules or ()))
+
+    def get(self, key):
+        with self._lock:
+            try:
+                entry = self._documents[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._documents.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            self._documents[key] = entry
+            self._documents.move_to_end(key)
+            while len(self._documents) > self.maxsize:
+                self._documents.popitem(last=False)
+                self.evictions += 1
+
+    def parse_and_validate(self, schema, query, validation_rules=None):
+        """
+        Return the parsed document and its validation errors for a query, using the cache
+        when possible. Syntax errors are raised and never cached.
+        """
+        key = self.get_key(schema, query, validation_rules)
+        entry = self.get(key)
+        if entry is None:
+            document = parse_query(query)
+            entry = (document, validate_query(schema, document, validation_rules))
+            if self.maxsize:
+                self.set(key, entry)
+        return entry
+
+    def info(self):
+        with self._lock:
+            return CacheInfo(
+                self.hits, self.misses, self.evictions, self.maxsize, len(self._documents)
+            )
+
+    def clear(self):
+        with self._lock:
+            self._documents.clear()
+            self.hits = self.misses = self.evictions = 0
+
+
+# Shared by all the views unless they are given their own cache
+default_document_cache = DocumentCache()
@@ -0,0 +1,167 @@
+"""
+JSON backends used by the views to decode requests and encode responses.
+
+The backend is picked with the `ARIADNE_EXTENDED_JSON_BACKEND` setting, a dotted path to a
+`JSONBackend` subclass. The standard library is used by default, `OrjsonBackend` is opt-in
+as its output differs for some values (eg. datetime precision, non `str` keys).
+"""
+import json
+import re
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.functional import Promise
+from django.utils.module_loading import import_string
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class JSONBackend:
+    """
+    Encodes and decodes JSON documents, `dumps` may return either `str` or `bytes`.
+    """
+
+    def dumps(self, data, pretty=False):
+        raise NotImplementedError(".dumps() must be overridden.")
+
+    def loads(self, data):
+        raise NotImplementedError(".loads() must be overridden.")
+
+    def iter_array(self, stream, chunk_size=64 * 1024):
+        """
+        Yield the items of a JSON array read from the file-like `stream`, see
+        `iter_json_array`.
+        """
+        return iter_json_array(stream, self.loads, chunk_size)
+
+
+class StdlibJSONBackend(JSONBackend):
+    encoder_class = DjangoJSONEncoder
+
+    def dumps(self, data, pretty=False):
+        if pretty:
+            return json.dumps(
+                data, cls=self.encoder_class, sort_keys=True, indent=2, separators=(",", ": ")
+            )
+        return json.dumps(data, cls=self.encoder_class, separators=(",", ":"))
+
+    def loads(self, data):
+        return json.loads(data)
+
+
+class OrjsonBackend(JSONBackend):
+    """
+    Encodes UUID, datetime, date and time values natively, `default` is only called for the
+    remaining Django types.
+    """
+
+    def __init__(self):
+        assert orjson is not None, "orjson must be installed to use the OrjsonBackend"
+
+    @staticmethod
+    def default(value):
+        if isinstance(value, (Decimal, Promise)):
+            return str(value)
+        raise TypeError
+
+    def dumps(self, data, pretty=False):
+        option = orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS if pretty else None
+        return orjson.dumps(data, default=self.default, option=option)
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+
+_default_backend = None
+
+
+def get_default_json_backend():
+    global _default_backend
+    if _default_backend is None:
+        backend_path = getattr(settings, "ARIADNE_EXTENDED_JSON_BACKEND", None)
+        backend_class = import_string(backend_path) if backend_path else StdlibJSONBackend
+        _default_backend = backend_class()
+    return _default_backend
+
+
+# A complete string, a run of characters without structure, or a bracket
+_TOKEN = re.compile(rb'"(?:[^"\\]|\\.)*"|[^"\[\]{}]+|[\[\]{}]', re.DOTALL)
+_WHITESPACE = re.compile(rb"[ \t\n\r]*")
+
+
+def iter_json_array(stream, loads, chunk_size=64 * 1024):
+    """
+    Yield the items of a JSON array of objects or arrays read from the file-like `stream`,
+    each item is decoded with `loads` as soon as it has been read. Only the item being read is
+    kept in memory. Raises `ValueError` when the document isn't such an array.
+    """
+    buffer = bytearray()
+    eof = False
+
+    def fill():
+        nonlocal eof
+        chunk = stream.read(chunk_size)
+        if chunk:
+            buffer.extend(chunk)
+        else:
+            eof = True
+        return not eof
+
+    def next_char(position):
+        """
+        Return the position and value of the next non whitespace character, reading more
+        of the stream when needed.
+        """
+        while True:
+            position = _WHITESPACE.match(buffer, position).end()
+            if position < len(buffer):
+                return position, buffer[position : position + 1]
+            if not fill():
+                return position, b""
+
+    position, char = next_char(0)
+    if char != b"[":
+        raise ValueError("Expected a JSON array.")
+    position, char = next_char(position + 1)
+    first = True
+    while char != b"]":
+        if not first:
+            if char != b",":
+                raise ValueError("Expected ',' or ']' after an array item.")
+            position, char = next_char(position + 1)
+        if char not in (b"{", b"["):
+            raise ValueError("Array items must be objects or arrays.")
+
+        # drop the items already decoded before reading the next one
+        del buffer[:position]
+        start = position = depth = 0
+        while True:
+            match = _TOKEN.match(buffer, position)
+            if match is None:
+                # the buffer ends within a string
+                if not fill():
+                    raise ValueError("Unterminated JSON array item.")
+                continue
+            token = match.group()
+            if token in (b"{", b"["):
+                depth += 1
+            elif token in (b"}", b"]"):
+                depth -= 1
+            position = match.end()
+            if depth == 0:
+                break
+            if position == len(buffer) and not fill():
+                raise ValueError("Unterminated JSON array item.")
+
+        yield loads(bytes(buffer[start:position]))
+        first = False
+        position, char = next_char(position)
+        if not char:
+            raise ValueError("Unterminated JSON array.")
+
+    if next_char(position + 1)[1]:
+        raise ValueError("Unexpected data after the JSON array.")
@@ -28,7 +28,8 @@ class FilterMixin:
         """
         Called by the filter backend when determining how to filter
         """
-        if self.config.get("reference", False):
+        # batched references are looked up by their loader, from the queryset of their type
+        if self.config.get("reference", False) and not getattr(self, "loading_references", False):
             return self.reference_kwargs
         return self.operation_kwargs.get(self.filter_arg, {})
 
@@ -0,0 +1,302 @@
+"""
+Query executors based on `ariadne.graphql` that can reuse parsed and validated documents.
+"""
+from asyncio import ensure_future
+from inspect import isawaitable
+from typing import Any, Awaitable, Callable, List, Optional, Sequence, Type, Union, cast
+
+from ariadne.extensions import ExtensionManager
+from ariadne.format_error import format_error
+from ariadne.graphql import (
+    handle_graphql_errors,
+    handle_query_result,
+    parse_query,
+    validate_data,
+    validate_query,
+)
+from ariadne.types import ErrorFormatter, Extension, GraphQLResult, RootValue
+from asgiref.sync import sync_to_async
+from graphql import ExecutionContext, ExecutionResult, GraphQLError, GraphQLSchema, execute
+from graphql.execution import MiddlewareManager
+from graphql.validation.rules import RuleType
+
+from .cache_control import CacheControl
+from .document_cache import DocumentCache
+from .persisted_queries import PersistedQueryStore, apply_persisted_query
+from .response_cache import ResponseCache, tracking_model_access
+
+
+# Called with `(schema, document, data, context_value)`, returns a list of errors
+Validator = Callable[..., List[GraphQLError]]
+
+
+def split_validation_rules(validation_rules: Optional[Sequence[Union[RuleType, Validator]]]):
+    """
+    Split validation rules into static rule classes, whose result is cached along with the
+    document, and validators called for each request, such as `QueryCostValidator`.
+    """
+    rules, validators = [], []
+    for rule in validation_rules or ():
+        if isinstance(rule, type):
+            rules.append(rule)
+        else:
+            validators.append(rule)
+    return rules, validators
+
+
+def run_validators(validators, schema, document, data, context_value=None):
+    return [
+        error
+        for validator in validators
+        for error in validator(schema, document, data, context_value) or ()
+    ]
+
+
+def get_document(
+    schema: GraphQLSchema,
+    query: str,
+    validation_rules: Optional[Sequence[RuleType]] = None,
+    document_cache: Optional[DocumentCache] = None,
+):
+    """
+    Return the parsed document and its validation errors.
+    """
+    if document_cache is not None:
+        return document_cache.parse_and_validate(schema, query, validation_rules)
+    document = parse_query(query)
+    return document, validate_query(schema, document, validation_rules)
+
+
+def get_cached_response(
+    response_cache: Optional[ResponseCache], document, data, context_value=None
+):
+    """
+    Return the cache key of a cacheable operation and its cached response, if any.
+    """
+    operation_name = data.get("operationName")
+    if response_cache is None or not response_cache.is_cacheable(document, operation_name):
+        return None, None
+    key = response_cache.get_key(
+        data["query"], data.get("variables"), operation_name, context_value
+    )
+    if key is None:
+        return None, None
+    return key, response_cache.get(key)
+
+
+def cache_result(response_cache, key, result, models):
+    if key is not None and not result.errors:
+        response_cache.set(key, {"data": result.data}, models)
+
+
+def run_sync(func, *args):
+    """
+    Run `func` outside of the event loop, for the calls of the async executor to Django's
+    synchronous cache and ORM.
+    """
+    return sync_to_async(func, thread_sensitive=True)(*args)
+
+
+def track_models(response_cache, key):
+    """
+    Track the models queried by the operation, with their tag versions when it is cached.
+    """
+    return tracking_model_access(response_cache if key is not None else None)
+
+
+async def graphql(
+    schema: GraphQLSchema,
+    data: Any,
+    *,
+    context_value: Optional[Any] = None,
+    root_value: Optional[RootValue] = None,
+    debug: bool = False,
+    logger: Optional[str] = None,
+    validation_rules: Optional[Sequence[Union[RuleType, Validator]]] = None,
+    error_formatter: ErrorFormatter = format_error,
+    middleware: Optional[MiddlewareManager] = None,
+    extensions: Optional[List[Type[Extension]]] = None,
+    document_cache: Optional[DocumentCache] = None,
+    persisted_query_store: Optional[PersistedQueryStore] = None,
+    response_cache: Optional[ResponseCache] = None,
+    cache_control: Optional[CacheControl] = None,
+    **kwargs,
+) -> GraphQLResult:
+    extension_manager = ExtensionManager(extensions, context_value)
+
+    with extension_manager.request():
+        try:
+            if persisted_query_store is not None:
+                data = await run_sync(apply_persisted_query, data, persisted_query_store)
+            else:
+                data = apply_persisted_query(data, persisted_query_store)
+            validate_data(data)
+            query, variables, operation_name = (
+                data["query"],
+                data.get("variables"),
+                data.get("operationName"),
+            )
+
+            rules, validators = split_validation_rules(validation_rules)
+            document, validation_errors = get_document(schema, query, rules, document_cache)
+            if not validation_errors and validators:
+                # validators such as `QueryCostThrottle` count requests in the cache
+                validation_errors = await run_sync(
+                    run_validators, validators, schema, document, data, context_value
+                )
+            if validation_errors:
+                return handle_graphql_errors(
+                    validation_errors,
+                    logger=logger,
+                    error_formatter=error_formatter,
+                    debug=debug,
+                    extension_manager=extension_manager,
+                )
+
+            if cache_control is not None:
+                cache_control.hint_document(schema, document, operation_name, context_value)
+
+            cache_key, cached_response = None, None
+            if response_cache is not None:
+                cache_key, cached_response = await run_sync(
+                    get_cached_response, response_cache, document, data, context_value
+                )
+            if cached_response is not None:
+                return True, cached_response
+
+            if callable(root_value):
+                root_value = root_value(context_value, document)
+                if isawaitable(root_value):
+                    root_value = await root_value
+
+            with track_models(response_cache, cache_key) as models:
+                result = execute(
+                    schema,
+                    document,
+                    root_value=root_value,
+                    context_value=context_value,
+                    variable_values=variables,
+                    operation_name=operation_name,
+                    execution_context_class=ExecutionContext,
+                    middleware=extension_manager.as_middleware_manager(middleware),
+                    **kwargs,
+                )
+
+                if isawaitable(result):
+                    result = await cast(Awaitable[ExecutionResult], result)
+            if cache_key is not None:
+                await run_sync(cache_result, response_cache, cache_key, result, models)
+        except GraphQLError as error:
+            return handle_graphql_errors(
+                [error],
+                logger=logger,
+                error_formatter=error_formatter,
+                debug=debug,
+                extension_manager=extension_manager,
+            )
+        else:
+            return handle_query_result(
+                result,
+                logger=logger,
+                error_formatter=error_formatter,
+                debug=debug,
+                extension_manager=extension_manager,
+            )
+
+
+def graphql_sync(
+    schema: GraphQLSchema,
+    data: Any,
+    *,
+    context_value: Optional[Any] = None,
+    root_value: Optional[RootValue] = None,
+    debug: bool = False,
+    logger: Optional[str] = None,
+    validation_rules: Optional[Sequence[Union[RuleType, Validator]]] = None,
+    error_formatter: ErrorFormatter = format_error,
+    middleware: Optional[MiddlewareManager] = None,
+    extensions: Optional[List[Type[Extension]]] = None,
+    document_cache: Optional[DocumentCache] = None,
+    persisted_query_store: Optional[PersistedQueryStore] = None,
+    response_cache: Optional[ResponseCache] = None,
+    cache_control: Optional[CacheControl] = None,
+    **kwargs,
+) -> GraphQLResult:
+    extension_manager = ExtensionManager(extensions, context_value)
+
+    with extension_manager.request():
+        try:
+            data = apply_persisted_query(data, persisted_query_store)
+            validate_data(data)
+            query, variables, operation_name = (
+                data["query"],
+                data.get("variables"),
+                data.get("operationName"),
+            )
+
+            rules, validators = split_validation_rules(validation_rules)
+            document, validation_errors = get_document(schema, query, rules, document_cache)
+            if not validation_errors and validators:
+                validation_errors = run_validators(
+                    validators, schema, document, data, context_value
+                )
+            if validation_errors:
+                return handle_graphql_errors(
+                    validation_errors,
+                    logger=logger,
+                    error_formatter=error_formatter,
+                    debug=debug,
+                    extension_manager=extension_manager,
+                )
+
+            if cache_control is not None:
+                cache_control.hint_document(schema, document, operation_name, context_value)
+
+            cache_key, cached_response = get_cached_response(
+                response_cache, document, data, context_value
+            )
+            if cached_response is not None:
+                return True, cached_response
+
+            if callable(root_value):
+                root_value = root_value(context_value, document)
+                if isawaitable(root_value):
+                    ensure_future(root_value).cancel()
+                    raise RuntimeError(
+                        "Root value resolver can't be asynchronous "
+                        "in synchronous query executor."
+                    )
+
+            with track_models(response_cache, cache_key) as models:
+                result = execute(
+                    schema,
+                    document,
+                    root_value=root_value,
+                    context_value=context_value,
+                    variable_values=variables,
+                    operation_name=operation_name,
+                    execution_context_class=ExecutionContext,
+                    middleware=extension_manager.as_middleware_manager(middleware),
+                    **kwargs,
+                )
+
+            if isawaitable(result):
+                ensure_future(cast(Awaitable[ExecutionResult], result)).cancel()
+                raise RuntimeError("GraphQL execution failed to complete synchronously.")
+            cache_result(response_cache, cache_key, result, models)
+        except GraphQLError as error:
+            return handle_graphql_errors(
+                [error],
+                logger=logger,
+                error_formatter=error_formatter,
+                debug=debug,
+                extension_manager=extension_manager,
+            )
+        else:
+            return handle_query_result(
+                result,
+                logger=logger,
+                error_formatter=error_formatter,
+                debug=debug,
+                extension_manager=extension_manager,
+            )
@@ -0,0 +1,329 @@
+"""
+Per operation metrics of the GraphQL views.
+
+Views record the latency, errors and database queries of each operation, and the size of
+their responses, to the exporters of their `metrics` attribute. `PrometheusExporter`
+aggregates them into histograms served by `PrometheusMetricsView`, `InMemoryExporter` keeps
+every measurement for tests.
+
+Metrics are kept in memory, each process exposes its own.
+"""
+from bisect import bisect_left
+from contextlib import ExitStack, contextmanager, nullcontext
+from threading import Lock
+from time import perf_counter
+
+from django.db import connections
+from django.http import HttpResponse
+from django.views.generic import View
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+DB_QUERIES_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# label of operations sent without a name, and of batch responses
+ANONYMOUS = "anonymous"
+BATCH = "batch"
+# label of operations once `max_operations` distinct names were seen
+OTHER = "other"
+
+
+class Measurement:
+    """
+    Metrics of a single operation, database queries are counted when executed in the thread
+    measuring the operation.
+    """
+
+    def __init__(self, operation_name):
+        self.operation_name = operation_name
+        self.duration = None
+        self.failed = False
+        self.db_queries = None
+        self.db_time = None
+
+    def track_query(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_queries += 1
+            self.db_time += perf_counter() - start
+
+
+class Metrics:
+    def __init__(self, exporters, track_db=True, max_operations=1000):
+        self.exporters = list(exporters)
+        self.track_db = track_db
+        # caps the number of distinct labels, operation names are chosen by clients
+        self.max_operations = max_operations
+        self._operations = set()
+        self._lock = Lock()
+
+    def get_label(self, operation_name):
+        operation_name = operation_name or ANONYMOUS
+        if operation_name in self._operations:
+            return operation_name
+        with self._lock:
+            if len(self._operations) >= self.max_operations:
+                return OTHER
+            self._operations.add(operation_name)
+        return operation_name
+
+    @contextmanager
+    def measure(self, operation_name, track_db=None):
+        """
+        Measure the operation executed within the block, the yielded `Measurement` should be
+        marked as `failed` when the operation returned errors.
+        """
+        measurement = Measurement(self.get_label(operation_name))
+        track_db = self.track_db if track_db is None else track_db
+        with ExitStack() as stack:
+            if track_db:
+                measurement.db_queries, measurement.db_time = 0, 0.0
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(measurement.track_query))
+            start = perf_counter()
+            try:
+                yield measurement
+            except Exception:
+                measurement.failed = True
+                raise
+            finally:
+                measurement.duration = perf_counter() - start
+                for exporter in self.exporters:
+                    exporter.record_operation(measurement)
+
+    def record_response(self, operation_name, size):
+        label = operation_name if operation_name == BATCH else self.get_label(operation_name)
+        for exporter in self.exporters:
+            exporter.record_response(label, size)
+
+    def record_saved_executions(self, count):
+        for exporter in self.exporters:
+            exporter.record_saved_executions(count)
+
+
+def measure(metrics, operation_name, track_db=None):
+    """
+    Shortcut measuring an operation with `metrics`, which may be `None` when disabled.
+    """
+    if metrics is None:
+        return nullcontext(Measurement(operation_name))
+    return metrics.measure(operation_name, track_db)
+
+
+def record_response(metrics, operation_name, response):
+    if metrics is not None and not response.streaming:
+        metrics.record_response(operation_name, len(response.content))
+
+
+def record_saved_executions(metrics, count):
+    """
+    Record the entries of a batch answered by the result of an identical entry.
+    """
+    if metrics is not None:
+        metrics.record_saved_executions(count)
+
+
+class MetricsExporter:
+    def record_operation(self, measurement):
+        raise NotImplementedError(".record_operation() must be overridden.")
+
+    def record_response(self, operation_name, size):
+        raise NotImplementedError(".record_response() must be overridden.")
+
+    def record_saved_executions(self, count):
+        pass
+
+
+class InMemoryExporter(MetricsExporter):
+    def __init__(self):
+        self.operations = []
+        self.responses = []
+        self.saved_executions = 0
+
+    def record_operation(self, measurement):
+        self.operations.append(measurement)
+
+    def record_response(self, operation_name, size):
+        self.responses.append((operation_name, size))
+
+    def record_saved_executions(self, count):
+        self.saved_executions += count
+
+    def clear(self):
+        self.operations = []
+        self.responses = []
+        self.saved_executions = 0
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative_counts(self):
+        total = 0
+        for count in self.counts:
+            total += count
+            yield total
+
+
+def escape_label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_number(value):
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+
+class PrometheusExporter(MetricsExporter):
+    """
+    Aggregates the measurements of each operation and renders them in the Prometheus text
+    exposition format.
+    """
+
+    prefix = "graphql"
+
+    def __init__(
+        self,
+        latency_buckets=LATENCY_BUCKETS,
+        db_queries_buckets=DB_QUERIES_BUCKETS,
+        size_buckets=SIZE_BUCKETS,
+    ):
+        self.latency_buckets = latency_buckets
+        self.db_queries_buckets = db_queries_buckets
+        self.size_buckets = size_buckets
+        self._operations = {}
+        self._responses = {}
+        self._saved_executions = 0
+        self._lock = Lock()
+
+    def record_operation(self, measurement):
+        with self._lock:
+            metrics = self._operations.get(measurement.operation_name)
+            if metrics is None:
+                metrics = self._operations[measurement.operation_name] = {
+                    "duration": Histogram(self.latency_buckets),
+                    "errors": 0,
+                    "db_queries": Histogram(self.db_queries_buckets),
+                    "db_time": 0.0,
+                }
+            metrics["duration"].observe(measurement.duration)
+            if measurement.failed:
+                metrics["errors"] += 1
+            if measurement.db_queries is not None:
+                metrics["db_queries"].observe(measurement.db_queries)
+                metrics["db_time"] += measurement.db_time
+
+    def record_response(self, operation_name, size):
+        with self._lock:
+            histogram = self._responses.get(operation_name)
+            if histogram is None:
+                histogram = self._responses[operation_name] = Histogram(self.size_buckets)
+            histogram.observe(size)
+
+    def record_saved_executions(self, count):
+        with self._lock:
+            self._saved_executions += count
+
+    def render(self):
+        with self._lock:
+            operations = {
+                name: {
+                    "duration": self.render_histogram(name, metrics["duration"]),
+                    "errors": metrics["errors"],
+                    "db_queries": self.render_histogram(name, metrics["db_queries"]),
+                    "db_time": metrics["db_time"],
+                }
+                for name, metrics in sorted(self._operations.items())
+            }
+            responses = {
+                name: self.render_histogram(name, histogram)
+                for name, histogram in sorted(self._responses.items())
+            }
+            saved_executions = self._saved_executions
+
+        lines = []
+
+        def add_histogram(name, description, histograms):
+            lines.append("# HELP %s_%s %s" % (self.prefix, name, description))
+            lines.append("# TYPE %s_%s histogram" % (self.prefix, name))
+            for samples in histograms:
+                lines.extend("%s_%s%s" % (self.prefix, name, sample) for sample in samples)
+
+        def add_counter(name, description, values):
+            lines.append("# HELP %s_%s %s" % (self.prefix, name, description))
+            lines.append("# TYPE %s_%s counter" % (self.prefix, name))
+            for operation_name, value in values:
+                lines.append(
+                    '%s_%s{operation="%s"} %s'
+                    % (self.prefix, name, escape_label(operation_name), format_number(value))
+                )
+
+        add_histogram(
+            "operation_duration_seconds",
+            "Duration of GraphQL operations.",
+            [metrics["duration"] for metrics in operations.values()],
+        )
+        add_counter(
+            "operation_errors_total",
+            "GraphQL operations that returned errors.",
+            [(name, metrics["errors"]) for name, metrics in operations.items()],
+        )
+        add_histogram(
+            "operation_db_queries",
+            "Database queries executed by GraphQL operations.",
+            [metrics["db_queries"] for metrics in operations.values()],
+        )
+        add_counter(
+            "operation_db_duration_seconds_total",
+            "Time spent in database queries by GraphQL operations.",
+            [(name, metrics["db_time"]) for name, metrics in operations.items()],
+        )
+        add_histogram("response_size_bytes", "Size of GraphQL responses.", responses.values())
+        name = "%s_batch_saved_executions_total" % self.prefix
+        lines.append(
+            "# HELP %s Batch entries answered by the result of an identical entry." % name
+        )
+        lines.append("# TYPE %s counter" % name)
+        lines.append("%s %d" % (name, saved_executions))
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def render_histogram(operation_name, histogram):
+        label = 'operation="%s"' % escape_label(operation_name)
+        samples = []
+        bounds = [format_number(bound) for bound in histogram.buckets] + ["+Inf"]
+        for bound, count in zip(bounds, histogram.cumulative_counts()):
+            samples.append('_bucket{%s,le="%s"} %d' % (label, bound, count))
+        samples.append("_sum{%s} %s" % (label, format_number(histogram.sum)))
+        samples.append("_count{%s} %d" % (label, histogram.count))
+        return samples
+
+
+default_exporter = PrometheusExporter()
+default_metrics = Metrics([default_exporter])
+
+
+class PrometheusMetricsView(View):
+    """
+    Serves the metrics of `exporter` to Prometheus, access to it should be restricted, eg.
+    by the URL configuration or a reverse proxy.
+    """
+
+    exporter = default_exporter
+
+    def get(self, request, *args, **kwargs):
+        return HttpResponse(
+            self.exporter.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+        )
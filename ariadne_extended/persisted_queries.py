@@ -0,0 +1,154 @@
+"""
+Automatic persisted queries following the Apollo protocol.
+
+Clients send a sha256 hash of the query in `extensions.persistedQuery`, when the hash is
+unknown a `PersistedQueryNotFound` error is returned and the client retries with both the
+hash and the query text, which registers the query for subsequent requests.
+"""
+import hashlib
+from collections import OrderedDict
+from threading import Lock
+
+from django.core.cache import caches
+from graphql.error import GraphQLError
+
+PERSISTED_QUERY_VERSION = 1
+
+
+class PersistedQueryError(GraphQLError):
+    code = None
+
+    def __init__(self, message=None):
+        super().__init__(message or self.message, extensions={"code": self.code})
+
+
+class PersistedQueryNotFound(PersistedQueryError):
+    message = "PersistedQueryNotFound"
+    code = "PERSISTED_QUERY_NOT_FOUND"
+
+
+class PersistedQueryNotSupported(PersistedQueryError):
+    message = "PersistedQueryNotSupported"
+    code = "PERSISTED_QUERY_NOT_SUPPORTED"
+
+
+class InvalidPersistedQuery(PersistedQueryError):
+    message = "Invalid persisted query"
+    code = "INVALID_PERSISTED_QUERY"
+
+
+def get_query_hash(query):
+    return hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+
+class PersistedQueryStore:
+    """
+    Base class for storing query texts by their sha256 hash.
+    """
+
+    def get(self, query_hash):
+        raise NotImplementedError(".get() must be overridden.")
+
+    def set(self, query_hash, query):
+        raise NotImplementedError(".set() must be overridden.")
+
+
+class LocalPersistedQueryStore(PersistedQueryStore):
+    """
+    In process LRU store, bounded by `maxsize` queries.
+    """
+
+    def __init__(self, maxsize=1000):
+        self.maxsize = maxsize
+        self._queries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, query_hash):
+        with self._lock:
+            query = self._queries.get(query_hash)
+            if query is not None:
+                self._queries.move_to_end(query_hash)
+            return query
+
+    def set(self, query_hash, query):
+        with self._lock:
+            self._queries[query_hash] = query
+            self._queries.move_to_end(query_hash)
+            while len(self._queries) > self.maxsize:
+                self._queries.popitem(last=False)
+
+
+class CachePersistedQueryStore(PersistedQueryStore):
+    """
+    Store queries in a Django cache backend, fronted by an in process LRU store so hot queries
+    don't need a cache round trip. Set `local_maxsize` to 0 to disable the local store.
+    """
+
+    key_prefix = "persisted-query"
+
+    def __init__(self, cache_alias="default", timeout=None, local_maxsize=1000):
+        self.cache_alias = cache_alias
+        self.timeout = timeout
+        self.local = LocalPersistedQueryStore(local_maxsize) if local_maxsize else None
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def get_cache_key(self, query_hash):
+        return "%s:%s" % (self.key_prefix, query_hash)
+
+    def get(self, query_hash):
+        if self.local is not None:
+            query = self.local.get(query_hash)
+            if query is not None:
+                return query
+
+        query = self.cache.get(self.get_cache_key(query_hash))
+        if query is not None and self.local is not None:
+            self.local.set(query_hash, query)
+        return query
+
+    def set(self, query_hash, query):
+        self.cache.set(self.get_cache_key(query_hash), query, self.timeout)
+        if self.local is not None:
+            self.local.set(query_hash, query)
+
+
+def apply_persisted_query(data, store=None):
+    """
+    Return the operation data with the query text filled in from the store, registering the
+    query when both the hash and the query text are sent.
+
+    Raises a `PersistedQueryError` subclass when the persisted query can't be used.
+    """
+    if not isinstance(data, dict):
+        return data
+    extensions = data.get("extensions") or {}
+    persisted_query = extensions.get("persistedQuery") if isinstance(extensions, dict) else None
+    if not persisted_query:
+        return data
+    if store is None:
+        if data.get("query"):
+            return data
+        raise PersistedQueryNotSupported()
+
+    try:
+        version = persisted_query.get("version", PERSISTED_QUERY_VERSION)
+        query_hash = persisted_query["sha256Hash"]
+    except (AttributeError, KeyError):
+        raise InvalidPersistedQuery("Persisted query requires a sha256Hash")
+    if version != PERSISTED_QUERY_VERSION:
+        raise InvalidPersistedQuery("Unsupported persisted query version")
+
+    query = data.get("query")
+    if query:
+        if not isinstance(query, str) or get_query_hash(query) != query_hash:
+            raise InvalidPersistedQuery("Provided sha256Hash does not match query")
+        store.set(query_hash, query)
+        return data
+
+    query = store.get(query_hash)
+    if query is None:
+        raise PersistedQueryNotFound()
+    return dict(data, query=query)
@@ -1,9 +1,63 @@
 from functools import update_wrapper
+from types import MappingProxyType
 
-import humps.main as humps
+from django.db.models.query import QuerySet
 from django.utils.decorators import classonlymethod
 
+from ..context import find_request_context
 from . import exceptions
+from .normalize import decamelize, get_field_normalizer, normalize_arguments
+
+
+def get_checks_key(resolver_class, config):
+    """
+    Key of the permission and throttle checks of resolvers built from `resolver_class` and
+    `config`, unhashable config values are compared by identity.
+    """
+    items = []
+    for name, value in sorted(config.items()):
+        try:
+            hash(value)
+        except TypeError:
+            value = id(value)
+        items.append((name, value))
+    return (resolver_class, tuple(items))
+
+
+class CompiledResolver:
+    """
+    Class level work of a resolver done once by `as_resolver`, instead of on every resolution,
+    when the resolver is compiled.
+
+    Permission and authentication instances are shared by every resolution and must not keep
+    per request state, as with DRF. Throttles usually keep the history of the request they
+    checked, so they are still instantiated for each resolution.
+    """
+
+    def __init__(self, resolver_class, resolver_config):
+        self.config = MappingProxyType(dict(resolver_config))
+        self.handler = getattr(
+            resolver_class, self.config.get("method", resolver_class.default_method)
+        )
+        self.permissions = tuple(permission() for permission in resolver_class.permission_classes)
+        self.authenticators = tuple(auth() for auth in resolver_class.authentication_classes)
+        self.checks_key = get_checks_key(resolver_class, self.config)
+        # `{(parent type, field name): normalizer}` of the fields resolved by the resolver
+        self.normalizers = {}
+
+    def normalize_arguments(self, info, arguments):
+        """
+        Same as `normalize.normalize_arguments`, with the argument normalizer of each field
+        looked up once.
+        """
+        key = (getattr(info, "parent_type", None), getattr(info, "field_name", None))
+        try:
+            normalizer = self.normalizers[key]
+        except KeyError:
+            normalizer = self.normalizers[key] = get_field_normalizer(info)
+        if normalizer is None:
+            return decamelize(arguments)
+        return normalizer.normalize(arguments)
 
 
 class Resolver:
@@ -12,16 +66,20 @@ class Resolver:
     throttle_classes = []
     authentication_classes = []
     default_method = "retrieve"
+    # Run async resolvers in the thread shared with other thread sensitive code, needed when
+    # the ORM is used within transactions or with thread bound connections
+    thread_sensitive = True
+    # Do the class level work once when building the resolver function, see `CompiledResolver`
+    compiled = False
+    _compiled = None
+    # Check permissions and throttles once per request for every resolver sharing the same
+    # class and config. Only enable it for checks which don't depend on the parent, arguments
+    # or object of the field, permissions and throttles set `memoize = False` to opt out
+    memoize_checks = False
 
     def __init__(self, parent, info, *operation_args, config=dict(), **operation_kwargs):
         # arguments used for this specific operation on the resolver
-        self.config = config.copy()
-        self._operation_args = operation_args
-        self._operation_kwargs = operation_kwargs
-        self.operation_args = self.get_operation_args()
-        self.operation_kwargs = self.get_operation_kwargs()
-        # normalize federation reference args from ariadne
-        self.reference_kwargs = self.get_reference_kwargs()
+        self.config = config if self._compiled is not None else config.copy()
         self.parent = parent
 
         # TODO: info may have to be wrapped in a Request compat object to work with
@@ -29,6 +87,14 @@ class Resolver:
         self.info = info
         self.request = info
 
+        self._operation_args = operation_args
+        self._operation_kwargs = operation_kwargs
+        self.operation_args = self.get_operation_args()
+        # argument names are mapped from the field definition of `info`
+        self.operation_kwargs = self.get_operation_kwargs()
+        # normalize federation reference args from ariadne
+        self.reference_kwargs = self.get_reference_kwargs()
+
     def initial(self, info, *args, **kwargs):
         """
         Runs anything that needs to occur prior to calling the operation handler
@@ -43,6 +109,9 @@ class Resolver:
         """
         self.initial(self.info, *args, **kwargs)
 
+        if self._compiled is not None:
+            return self._compiled.handler(self, parent, *args, **kwargs)
+
         method = self.config.get("method", self.default_method)
         handler = getattr(self, method)
         return handler(parent, *args, **kwargs)
@@ -51,14 +120,14 @@ class Resolver:
         return self._operation_args
 
     def get_operation_kwargs(self):
-        op_values = self._operation_kwargs.copy()
-
-        # convert camelcase to snake case on all
-        return humps.decamelize(op_values)
+        # convert camelcase to snake case on all, using the names of the schema
+        if self._compiled is not None:
+            return self._compiled.normalize_arguments(self.info, self._operation_kwargs)
+        return normalize_arguments(self.info, self._operation_kwargs)
 
     def get_reference_kwargs(self):
         if self.config.get("reference", False):
-            return humps.decamelize(self.operation_args[0])
+            return decamelize(self.operation_args[0])
         else:
             return dict()
 
@@ -96,9 +165,23 @@ class Resolver:
 
     @classonlymethod
     def as_resolver(cls, **resolver_config):
-        def resolver(parent, info, *args, **kwargs):
-            self = cls(parent, info, config=resolver_config, *args, **kwargs)
-            return self.resolve(parent, *self.operation_args, **self.operation_kwargs)
+        if resolver_config.get("compiled", cls.compiled):
+            compiled = CompiledResolver(cls, resolver_config)
+
+            def resolver(parent, info, *args, **kwargs):
+                self = cls.__new__(cls)
+                self._compiled = compiled
+                self.__init__(parent, info, *args, config=compiled.config, **kwargs)
+                return self.resolve(parent, *self.operation_args, **self.operation_kwargs)
+
+        else:
+
+            def resolver(parent, info, *args, **kwargs):
+                self = cls(parent, info, config=resolver_config, *args, **kwargs)
+                return self.resolve(parent, *self.operation_args, **self.operation_kwargs)
+
+        if resolver_config.get("asynchronous", False):
+            resolver = cls.make_async_resolver(resolver, **resolver_config)
 
         resolver.resolver_class = cls
 
@@ -110,6 +193,51 @@ class Resolver:
 
         return resolver
 
+    @classonlymethod
+    def make_async_resolver(cls, sync_resolver, **resolver_config):
+        """
+        Wrap a resolver function into a coroutine function that runs the whole resolution,
+        including ORM access, through `sync_to_async`.
+        """
+        # asgiref ships with Django 3.0+, only required when using async resolvers
+        from asgiref.sync import sync_to_async
+
+        def evaluated_resolver(parent, info, *args, **kwargs):
+            result = sync_resolver(parent, info, *args, **kwargs)
+            # Querysets are lazy, evaluate them while still allowed to query the database
+            if isinstance(result, QuerySet):
+                result = list(result)
+            return result
+
+        resolve = sync_to_async(
+            evaluated_resolver,
+            thread_sensitive=resolver_config.get("thread_sensitive", cls.thread_sensitive),
+        )
+
+        async def resolver(parent, info, *args, **kwargs):
+            return await resolve(parent, info, *args, **kwargs)
+
+        return resolver
+
+    @classonlymethod
+    def as_async_resolver(cls, **resolver_config):
+        """
+        Coroutine resolver for use with async execution, such as the `AsyncBaseGraphQLView`.
+        """
+        resolver_config["asynchronous"] = True
+        resolver = cls.as_resolver(**resolver_config)
+        return resolver
+
+    @classonlymethod
+    def as_compiled_resolver(cls, **resolver_config):
+        """
+        Resolver doing the class level work once, for fields resolved many times per request
+        such as fields of list items.
+        """
+        resolver_config["compiled"] = True
+        resolver = cls.as_resolver(**resolver_config)
+        return resolver
+
     @classonlymethod
     def as_nested_resolver(cls, **resolver_config):
         """
@@ -133,6 +261,40 @@ class Resolver:
         """
         raise exceptions.PermissionDenied(message)
 
+    def get_checks_cache(self, info):
+        """
+        Returns the request scoped cache of memoized check outcomes, `None` when checks aren't
+        memoized or there is no request to scope them to.
+        """
+        if not self.config.get("memoize_checks", self.memoize_checks):
+            return None
+        context = getattr(info, "context", None)
+        if context is None:
+            return None
+        request_context = find_request_context(context)
+        if request_context is None:
+            return None
+        return request_context.get_cache("checks")
+
+    def get_checks_key(self):
+        if self._compiled is not None:
+            return self._compiled.checks_key
+        return get_checks_key(self.__class__, self.config)
+
+    def run_check(self, cache, check, func):
+        """
+        Returns the outcome of `func`, memoized in `cache` for the resolvers sharing the class
+        and config of this one unless `check` opts out.
+        """
+        if cache is None or not getattr(check, "memoize", True):
+            return func()
+        key = (check.__class__, self.get_checks_key())
+        try:
+            return cache[key]
+        except KeyError:
+            result = cache[key] = func()
+            return result
+
     def check_object_permissions(self, info, obj):
         """
         Check if the resolution should be permitted for a given object.
@@ -142,15 +304,31 @@ class Resolver:
             if not permission.has_object_permission(info, self, obj):
                 self.permission_denied(info, message=getattr(permission, "message", None))
 
+    def check_objects_permissions(self, info, objs):
+        """
+        Check if the resolution should be permitted for the objects of a list at once, with
+        the permissions implementing `has_objects_permission(info, resolver, objs)`.
+        `objs` may be a queryset, which keeps its results cached once iterated.
+        Raises an appropriate exception if the request is not permitted.
+        """
+        for permission in self.get_permissions():
+            has_objects_permission = getattr(permission, "has_objects_permission", None)
+            if has_objects_permission is not None and not has_objects_permission(info, self, objs):
+                self.permission_denied(info, message=getattr(permission, "message", None))
+
     def check_throttles(self, info):
         """
         Check if resolution should be throttled.
         Raises an appropriate exception if the resolution is throttled.
         """
+        cache = self.get_checks_cache(info)
         throttle_durations = []
         for throttle in self.get_throttles():
-            if not throttle.allow_request(info, self):
-                throttle_durations.append(throttle.wait())
+            allowed, wait = self.run_check(
+                cache, throttle, lambda: self.run_throttle(info, throttle)
+            )
+            if not allowed:
+                throttle_durations.append(wait)
 
         if throttle_durations:
             # Filter out `None` values which may happen in case of config / rate
@@ -158,7 +336,15 @@ class Resolver:
             durations = [duration for duration in throttle_durations if duration is not None]
 
             duration = max(durations, default=None)
-            self.throttled(request, duration)
+            self.throttled(info, duration)
+
+    def run_throttle(self, info, throttle):
+        throttle_request = getattr(throttle, "throttle_request", None)
+        if throttle_request is not None:
+            return throttle_request(info, self)
+        if throttle.allow_request(info, self):
+            return (True, None)
+        return (False, throttle.wait())
 
     def perform_authentication(self, info):
         """
@@ -175,20 +361,27 @@ class Resolver:
         Check if the resolution should be permitted.
         Raises an appropriate exception if the resolution is not permitted.
         """
+        cache = self.get_checks_cache(info)
         for permission in self.get_permissions():
-            if not permission.has_permission(info, self):
+            if not self.run_check(
+                cache, permission, lambda: bool(permission.has_permission(info, self))
+            ):
                 self.permission_denied(info, message=getattr(permission, "message", None))
 
     def get_authenticators(self):
         """
         Instantiates and returns the list of authenticators that this resolver can use.
         """
+        if self._compiled is not None:
+            return self._compiled.authenticators
         return [auth() for auth in self.authentication_classes]
 
     def get_permissions(self):
         """
         Instantiates and returns the list of permissions that this resolver requires.
         """
+        if self._compiled is not None:
+            return self._compiled.permissions
         return [permission() for permission in self.permission_classes]
 
     def get_throttles(self):
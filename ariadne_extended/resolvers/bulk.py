@@ -0,0 +1,199 @@
+"""
+Validation of the items of list inputs created at once.
+
+The items are validated by the child of a `many=True` model serializer, like DRF does, except
+for the checks querying the database for each item: the objects of primary key relations are
+fetched for all items with one query per field, and the `UniqueValidator` and
+`UniqueTogetherValidator` checks run one query per validator for all valid items, also
+rejecting duplicates among the items.
+"""
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import ErrorDetail, ValidationError
+from rest_framework.relations import PrimaryKeyRelatedField
+from rest_framework.serializers import as_serializer_error
+from rest_framework.settings import api_settings
+from rest_framework.validators import UniqueTogetherValidator, UniqueValidator
+
+# values per `__in` lookup, within the parameter limits of every database
+CHUNK_SIZE = 500
+
+
+def chunks(values, size=CHUNK_SIZE):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start : start + size]
+
+
+class UniqueCheck:
+    """
+    `UniqueValidator` of a field, checked for every item at once.
+    """
+
+    def __init__(self, field, validator):
+        self.field = field
+        self.validator = validator
+
+    def get_value(self, validated_data):
+        value = validated_data.get(self.field.source, None)
+        # related objects are compared by primary key, as returned by `values_list`
+        return getattr(value, "pk", value)
+
+    def get_existing(self, values):
+        source = self.field.source
+        existing = set()
+        for chunk in chunks(values):
+            existing.update(
+                self.validator.queryset.filter(**{"%s__in" % source: chunk}).values_list(
+                    source, flat=True
+                )
+            )
+        return existing
+
+    def get_error(self):
+        return {self.field.field_name: [ErrorDetail(str(self.validator.message), code="unique")]}
+
+    def check(self, results):
+        values = {}
+        for index, (validated_data, errors) in enumerate(results):
+            value = None if errors else self.get_value(validated_data)
+            if value is not None:
+                values.setdefault(value, []).append(index)
+
+        existing = self.get_existing(values) if values else ()
+        for value, indexes in values.items():
+            # the first item with a value is the one created
+            duplicates = indexes if value in existing else indexes[1:]
+            for index in duplicates:
+                results[index] = (None, self.get_error())
+
+
+class UniqueTogetherCheck(UniqueCheck):
+    """
+    `UniqueTogetherValidator` of a serializer, checked for every item at once.
+    """
+
+    def __init__(self, serializer, validator):
+        self.serializer = serializer
+        self.validator = validator
+        self.sources = [serializer.fields[name].source for name in validator.fields]
+
+    def get_value(self, validated_data):
+        value = tuple(validated_data.get(source) for source in self.sources)
+        # as DRF, values aren't checked when one of them is missing
+        if None in value:
+            return None
+        return tuple(getattr(v, "pk", v) for v in value)
+
+    def get_existing(self, values):
+        existing = set()
+        for chunk in chunks(values):
+            query = reduce(or_, (Q(**dict(zip(self.sources, value))) for value in chunk))
+            existing.update(
+                tuple(getattr(v, "pk", v) for v in row)
+                for row in self.validator.queryset.filter(query).values_list(*self.sources)
+            )
+        return existing
+
+    def get_error(self):
+        message = str(self.validator.message).format(field_names=", ".join(self.validator.fields))
+        return {api_settings.NON_FIELD_ERRORS_KEY: [ErrorDetail(message, code="unique")]}
+
+
+def pop_unique_validators(serializer):
+    """
+    Remove the unique validators of `serializer` and its fields, return the checks replacing
+    them. Validators with lookups other than `exact` are left in place.
+    """
+    checks = []
+    for field in serializer.fields.values():
+        if field.read_only:
+            continue
+        validators = []
+        for validator in field.validators:
+            if isinstance(validator, UniqueValidator) and validator.lookup == "exact":
+                checks.append(UniqueCheck(field, validator))
+            else:
+                validators.append(validator)
+        field.validators = validators
+
+    validators = []
+    for validator in serializer.validators:
+        if isinstance(validator, UniqueTogetherValidator) and all(
+            name in serializer.fields for name in validator.fields
+        ):
+            checks.append(UniqueTogetherCheck(serializer, validator))
+        else:
+            validators.append(validator)
+    serializer.validators = validators
+    return checks
+
+
+def prefetch_related_objects(serializer, items):
+    """
+    Fetch the objects of the primary key relations of `serializer` for every item, related
+    objects are then looked up without querying the database.
+    """
+    for field in serializer.fields.values():
+        if (
+            not isinstance(field, PrimaryKeyRelatedField)
+            or field.read_only
+            or field.pk_field is not None
+        ):
+            continue
+        queryset = field.get_queryset()
+        pk = queryset.model._meta.pk
+        keys = set()
+        for item in items:
+            value = item.get(field.field_name) if isinstance(item, dict) else None
+            if value is None or isinstance(value, bool):
+                continue
+            try:
+                keys.add(pk.to_python(value))
+            except DjangoValidationError:
+                continue
+        objects = queryset.in_bulk(keys) if keys else {}
+        field.to_internal_value = get_prefetched_value(field, pk, objects)
+
+
+def get_prefetched_value(field, pk, objects):
+    to_internal_value = field.to_internal_value
+
+    def get_value(data):
+        if isinstance(data, bool):
+            return to_internal_value(data)
+        try:
+            key = pk.to_python(data)
+        except DjangoValidationError:
+            return to_internal_value(data)
+        obj = objects.get(key)
+        if obj is None:
+            field.fail("does_not_exist", pk_value=data)
+        return obj
+
+    return get_value
+
+
+def validate_many(serializer, items):
+    """
+    Validate the items of a `many=True` model serializer, returns the
+    `(validated data, errors)` of each item, the validated data being `None` for invalid
+    items.
+    """
+    child = serializer.child
+    checks = pop_unique_validators(child)
+    prefetch_related_objects(child, items)
+
+    results = []
+    for item in items:
+        try:
+            results.append((child.run_validation(item), {}))
+        except ValidationError as exc:
+            results.append((None, as_serializer_error(exc)))
+
+    for check in checks:
+        check.check(results)
+    return results
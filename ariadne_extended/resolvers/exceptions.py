@@ -1,3 +1,5 @@
+import math
+
 from django.utils.translation import ugettext_lazy as _
 
 
@@ -8,3 +10,20 @@ class ResolverException(Exception):
 class PermissionDenied(ResolverException):
     default_detail = _("You do not have permission to query this field.")
     default_code = "permission_denied"
+
+
+class Throttled(ResolverException):
+    default_detail = _("Request was throttled.")
+    extra_detail = _("Expected available in {wait} seconds.")
+    default_code = "throttled"
+
+    def __init__(self, wait=None, detail=None):
+        self.wait = None if wait is None else math.ceil(wait)
+        detail = str(detail or self.default_detail)
+        if self.wait is not None:
+            detail = "%s %s" % (detail, str(self.extra_detail).format(wait=self.wait))
+        super().__init__(detail)
+        # reported in the extensions of the GraphQL error
+        self.extensions = {"code": self.default_code.upper()}
+        if self.wait is not None:
+            self.extensions["retryAfter"] = self.wait
@@ -0,0 +1,410 @@
+"""
+Request scoped loaders batching the lookups of model resolvers.
+
+Loaders are registered on the `RequestContext` of the request by resolver class, queryset and
+lookup field, and cache the objects they fetched until a mutation clears them. With async
+execution the lookups of resolvers running concurrently, such as the fields of list items, are
+fetched together with a single `__in` query once none of them is still preparing its lookup.
+Sync execution resolves fields one after the other: the field of the first listed object looks
+up the values of every sibling at once, other keys are fetched when requested, and later
+lookups of the same key are served from the cache.
+
+Nested lists are loaded for every sibling parent at once: objects listed by batched resolvers
+are registered as siblings, and the first parent needing a relation loads it for all of them.
+Federation references are handled the same way, the first reference of a type resolved by
+the `_entities` field loads the objects of every representation of that type.
+"""
+import asyncio
+from threading import Lock
+
+from django.contrib.admin.options import get_content_type_for_model
+from django.core.exceptions import EmptyResultSet, FieldDoesNotExist
+from django.db.models import F
+from django.db.models.constants import LOOKUP_SEP
+from graphql.execution.values import get_argument_values
+
+from ..context import get_request_context
+from .optimizer import ensure_loaded
+
+# annotation holding the looked up value of fetched objects
+LOADER_KEY = "_loader_key"
+
+
+def get_lookup_model_field(model, lookup_field):
+    """
+    Return the model field of a lookup such as `pk` or `author__username`, `None` when the
+    lookup doesn't follow model fields.
+    """
+    field = None
+    for name in lookup_field.split(LOOKUP_SEP):
+        if model is None:
+            return None
+        try:
+            field = model._meta.pk if name == "pk" else model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return None
+        model = field.related_model
+    return field
+
+
+def get_queryset_signature(queryset):
+    try:
+        query = str(queryset.query)
+    except EmptyResultSet:
+        query = None
+    return (queryset.model._meta.label_lower, query)
+
+
+class Loader:
+    """
+    Batches and caches the loading of values, subclasses implement `get_key` and `fetch`.
+    """
+
+    def __init__(self):
+        # `{key: result}` of fetched keys
+        self.cache = {}
+        # `{key: (value, [future])}` of the keys waiting for the next dispatch
+        self.queued = {}
+        self.lock = Lock()
+
+    def get_key(self, value):
+        return value
+
+    def fetch(self, values):
+        """
+        Fetch the results of `values`, which have distinct keys, with a single query and cache
+        them. Return `{key: result}`, results may be exceptions raised when loaded.
+        """
+        raise NotImplementedError(".fetch() must be overridden.")
+
+    @staticmethod
+    def get_result(result):
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def load(self, value):
+        return self.load_many([value])[0]
+
+    def load_many(self, values):
+        """
+        Return the results of `values`, the missing keys are fetched together.
+        """
+        keys = [self.get_key(value) for value in values]
+        missing = {}
+        with self.lock:
+            for key, value in zip(keys, values):
+                if key not in self.cache:
+                    missing.setdefault(key, value)
+        if missing:
+            self.fetch(list(missing.values()))
+        return [self.get_result(self.cache[key]) for key in keys]
+
+    def is_loaded(self, value):
+        with self.lock:
+            return self.get_key(value) in self.cache
+
+    def prefetch(self, values):
+        """
+        Fetch the values missing from the cache together, values which can't be converted to
+        a key are skipped and fail when loaded.
+        """
+        missing = {}
+        with self.lock:
+            for value in values:
+                try:
+                    key = self.get_key(value)
+                except Exception:
+                    continue
+                if key not in self.cache:
+                    missing.setdefault(key, value)
+        if missing:
+            self.fetch(list(missing.values()))
+
+    def queue(self, value):
+        """
+        Return a future of the result of `value`, fetched by the next dispatch.
+        """
+        future = asyncio.get_event_loop().create_future()
+        try:
+            key = self.get_key(value)
+        except Exception as e:
+            future.set_exception(e)
+            return future
+
+        with self.lock:
+            if key in self.cache:
+                self.set_result(future, self.cache[key])
+            else:
+                self.queued.setdefault(key, (value, []))[1].append(future)
+        return future
+
+    async def dispatch(self):
+        # asgiref ships with Django 3.0+, only required when using async resolvers
+        from asgiref.sync import sync_to_async
+
+        with self.lock:
+            queued, self.queued = self.queued, {}
+        if not queued:
+            return
+
+        try:
+            results = await sync_to_async(self.fetch)([value for value, _ in queued.values()])
+        except Exception as e:
+            results = dict.fromkeys(queued, e)
+        for key, (_, futures) in queued.items():
+            for future in futures:
+                self.set_result(future, results[key])
+
+    @staticmethod
+    def set_result(future, result):
+        if future.done():
+            return
+        if isinstance(result, Exception):
+            future.set_exception(result)
+        else:
+            future.set_result(result)
+
+
+class ModelLoader(Loader):
+    """
+    Loads the objects of `queryset` whose `lookup_field` matches the looked up values, `None`
+    when missing.
+    """
+
+    def __init__(self, queryset, lookup_field):
+        super().__init__()
+        self.queryset = queryset
+        self.lookup_field = lookup_field
+        self.field = get_lookup_model_field(queryset.model, lookup_field)
+
+    def get_key(self, value):
+        """
+        Convert a looked up value, such as an `ID` string, to the value stored in the database.
+        """
+        if self.field is None:
+            return value
+        return self.field.to_python(value)
+
+    def fetch(self, values):
+        keys = [self.get_key(value) for value in values]
+        results = dict.fromkeys(keys)
+        queryset = self.queryset.filter(**{"%s__in" % self.lookup_field: keys}).annotate(
+            **{LOADER_KEY: F(self.lookup_field)}
+        )
+        for obj in queryset:
+            key = getattr(obj, LOADER_KEY)
+            if results.get(key) is None:
+                results[key] = obj
+            else:
+                results[key] = self.queryset.model.MultipleObjectsReturned(
+                    "get() returned more than one %s with %s=%r"
+                    % (self.queryset.model._meta.object_name, self.lookup_field, key)
+                )
+        with self.lock:
+            self.cache.update(results)
+        return results
+
+
+class RelationLoader(Loader):
+    """
+    Loads the objects of `queryset` related to parents, as a list per parent.
+
+    The relation is the related manager `relation_name` of the parents when they have one,
+    otherwise objects whose `parent_name` field references the parent, `object_id` being the
+    field of generic relations along with `content_type`.
+    """
+
+    def __init__(self, queryset, relation_name=None, parent_name=None, siblings=None):
+        super().__init__()
+        self.queryset = queryset
+        self.relation_name = relation_name
+        self.parent_name = parent_name
+        # `{id(object): [object]}` of listed objects, see `register_siblings`
+        self.siblings = {} if siblings is None else siblings
+
+    def get_key(self, parent):
+        return (parent._meta.label_lower, parent.pk)
+
+    def load(self, parent):
+        """
+        Return the objects related to `parent`, along with those related to its siblings.
+        """
+        key = self.get_key(parent)
+        with self.lock:
+            if key in self.cache:
+                return self.get_result(self.cache[key])
+        siblings = self.siblings.get(id(parent), ())
+        return self.load_many([parent] + [s for s in siblings if s is not parent])[0]
+
+    def fetch(self, parents):
+        manager = getattr(parents[0], self.relation_name or "", None)
+        if hasattr(manager, "get_prefetch_queryset"):
+            results = self.fetch_relation(parents)
+        elif self.parent_name == "object_id":
+            results = self.fetch_generic_relation(parents)
+        elif self.parent_name:
+            results = self.group(
+                parents,
+                self.queryset.filter(**{"%s__in" % self.parent_name: [p.id for p in parents]}),
+                self.parent_name,
+            )
+        else:
+            objects = list(self.queryset)
+            results = {self.get_key(parent): objects for parent in parents}
+
+        # objects listed for these parents are the parents of the next nested level
+        register_siblings(self.siblings, [obj for objects in results.values() for obj in objects])
+        with self.lock:
+            self.cache.update(results)
+        return results
+
+    def fetch_relation(self, parents):
+        manager = getattr(parents[0], self.relation_name)
+        queryset, rel_obj_attr, instance_attr, *_ = manager.get_prefetch_queryset(
+            parents, ensure_loaded(self.queryset, self.get_relation_fields(manager))
+        )
+        grouped = {}
+        for obj in queryset:
+            grouped.setdefault(rel_obj_attr(obj), []).append(obj)
+        return {self.get_key(parent): grouped.get(instance_attr(parent), []) for parent in parents}
+
+    @staticmethod
+    def get_relation_fields(manager):
+        """
+        Fields of the related objects read to group them by parent.
+        """
+        if hasattr(manager, "object_id_field_name"):
+            return (manager.object_id_field_name, manager.content_type_field_name)
+        field = getattr(manager, "field", None)
+        if field is not None and not field.many_to_many:
+            return (field.name,)
+        return ()
+
+    def fetch_generic_relation(self, parents):
+        """
+        One query per content type of the parents.
+        """
+        by_content_type = {}
+        for parent in parents:
+            content_type = get_content_type_for_model(parent._meta.model)
+            by_content_type.setdefault(content_type, []).append(parent)
+
+        results = {}
+        for content_type, ct_parents in by_content_type.items():
+            queryset = self.queryset.filter(
+                content_type=content_type, object_id__in=[p.id for p in ct_parents]
+            )
+            results.update(self.group(ct_parents, queryset, "object_id"))
+        return results
+
+    def group(self, parents, queryset, field_name):
+        # compared as strings, generic object ids are often stored as text
+        grouped = {}
+        for obj in queryset.annotate(**{LOADER_KEY: F(field_name)}):
+            grouped.setdefault(str(getattr(obj, LOADER_KEY)), []).append(obj)
+        return {self.get_key(parent): grouped.get(str(parent.id), []) for parent in parents}
+
+
+class LoadDispatcher:
+    """
+    Dispatches the lookups queued by async resolvers, once every resolver which started
+    preparing its lookup queued it.
+
+    Used from the event loop only, resolvers prepare their lookup in a thread between `begin`
+    and `end`.
+    """
+
+    def __init__(self):
+        self.preparing = 0
+        self.loaders = set()
+        self.scheduled = False
+
+    def begin(self):
+        self.preparing += 1
+
+    def queue(self, loader, value):
+        future = loader.queue(value)
+        if not future.done():
+            self.loaders.add(loader)
+        return future
+
+    def end(self):
+        self.preparing -= 1
+        if not self.preparing and self.loaders and not self.scheduled:
+            # resolvers of sibling fields started in the same iteration begin first
+            self.scheduled = True
+            asyncio.get_event_loop().call_soon(self.dispatch)
+
+    def dispatch(self):
+        self.scheduled = False
+        if self.preparing:
+            return
+        loaders, self.loaders = self.loaders, set()
+        for loader in loaders:
+            asyncio.ensure_future(loader.dispatch())
+
+
+class PendingLoad:
+    """
+    Lookup returned by the handler of an async batched resolver, the object is loaded with
+    the lookups of the other resolvers and passed to `resolve`, run in a thread when set.
+    """
+
+    def __init__(self, loader, value, resolve=None):
+        self.loader = loader
+        self.value = value
+        self.resolve = resolve
+
+
+def get_model_loader(context, key, queryset, lookup_field):
+    """
+    Return the loader of the request of `context` registered for `key`.
+    """
+    return get_request_context(context).get_loader(
+        ("model", key, get_queryset_signature(queryset), lookup_field),
+        lambda: ModelLoader(queryset, lookup_field),
+    )
+
+
+def get_relation_loader(context, key, queryset, relation_name=None, parent_name=None):
+    """
+    Return the relation loader of the request of `context` registered for `key`.
+    """
+    request_context = get_request_context(context)
+    return request_context.get_loader(
+        ("relation", key, get_queryset_signature(queryset), relation_name, parent_name),
+        lambda: RelationLoader(
+            queryset, relation_name, parent_name, request_context.get_cache("siblings")
+        ),
+    )
+
+
+def register_siblings(siblings, objects):
+    """
+    Register listed objects as siblings in `siblings`, so the relations of nested batched
+    resolvers are loaded for all of them at once.
+    """
+    for obj in objects:
+        siblings[id(obj)] = objects
+
+
+def get_siblings(context):
+    return get_request_context(context).get_cache("siblings")
+
+
+def get_entity_representations(info):
+    """
+    Return the representations passed to the `_entities` field resolved with `info`, empty
+    when resolving another field.
+    """
+    parent_type = getattr(info, "parent_type", None)
+    field = (getattr(parent_type, "fields", None) or {}).get(info.field_name)
+    if field is None or "representations" not in field.args:
+        return []
+    arguments = get_argument_values(field, info.field_nodes[0], info.variable_values)
+    return arguments.get("representations") or []
+
+
+def get_load_dispatcher(context):
+    return get_request_context(context).get_loader(LoadDispatcher, LoadDispatcher)
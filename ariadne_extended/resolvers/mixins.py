@@ -3,7 +3,14 @@ Mixins that are in DRF serializers and resolver data
 """
 import enum
 
+from django.db import DEFAULT_DB_ALIAS, connections, router, transaction
 from django.db.models.deletion import IntegrityError, ProtectedError
+from rest_framework.serializers import ListSerializer, ModelSerializer
+from rest_framework.utils import model_meta
+
+from ..response_cache import invalidate_model
+from .bulk import validate_many
+from .normalize import convert_argument_enums
 
 
 class ListModelMixin:
@@ -14,12 +21,21 @@ class ListModelMixin:
     pagination_class = None
 
     def list(self, request, *args, **kwargs):
+        # batched resolvers load nested lists for every sibling parent at once
+        if self.paginator is None and self.is_batched():
+            return self.load_list()
+
         queryset = self.get_queryset()
 
         page = self.paginate_queryset(queryset)
         if page is not None:
+            if self.is_batched():
+                # nested batched resolvers load the relations of the whole page at once
+                self.register_listed_objects(list(page))
+            self.check_objects_permissions(self.info, page)
             return page
 
+        self.check_objects_permissions(self.info, queryset)
         return queryset
 
     @property
@@ -47,8 +63,8 @@ class InputMixin:
     """
     Take an input operation argument and return the data.
 
-    This mixin is pretty limited, nested enums under other input types will not be
-    converted into their value. FIX/CHANGE
+    Enums are converted into their value at any depth of the input, unless `convert_enums`
+    is `False`.
     """
 
     input_arg = "input"
@@ -63,13 +79,10 @@ class InputMixin:
         # May be able to be moved to a serializer save point for models?
         # As having access to the enum may be useful in other contexts
         if self.convert_enums:
-            if isinstance(input_data, dict):
-                self.process_dict(input_data)
-
-            if isinstance(input_data, list):
-                for data in input_data:
-                    if isinstance(data, dict):
-                        data = self.process_dict(data)
+            # only the parts of the input whose type holds an enum are walked
+            input_data = convert_argument_enums(
+                getattr(self, "info", None), self.input_arg, input_data
+            )
 
         return input_data
 
@@ -81,8 +94,20 @@ class InputMixin:
 
 
 class CreateModelMixin(InputMixin):
+    """
+    Create a model instance, or with `bulk` the instances of a list input at once.
+    """
+
+    # Create the items of list inputs with `bulk_create`, see `bulk_create`
+    bulk = False
+    bulk_create_batch_size = None
+
     def create(self, parent, *args, **kwargs):
-        serializer = self.get_serializer(data=self.get_input_data())
+        input_data = self.get_input_data()
+        if isinstance(input_data, list) and self.config.get("bulk", self.bulk):
+            return self.bulk_create(input_data)
+
+        serializer = self.get_serializer(data=input_data)
         valid = serializer.is_valid(raise_exception=False)
         if valid:
             obj = self.perform_create(serializer)
@@ -93,6 +118,106 @@ class CreateModelMixin(InputMixin):
     def perform_create(self, serializer):
         return serializer.save()
 
+    def bulk_create(self, input_data):
+        """
+        Validate the items with a `many=True` serializer and create the valid ones with
+        `bulk_create` in a single transaction. Returns a payload per item, in input order.
+
+        Uniqueness and related objects are checked with one query per field for all items, see
+        `bulk.validate_many`. `bulk_create` doesn't call `save()` nor send the `pre_save` and
+        `post_save` signals, serializers overriding `create` create each item with it instead,
+        and resolvers overriding `perform_create` save each item with it.
+        """
+        serializer = self.get_serializer(data=input_data, many=True)
+        results = validate_many(serializer, input_data)
+        if self.overrides_perform_create():
+            return self.perform_each_create(serializer, input_data, results)
+
+        valid = [validated_data for validated_data, errors in results if not errors]
+        created = iter(self.perform_bulk_create(serializer, valid) if valid else ())
+
+        payloads = []
+        for item, (validated_data, errors) in zip(input_data, results):
+            if errors:
+                payloads.append(dict(success=False, object=item, errors=errors))
+            else:
+                payloads.append(dict(success=True, object=next(created), errors={}))
+        return payloads
+
+    def perform_each_create(self, serializer, input_data, results):
+        """
+        Create the valid items one by one with `perform_create`, in a single transaction.
+        """
+        payloads = []
+        with transaction.atomic(using=self.get_bulk_database(serializer)):
+            for item, (validated_data, errors) in zip(input_data, results):
+                if errors:
+                    payloads.append(dict(success=False, object=item, errors=errors))
+                    continue
+                item_serializer = self.get_serializer(data=item)
+                valid = item_serializer.is_valid(raise_exception=False)
+                obj = self.perform_create(item_serializer) if valid else item_serializer.data
+                payloads.append(dict(success=valid, object=obj, errors=item_serializer.errors))
+        return payloads
+
+    def perform_bulk_create(self, serializer, validated_data):
+        using = self.get_bulk_database(serializer)
+        if self.overrides_create(serializer):
+            # such as nested writes, the items are created one by one as DRF does
+            with transaction.atomic(using=using):
+                return serializer.create(validated_data)
+
+        model = serializer.child.Meta.model
+        relations = model_meta.get_field_info(model).relations
+        instances = []
+        for data in validated_data:
+            assert not any(
+                relations[name].to_many for name in data if name in relations
+            ), "Bulk creation of '%s' doesn't support many to many relations." % (
+                model._meta.object_name
+            )
+            instances.append(model(**data))
+
+        with transaction.atomic(using=using):
+            if connections[using].features.can_return_rows_from_bulk_insert or all(
+                instance.pk is not None for instance in instances
+            ):
+                created = model._default_manager.bulk_create(
+                    instances,
+                    batch_size=self.config.get(
+                        "bulk_create_batch_size", self.bulk_create_batch_size
+                    ),
+                )
+            else:
+                # the database doesn't return the primary keys of bulk inserts, such as
+                # SQLite and MySQL, the objects are inserted one by one to get them
+                for instance in instances:
+                    instance.save(force_insert=True, using=using)
+                created = instances
+        # cached responses are invalidated by `post_save`, which isn't sent
+        invalidate_model(model)
+        return created
+
+    @staticmethod
+    def get_bulk_model(serializer):
+        return getattr(getattr(serializer.child, "Meta", None), "model", None)
+
+    def get_bulk_database(self, serializer):
+        model = self.get_bulk_model(serializer)
+        return router.db_for_write(model) if model is not None else DEFAULT_DB_ALIAS
+
+    @staticmethod
+    def overrides_create(serializer):
+        # serializers other than model serializers can only create items with `create`
+        return (
+            type(serializer).create is not ListSerializer.create
+            or not isinstance(serializer.child, ModelSerializer)
+            or type(serializer.child).create is not ModelSerializer.create
+        )
+
+    def overrides_perform_create(self):
+        return type(self).perform_create is not CreateModelMixin.perform_create
+
 
 class UpdateModelMixin:
     """
@@ -1,8 +1,12 @@
+from copy import copy
+
 from django.contrib.admin.options import get_content_type_for_model
 from django.db import models
+from django.utils.decorators import classonlymethod
 
 from . import exceptions
 from ..filters import FilterMixin
+from ..response_cache import track_model_access
 from .mixins import (
     CreateModelMixin,
     DestroyModelMixin,
@@ -10,6 +14,16 @@ from .mixins import (
     UpdateModelMixin,
 )
 from .abc import Resolver
+from .normalize import decamelize
+from .loaders import (
+    PendingLoad,
+    get_entity_representations,
+    get_load_dispatcher,
+    get_model_loader,
+    get_relation_loader,
+    get_siblings,
+    register_siblings,
+)
 
 
 class GenericModelResolver(Resolver):
@@ -21,6 +35,15 @@ class GenericModelResolver(Resolver):
     lookup_arg = None
     lookup_field = "pk"
     nested_field_name = None
+    # Load retrieved objects, and nested lists, with the other lookups of the request, see
+    # `loaders`
+    batched = False
+    # set while building the queryset loaded for every sibling parent
+    loading_nested = False
+    # set while building the queryset shared by the references of a type
+    loading_references = False
+    # `QueryOptimizer` applied to querysets, see `optimize_queryset`
+    optimizer = None
 
     def get_queryset(self):
         assert self.queryset is not None, (
@@ -32,10 +55,30 @@ class GenericModelResolver(Resolver):
         if isinstance(queryset, models.query.QuerySet):
             # Ensure queryset is re-evaluated on each request.
             queryset = queryset.all()
-        if self.config.get("nested", False):
+        if self.config.get("nested", False) and not self.loading_nested:
             queryset = self.filter_nested_queryset(queryset).all()
+        else:
+            queryset = self.optimize_queryset(queryset)
+        # Responses built from this queryset are invalidated when the model changes
+        track_model_access(getattr(queryset, "model", None))
         return queryset
 
+    def optimize_queryset(self, queryset):
+        """
+        Optimize the queryset for the fields selected by the client, nested querysets are
+        left as is since they may come from the prefetched objects of their parent.
+        """
+        optimizer = self.config.get("optimizer", self.optimizer)
+        if optimizer is None or not isinstance(queryset, models.query.QuerySet):
+            return queryset
+        return optimizer.optimize(queryset, self.info, self.get_required_fields())
+
+    def get_required_fields(self):
+        """
+        Model fields read by the resolver itself, always loaded by the optimizer.
+        """
+        return ()
+
     def filter_nested_queryset(self, queryset):
         # see if we can just use the info context and the name of the resolver field
         # to reverse the relation, fallback on parent_name
@@ -102,8 +145,171 @@ class GenericModelResolver(Resolver):
 
         return obj
 
+    def is_batched(self):
+        return self.config.get("batched", self.batched)
+
+    def get_nested_loader(self, queryset):
+        """
+        Returns the request scoped loader of the objects nested in the parents of this resolver.
+        """
+        return get_relation_loader(
+            self.info.context,
+            (self.__class__, self.parent._meta.label_lower),
+            queryset,
+            self.config.get("nested_field_name", self.nested_field_name) or self.info.field_name,
+            self.config.get("parent_name", None),
+        )
+
+    def load_list(self):
+        """
+        Returns the listed objects, loaded with those of every sibling parent when nested.
+
+        Filters are applied to the queryset shared by the siblings, the objects listed are
+        registered as the siblings of the next nested level.
+        """
+        if not self.config.get("nested", False):
+            objects = list(self.get_queryset())
+            self.register_listed_objects(objects)
+            return self.check_loaded_list(objects)
+
+        self.loading_nested = True
+        try:
+            queryset = self.get_queryset()
+        finally:
+            self.loading_nested = False
+        loader = self.get_nested_loader(queryset)
+
+        if self.config.get("asynchronous", False):
+            return PendingLoad(
+                loader, self.parent, self.check_loaded_list if self.get_permissions() else None
+            )
+        return self.check_loaded_list(loader.load(self.parent))
+
+    def register_listed_objects(self, objects):
+        """
+        Register the objects listed by this resolver, such as a page, as the siblings of the
+        parents of the next nested level.
+        """
+        register_siblings(get_siblings(self.info.context), objects)
+
+    def check_loaded_list(self, objects):
+        # May raise a permission denied
+        self.check_objects_permissions(self.info, objects)
+        return objects
+
+    def get_object_loader(self):
+        """
+        Returns the request scoped loader of the objects looked up by this resolver.
+        """
+        self.loading_references = self.config.get("reference", False)
+        try:
+            queryset = self.get_queryset()
+        finally:
+            self.loading_references = False
+        return get_model_loader(
+            self.info.context, self.__class__, queryset, self.get_lookup_field()
+        )
+
+    def load_object(self):
+        """
+        Returns a singular object as `get_object`, loaded by the loader of the request.
+
+        Sync resolvers of the fields of listed objects fetch the lookups of every sibling
+        parent at once, see `get_sibling_lookup_values`, other lookups are fetched when first
+        requested and cached for the request. Async resolvers return a `PendingLoad` instead,
+        the object is fetched with the lookups of the other resolvers running concurrently.
+        """
+        loader = self.get_object_loader()
+        value = self.get_lookup_filter_kwargs()[self.get_lookup_field()]
+
+        if self.config.get("asynchronous", False):
+            return PendingLoad(
+                loader, value, self.check_loaded_object if self.get_permissions() else None
+            )
+        if not loader.is_loaded(value):
+            # fields are resolved one after the other, the first reference of its type, or the
+            # field of the first listed parent, fetches every other one
+            if self.config.get("reference", False):
+                loader.prefetch([value] + self.get_reference_lookup_values())
+            else:
+                loader.prefetch([value] + self.get_sibling_lookup_values())
+        return self.check_loaded_object(loader.load(value))
+
+    def get_sibling_lookup_values(self):
+        """
+        Returns the lookup values of the field for the siblings of the parent, the objects
+        listed along with it by a batched list resolver.
+        """
+        siblings = get_siblings(self.info.context).get(id(self.parent), ())
+        lookup_field = self.get_lookup_field()
+        values = []
+        for sibling in siblings:
+            if sibling is self.parent:
+                continue
+            resolver = copy(self)
+            resolver.parent = sibling
+            try:
+                values.append(resolver.get_lookup_filter_kwargs()[lookup_field])
+            except Exception:
+                # looked up, and reported, when the field of the sibling is resolved
+                continue
+        return values
+
+    def get_reference_lookup_values(self):
+        """
+        Returns the lookup values of the representations, passed to the `_entities` field,
+        having the type of the reference being resolved.
+        """
+        typename = self.operation_args[0].get("__typename")
+        lookup_arg = self.get_lookup_arg() or self.get_lookup_field()
+        values = []
+        for representation in get_entity_representations(self.info):
+            if representation.get("__typename") != typename:
+                continue
+            data = decamelize(representation)
+            if lookup_arg in data:
+                values.append(data[lookup_arg])
+        return values
+
+    def check_loaded_object(self, obj):
+        # May raise a permission denied
+        if obj:
+            self.check_object_permissions(self.info, obj)
+        return obj
+
+    @classonlymethod
+    def make_async_resolver(cls, sync_resolver, **resolver_config):
+        resolver = super().make_async_resolver(sync_resolver, **resolver_config)
+        if not resolver_config.get("batched", cls.batched):
+            return resolver
+
+        from asgiref.sync import sync_to_async
+
+        thread_sensitive = resolver_config.get("thread_sensitive", cls.thread_sensitive)
+
+        async def batched_resolver(parent, info, *args, **kwargs):
+            dispatcher = get_load_dispatcher(info.context)
+            dispatcher.begin()
+            try:
+                result = await resolver(parent, info, *args, **kwargs)
+                if isinstance(result, PendingLoad):
+                    future = dispatcher.queue(result.loader, result.value)
+            finally:
+                dispatcher.end()
+
+            if not isinstance(result, PendingLoad):
+                return result
+            obj = await future
+            if obj is None or result.resolve is None:
+                return obj
+            return await sync_to_async(result.resolve, thread_sensitive=thread_sensitive)(obj)
+
+        return batched_resolver
+
     # TODO: move out into its own mixin?
     def retrieve(self, parent, *args, **kwargs):
+        if self.is_batched():
+            return self.load_object()
         return self.get_object()
 
 
@@ -0,0 +1,226 @@
+"""
+Conversion of operation arguments to the snake_case names and plain values used by resolvers.
+
+The argument names of each field, and the field names of each input type, are mapped once per
+schema. Arguments are then converted in a single pass without regular expressions, and only
+the parts of an input that may hold an enum are walked to convert enums into their value.
+"""
+import enum
+from functools import lru_cache
+from threading import Lock
+from weakref import WeakKeyDictionary
+
+import humps.main as humps
+from graphql.type import (
+    get_named_type,
+    get_nullable_type,
+    is_enum_type,
+    is_input_object_type,
+    is_list_type,
+)
+
+
+@lru_cache(maxsize=4096)
+def decamelize_name(name):
+    return humps.decamelize(name)
+
+
+def decamelize(value):
+    """
+    Same conversion as `humps.decamelize`, used for values whose type isn't known such as
+    custom scalars.
+    """
+    if isinstance(value, dict):
+        return {decamelize_name(key): decamelize(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [decamelize(item) for item in value]
+    return value
+
+
+def convert_enums(value):
+    """
+    Replace enums by their value at any depth, used for values whose type isn't known.
+    """
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, dict):
+        return {key: convert_enums(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [convert_enums(item) for item in value]
+    return value
+
+
+class ValueNormalizer:
+    """
+    Values of scalar types, which are left untouched besides the keys of dicts.
+    """
+
+    def normalize(self, value):
+        return decamelize(value)
+
+    def convert_enums(self, value):
+        return value
+
+
+class EnumNormalizer(ValueNormalizer):
+    def normalize(self, value):
+        return value
+
+    def convert_enums(self, value):
+        if isinstance(value, enum.Enum):
+            return value.value
+        return value
+
+
+class ListNormalizer(ValueNormalizer):
+    def __init__(self, of_normalizer):
+        self.of_normalizer = of_normalizer
+
+    def normalize(self, value):
+        if isinstance(value, list):
+            normalize = self.of_normalizer.normalize
+            return [None if item is None else normalize(item) for item in value]
+        return self.of_normalizer.normalize(value)
+
+    def convert_enums(self, value):
+        if isinstance(value, list):
+            convert = self.of_normalizer.convert_enums
+            return [None if item is None else convert(item) for item in value]
+        return self.of_normalizer.convert_enums(value)
+
+
+class InputObjectNormalizer(ValueNormalizer):
+    """
+    Values of input object types, and the arguments of a field.
+    """
+
+    def __init__(self):
+        # `{name: (snake_case name, normalizer)}` of each field
+        self.fields = {}
+        # `{snake_case name: normalizer}` of the fields that may hold an enum
+        self.enum_fields = {}
+
+    def normalize(self, value):
+        if not isinstance(value, dict):
+            return decamelize(value)
+        fields = self.fields
+        result = {}
+        for key, item in value.items():
+            field = fields.get(key)
+            if field is None:
+                result[decamelize_name(key)] = decamelize(item)
+            elif item is None:
+                result[field[0]] = None
+            else:
+                result[field[0]] = field[1].normalize(item)
+        return result
+
+    def convert_enums(self, value):
+        if not self.enum_fields or not isinstance(value, dict):
+            return value
+        result = value.copy()
+        for name, normalizer in self.enum_fields.items():
+            item = value.get(name)
+            if item is not None:
+                result[name] = normalizer.convert_enums(item)
+        return result
+
+
+class SchemaNormalizers:
+    """
+    Normalizers of the fields and input types of a schema, built when first needed.
+    """
+
+    def __init__(self):
+        self.fields = {}
+        self.input_types = {}
+        self.lock = Lock()
+
+    def get_field_normalizer(self, parent_type, field_name):
+        key = (parent_type.name, field_name)
+        normalizer = self.fields.get(key)
+        if normalizer is None:
+            with self.lock:
+                normalizer = self.fields.get(key)
+                if normalizer is None:
+                    normalizer = InputObjectNormalizer()
+                    self.add_fields(normalizer, parent_type.fields[field_name].args)
+                    self.fields[key] = normalizer
+        return normalizer
+
+    def add_fields(self, normalizer, fields):
+        for name, field in fields.items():
+            field_normalizer = self.get_type_normalizer(field.type)
+            snake_name = decamelize_name(name)
+            normalizer.fields[name] = (snake_name, field_normalizer)
+            if self.has_enums(field.type):
+                normalizer.enum_fields[snake_name] = field_normalizer
+
+    def get_type_normalizer(self, type_):
+        type_ = get_nullable_type(type_)
+        if is_list_type(type_):
+            return ListNormalizer(self.get_type_normalizer(type_.of_type))
+        if is_enum_type(type_):
+            return EnumNormalizer()
+        if is_input_object_type(type_):
+            normalizer = self.input_types.get(type_.name)
+            if normalizer is None:
+                # registered before adding its fields, input types may reference themselves
+                normalizer = self.input_types[type_.name] = InputObjectNormalizer()
+                self.add_fields(normalizer, type_.fields)
+            return normalizer
+        return ValueNormalizer()
+
+    @staticmethod
+    def has_enums(type_, seen=()):
+        named_type = get_named_type(type_)
+        if is_enum_type(named_type):
+            return True
+        if not is_input_object_type(named_type) or named_type.name in seen:
+            return False
+        seen = seen + (named_type.name,)
+        return any(
+            SchemaNormalizers.has_enums(field.type, seen) for field in named_type.fields.values()
+        )
+
+
+_schemas = WeakKeyDictionary()
+_schemas_lock = Lock()
+
+
+def get_field_normalizer(info):
+    """
+    Return the normalizer of the arguments of the field being resolved, `None` when `info`
+    isn't a `GraphQLResolveInfo`.
+    """
+    schema = getattr(info, "schema", None)
+    parent_type = getattr(info, "parent_type", None)
+    if schema is None or parent_type is None:
+        return None
+    normalizers = _schemas.get(schema)
+    if normalizers is None:
+        with _schemas_lock:
+            normalizers = _schemas.get(schema)
+            if normalizers is None:
+                normalizers = _schemas[schema] = SchemaNormalizers()
+    return normalizers.get_field_normalizer(parent_type, info.field_name)
+
+
+def normalize_arguments(info, arguments):
+    """
+    Convert the argument names, and the field names of input objects, to snake_case.
+    """
+    normalizer = get_field_normalizer(info)
+    if normalizer is None:
+        return decamelize(arguments)
+    return normalizer.normalize(arguments)
+
+
+def convert_argument_enums(info, name, value):
+    """
+    Convert the enums of the normalized argument `name` into their value, at any depth.
+    """
+    normalizer = get_field_normalizer(info)
+    if normalizer is None:
+        return convert_enums(value)
+    return normalizer.convert_enums({name: value})[name]
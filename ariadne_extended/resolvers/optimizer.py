@@ -0,0 +1,262 @@
+"""
+Query optimization from the fields selected by the client.
+
+`QueryOptimizer` maps the GraphQL fields selected under the resolved field, through fragments
+and the `edges { node }` of connections, to the fields and relations of the model. Forward
+relations are joined with `select_related`, many relations are fetched with `prefetch_related`
+and a `Prefetch` queryset optimized the same way, and only the columns of the selected fields
+are loaded. Plans are cached per document and field path, so each document is analyzed once.
+
+Fields computed from other model fields are described with `OptimizationHint`, a field which
+doesn't map to the model and has no hint loads every column.
+"""
+from collections import OrderedDict, namedtuple
+from threading import Lock
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from django.db.models.query import ModelIterable
+from graphql.language import FieldNode, FragmentSpreadNode, InlineFragmentNode, OperationType
+from graphql.type import get_named_type
+
+from .normalize import decamelize_name
+
+# Model fields and lookups a GraphQL field needs, `field` is the model field it maps to when
+# its objects are optimized as those of a model field
+OptimizationHint = namedtuple(
+    "OptimizationHint",
+    ["field", "only", "select_related", "prefetch_related"],
+    defaults=(None, (), (), ()),
+)
+
+
+class OptimizationPlan:
+    def __init__(self):
+        self.only = set()
+        # set when a selected field may read any attribute of the objects
+        self.load_all = False
+        self.select_related = set()
+        # `{lookup: (model, plan)}`, `None` for lookups prefetched as is
+        self.prefetch_related = {}
+
+
+def get_model_field(model, name):
+    """
+    Return the field, or the relation by accessor name such as `book_set`, of a model.
+    """
+    if name in ("id", "pk") and not any(f.name == "id" for f in model._meta.concrete_fields):
+        return model._meta.pk
+    try:
+        return model._meta.get_field(name)
+    except FieldDoesNotExist:
+        pass
+    for field in model._meta.get_fields():
+        if field.auto_created and not field.concrete and field.get_accessor_name() == name:
+            return field
+    return None
+
+
+def get_lookup_name(field):
+    if field.auto_created and not field.concrete:
+        return field.get_accessor_name()
+    return field.name
+
+
+def get_relation_fields(field):
+    """
+    Fields of related objects Django needs to attach prefetched objects to their parent.
+    """
+    if hasattr(field, "object_id_field_name"):
+        # generic relation
+        return {field.object_id_field_name, field.content_type_field_name}
+    if field.one_to_many:
+        return {field.field.name}
+    return set()
+
+
+def ensure_loaded(queryset, names):
+    """
+    Add `names` to the fields loaded by a queryset restricted with `only()`.
+    """
+    loaded, defer = queryset.query.deferred_loading
+    if defer or not loaded or not names:
+        return queryset
+    return queryset.only(*loaded, *names)
+
+
+class QueryOptimizer:
+    """
+    Optimizes querysets of model resolvers for the fields selected under the resolved field,
+    set it as the `optimizer` attribute of a `GenericModelResolver` to enable it.
+
+    `hints` are `{type name: {field name: OptimizationHint}}` for computed fields.
+    """
+
+    def __init__(self, hints=None, maxsize=1000):
+        self.hints = hints or {}
+        self.maxsize = maxsize
+        self._plans = OrderedDict()
+        self._lock = Lock()
+
+    def optimize(self, queryset, info, fields=()):
+        """
+        Return `queryset` optimized for the selection of the field resolved with `info`,
+        `fields` are model fields always loaded such as those read by the resolver.
+        """
+        if queryset._iterable_class is not ModelIterable:
+            return queryset
+        plan = self.get_plan(queryset.model, info)
+        # objects saved by mutations must not have deferred fields
+        only = info.operation.operation != OperationType.MUTATION
+        return self.apply(queryset, plan, fields, only)
+
+    def get_plan(self, model, info):
+        query = info.operation.loc.source.body if info.operation.loc else None
+        path = []
+        key = info.path
+        while key:
+            if isinstance(key.key, str):
+                path.append(key.key)
+            key = key.prev
+        key = (info.schema, query, tuple(path), model._meta.label_lower)
+        if query is not None and self.maxsize:
+            with self._lock:
+                plan = self._plans.get(key)
+                if plan is not None:
+                    self._plans.move_to_end(key)
+                    return plan
+
+        plan = OptimizationPlan()
+        type_, fields = self.get_fields(info, info.return_type, info.field_nodes)
+        self.plan_fields(info, plan, model, fields)
+
+        if query is not None and self.maxsize:
+            with self._lock:
+                self._plans[key] = plan
+                while len(self._plans) > self.maxsize:
+                    self._plans.popitem(last=False)
+        return plan
+
+    def get_fields(self, info, field_type, field_nodes):
+        """
+        Return the type of the objects of a field and the `(parent type, field node)` of the
+        fields selected on them, the objects of connections being their nodes.
+        """
+        type_ = get_named_type(field_type)
+        fields = []
+        for node in field_nodes:
+            if node.selection_set:
+                self.collect_fields(info, type_, node.selection_set, fields)
+
+        type_fields = getattr(type_, "fields", None) or {}
+        if "edges" in type_fields:
+            edge_type = get_named_type(type_fields["edges"].type)
+            if "node" in (getattr(edge_type, "fields", None) or {}):
+                edges = [node for _, node in fields if node.name.value == "edges"]
+                _, edge_fields = self.get_fields(info, edge_type, edges)
+                nodes = [node for _, node in edge_fields if node.name.value == "node"]
+                return self.get_fields(info, edge_type.fields["node"].type, nodes)
+        return type_, fields
+
+    def collect_fields(self, info, type_, selection_set, fields, visited=()):
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                fields.append((type_, selection))
+            elif isinstance(selection, InlineFragmentNode):
+                fragment_type = type_
+                if selection.type_condition:
+                    fragment_type = info.schema.get_type(selection.type_condition.name.value)
+                self.collect_fields(info, fragment_type, selection.selection_set, fields, visited)
+            elif isinstance(selection, FragmentSpreadNode):
+                name = selection.name.value
+                fragment = info.fragments.get(name)
+                if fragment is None or name in visited:
+                    continue
+                fragment_type = info.schema.get_type(fragment.type_condition.name.value)
+                self.collect_fields(
+                    info, fragment_type, fragment.selection_set, fields, visited + (name,)
+                )
+
+    def plan_fields(self, info, plan, model, fields, prefix=""):
+        for parent_type, node in fields:
+            name = node.name.value
+            field_def = (getattr(parent_type, "fields", None) or {}).get(name)
+            if field_def is None:
+                continue
+
+            hint = self.hints.get(parent_type.name, {}).get(name)
+            field_name = decamelize_name(name)
+            if hint is not None:
+                plan.only.update(prefix + lookup for lookup in hint.only)
+                plan.select_related.update(prefix + lookup for lookup in hint.select_related)
+                for lookup in hint.prefetch_related:
+                    plan.prefetch_related.setdefault(prefix + lookup, None)
+                if hint.field is None:
+                    continue
+                field_name = hint.field
+            elif getattr(field_def.resolve, "resolver_class", None) is not None:
+                # class based resolvers load their own objects
+                continue
+
+            model_field = get_model_field(model, field_name)
+            if model_field is None:
+                plan.load_all = True
+            else:
+                self.plan_field(info, plan, model_field, field_def, node, prefix)
+
+    def plan_field(self, info, plan, model_field, field_def, node, prefix):
+        lookup = prefix + get_lookup_name(model_field)
+        if hasattr(model_field, "fk_field"):
+            # generic foreign key
+            plan.only.update((prefix + model_field.ct_field, prefix + model_field.fk_field))
+            plan.prefetch_related.setdefault(lookup, None)
+        elif not model_field.is_relation:
+            plan.only.add(lookup)
+        elif model_field.many_to_one or model_field.one_to_one:
+            if model_field.concrete:
+                plan.only.add(lookup)
+            if node.selection_set:
+                plan.select_related.add(lookup)
+                _, fields = self.get_fields(info, field_def.type, [node])
+                self.plan_fields(info, plan, model_field.related_model, fields, lookup + "__")
+        else:
+            related_plan = OptimizationPlan()
+            _, fields = self.get_fields(info, field_def.type, [node])
+            self.plan_fields(info, related_plan, model_field.related_model, fields)
+            related_plan.only.update(get_relation_fields(model_field))
+            plan.prefetch_related[lookup] = (model_field.related_model, related_plan)
+
+    def apply(self, queryset, plan, fields=(), only=True):
+        if plan.select_related:
+            queryset = queryset.select_related(*sorted(plan.select_related))
+
+        seen = {
+            getattr(lookup, "prefetch_to", lookup) for lookup in queryset._prefetch_related_lookups
+        }
+        lookups = []
+        for lookup, prefetch in sorted(plan.prefetch_related.items()):
+            if lookup in seen:
+                continue
+            if prefetch is None:
+                lookups.append(lookup)
+            else:
+                model, related_plan = prefetch
+                lookups.append(
+                    Prefetch(
+                        lookup, queryset=self.apply(model._default_manager.all(), related_plan)
+                    )
+                )
+        if lookups:
+            queryset = queryset.prefetch_related(*lookups)
+
+        loaded, defer = queryset.query.deferred_loading
+        if (
+            only
+            and not plan.load_all
+            and plan.only
+            and not loaded
+            and defer
+            and not any("__" in name for name in fields)
+        ):
+            queryset = queryset.only(*sorted(plan.only | set(fields)))
+        return queryset
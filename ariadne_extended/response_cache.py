@@ -0,0 +1,201 @@
+"""
+Whole response cache for query operations.
+
+Responses are stored in a Django cache backend keyed on the query, variables, operation name
+and a cache scope. Each entry is tagged with the models whose querysets were used while
+resolving it, saving or deleting an instance of one of those models invalidates the entry.
+
+The version of each tag is read when its model is first queried by the operation, a change
+committed while the operation is executing makes the entry stale as soon as it is stored.
+"""
+import hashlib
+import json
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.core.cache import caches
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from graphql.language import OperationType
+from graphql.utilities import get_operation_ast
+
+from .context import get_request
+
+_accessed_models = ContextVar("accessed_models", default=None)
+
+
+class AccessedModels(dict):
+    """
+    Tag versions of the models queried by an operation, `{label: version}`, versions are
+    `None` when the operation isn't cached.
+    """
+
+    def __init__(self, response_cache=None):
+        super().__init__()
+        self.response_cache = response_cache
+
+    def add(self, label):
+        if label not in self:
+            self[label] = (
+                None if self.response_cache is None else self.response_cache.get_tag_version(label)
+            )
+
+
+def track_model_access(model):
+    """
+    Record that a model was queried by the operation being executed, called by resolvers
+    when building their queryset, before its objects are fetched.
+    """
+    models = _accessed_models.get()
+    if models is not None and model is not None:
+        models.add(model._meta.label_lower)
+
+
+@contextmanager
+def tracking_model_access(response_cache=None):
+    """
+    Track the models queried within the block, with the tag versions of `response_cache`
+    when the result is cached.
+    """
+    models = AccessedModels(response_cache)
+    token = _accessed_models.set(models)
+    try:
+        yield models
+    finally:
+        _accessed_models.reset(token)
+
+
+def anonymous_scope(request):
+    """
+    Every user shares the same cached responses.
+    """
+    return "anonymous"
+
+
+def user_scope(context_value):
+    """
+    Responses are cached per user, they aren't cached without a request user.
+    """
+    user = getattr(get_request(context_value), "user", None)
+    if user is None:
+        return None
+    if not user.is_authenticated:
+        return "anonymous"
+    return "user:%s" % user.pk
+
+
+def group_scope(context_value):
+    """
+    Users of the same groups share cached responses, they aren't cached without a request
+    user.
+    """
+    user = getattr(get_request(context_value), "user", None)
+    if user is None:
+        return None
+    if not user.is_authenticated:
+        return "anonymous"
+    return "groups:%s" % ",".join(
+        str(pk) for pk in sorted(user.groups.values_list("pk", flat=True))
+    )
+
+
+class ResponseCache:
+    """
+    Cache of successful query responses, mutations always bypass the cache.
+
+    `scope` is a callable receiving the context value, usually the request, and returning a
+    string partitioning the cached responses, see `anonymous_scope`, `user_scope` and
+    `group_scope`. Responses aren't cached when it returns `None`.
+    """
+
+    key_prefix = "graphql-response"
+
+    def __init__(self, cache_alias="default", timeout=300, scope=user_scope):
+        self.cache_alias = cache_alias
+        self.timeout = timeout
+        self.scope = scope
+        connect_invalidation_signals(cache_alias)
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    @staticmethod
+    def is_cacheable(document, operation_name=None):
+        operation = get_operation_ast(document, operation_name)
+        return operation is not None and operation.operation == OperationType.QUERY
+
+    def get_key(self, query, variables, operation_name, context_value):
+        """
+        Return the key of the response, `None` when it isn't cached for the scope.
+        """
+        scope = self.scope(context_value)
+        if scope is None:
+            return None
+        key = json.dumps(
+            [query, variables or {}, operation_name, scope],
+            sort_keys=True,
+            default=str,
+        )
+        return "%s:%s" % (self.key_prefix, hashlib.sha256(key.encode("utf-8")).hexdigest())
+
+    @classmethod
+    def get_tag_key(cls, label):
+        return "%s:tag:%s" % (cls.key_prefix, label)
+
+    def get_tag_version(self, label):
+        return self.cache.get(self.get_tag_key(label), 0)
+
+    def get_tag_versions(self, labels):
+        keys = {self.get_tag_key(label): label for label in labels}
+        versions = self.cache.get_many(list(keys))
+        return {label: versions.get(key, 0) for key, label in keys.items()}
+
+    def get(self, key):
+        """
+        Return the cached response, `None` when missing or invalidated.
+        """
+        entry = self.cache.get(key)
+        if entry is None:
+            return None
+        versions, response = entry
+        if versions and self.get_tag_versions(versions) != versions:
+            return None
+        return response
+
+    def set(self, key, response, versions):
+        """
+        Store a response tagged with `{label: version}` of each model it queried, the versions
+        being read before the models were queried, see `tracking_model_access`.
+        """
+        self.cache.set(key, (dict(versions), response), self.timeout)
+
+    @classmethod
+    def invalidate(cls, model, cache_alias="default"):
+        cache = caches[cache_alias]
+        key = cls.get_tag_key(model._meta.label_lower)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, 1, None)
+
+
+_cache_aliases = set()
+
+
+def invalidate_model(sender, **kwargs):
+    for cache_alias in _cache_aliases:
+        ResponseCache.invalidate(sender, cache_alias)
+
+
+def invalidate_m2m(sender, instance, model, action, **kwargs):
+    if action.startswith("post_"):
+        for cache_alias in _cache_aliases:
+            ResponseCache.invalidate(instance.__class__, cache_alias)
+            ResponseCache.invalidate(model, cache_alias)
+
+
+def connect_invalidation_signals(cache_alias="default"):
+    _cache_aliases.add(cache_alias)
+    post_save.connect(invalidate_model, dispatch_uid="ariadne_extended_response_cache_save")
+    post_delete.connect(invalidate_model, dispatch_uid="ariadne_extended_response_cache_delete")
+    m2m_changed.connect(invalidate_m2m, dispatch_uid="ariadne_extended_response_cache_m2m")
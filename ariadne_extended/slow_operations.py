@@ -0,0 +1,218 @@
+"""
+Log of slow operations.
+
+Views with a `slow_operation_log` time every resolver and SQL query of the operations they
+execute, only the raw timings are kept while executing. When an operation takes longer than
+the threshold a single record is logged with the operation name, a hash of the normalized
+document, the redacted variables, the slowest resolver paths and the SQL queries.
+"""
+import hashlib
+import heapq
+import logging
+from contextlib import ExitStack, contextmanager, nullcontext
+from contextvars import ContextVar
+from inspect import isawaitable
+from time import perf_counter
+from typing import Any
+
+from ariadne.contrib.tracing.utils import should_trace
+from ariadne.types import Extension, Resolver
+from django.db import connections
+from graphql import GraphQLError, GraphQLResolveInfo, parse, print_ast
+
+_profile = ContextVar("slow_operation_profile", default=None)
+
+REDACTED = "[REDACTED]"
+DEFAULT_REDACTED_VARIABLES = ("password", "secret", "token", "authorization", "key")
+
+
+class OperationProfile:
+    """
+    Raw timings of the resolvers and SQL queries of an operation.
+    """
+
+    def __init__(self, max_queries=50):
+        self.max_queries = max_queries
+        # `(info, duration)` of each resolver
+        self.resolvers = []
+        # `(sql, duration)` of the first `max_queries` queries
+        self.queries = []
+        self.query_count = 0
+        self.query_time = 0.0
+
+    def track_query(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = perf_counter() - start
+            self.query_count += 1
+            self.query_time += duration
+            if len(self.queries) < self.max_queries:
+                self.queries.append((sql, duration))
+
+
+class SlowOperationExtension(Extension):
+    """
+    Times resolvers of the operations being profiled, added to the extensions of views with
+    a `slow_operation_log`.
+    """
+
+    async def resolve(self, next_: Resolver, parent: Any, info: GraphQLResolveInfo, **kwargs):
+        profile = _profile.get()
+        if profile is None or not should_trace(info):
+            result = next_(parent, info, **kwargs)
+            if isawaitable(result):
+                result = await result
+            return result
+
+        start = perf_counter()
+        try:
+            result = next_(parent, info, **kwargs)
+            if isawaitable(result):
+                result = await result
+            return result
+        finally:
+            profile.resolvers.append((info, perf_counter() - start))
+
+
+class SlowOperationExtensionSync(SlowOperationExtension):
+    def resolve(self, next_: Resolver, parent: Any, info: GraphQLResolveInfo, **kwargs):
+        profile = _profile.get()
+        if profile is None or not should_trace(info):
+            return next_(parent, info, **kwargs)
+
+        start = perf_counter()
+        try:
+            return next_(parent, info, **kwargs)
+        finally:
+            profile.resolvers.append((info, perf_counter() - start))
+
+
+class SlowOperationLog:
+    """
+    Logs operations taking longer than `threshold` seconds to the `logger`.
+
+    Variables whose name contains one of `redacted_variables` are replaced, at any depth, set
+    `log_variables` to `False` to leave them out entirely.
+    """
+
+    def __init__(
+        self,
+        threshold=1.0,
+        top_resolvers=10,
+        max_queries=50,
+        redacted_variables=DEFAULT_REDACTED_VARIABLES,
+        log_variables=True,
+        logger="ariadne_extended.slow_operations",
+    ):
+        self.threshold = threshold
+        self.top_resolvers = top_resolvers
+        self.max_queries = max_queries
+        self.redacted_variables = tuple(name.lower() for name in redacted_variables)
+        self.log_variables = log_variables
+        self.logger = logging.getLogger(logger)
+
+    @contextmanager
+    def profile(self, query, variables=None, operation_name=None, track_db=True):
+        """
+        Profile the operation executed within the block.
+        """
+        profile = OperationProfile(self.max_queries)
+        token = _profile.set(profile)
+        with ExitStack() as stack:
+            if track_db:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(profile.track_query))
+            start = perf_counter()
+            try:
+                yield profile
+            finally:
+                duration = perf_counter() - start
+                _profile.reset(token)
+        if duration >= self.threshold:
+            self.log(self.get_record(profile, duration, query, variables, operation_name))
+
+    def log(self, record):
+        self.logger.warning(
+            "Slow GraphQL operation %s took %.3fs",
+            record["operationName"] or "anonymous",
+            record["duration"],
+            extra={"graphql_operation": record},
+        )
+
+    def get_record(self, profile, duration, query, variables=None, operation_name=None):
+        record = {
+            "operationName": operation_name,
+            "documentHash": self.get_document_hash(query),
+            "duration": duration,
+            "resolvers": self.get_slowest_resolvers(profile.resolvers),
+            "sql": {
+                "count": profile.query_count,
+                "duration": profile.query_time,
+                "queries": [{"sql": sql, "duration": time} for sql, time in profile.queries],
+            },
+        }
+        if self.log_variables:
+            record["variables"] = self.redact(variables or {})
+        return record
+
+    @staticmethod
+    def get_document_hash(query):
+        """
+        Hash of the document ignoring formatting and comments, so every request of the same
+        operation gets the same hash.
+        """
+        if not isinstance(query, str):
+            return None
+        try:
+            query = print_ast(parse(query, no_location=True))
+        except GraphQLError:
+            pass
+        return hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+    def get_slowest_resolvers(self, resolvers):
+        """
+        Aggregate resolvers by path, without list indexes, and return the slowest ones.
+        """
+        paths = {}
+        for info, duration in resolvers:
+            keys = []
+            path = info.path
+            while path:
+                if isinstance(path.key, str):
+                    keys.append(path.key)
+                path = path.prev
+            path = ".".join(reversed(keys))
+            entry = paths.get(path)
+            if entry is None:
+                paths[path] = {"path": path, "count": 1, "duration": duration, "max": duration}
+            else:
+                entry["count"] += 1
+                entry["duration"] += duration
+                entry["max"] = max(entry["max"], duration)
+        return heapq.nlargest(self.top_resolvers, paths.values(), key=lambda e: e["duration"])
+
+    def redact(self, value):
+        if isinstance(value, dict):
+            return {
+                key: REDACTED if self.is_redacted(key) else self.redact(item)
+                for key, item in value.items()
+            }
+        if isinstance(value, list):
+            return [self.redact(item) for item in value]
+        return value
+
+    def is_redacted(self, name):
+        name = str(name).lower()
+        return any(redacted in name for redacted in self.redacted_variables)
+
+
+def profile(slow_operation_log, query, variables=None, operation_name=None, track_db=True):
+    """
+    Shortcut profiling an operation with `slow_operation_log`, which may be `None` when
+    disabled.
+    """
+    if slow_operation_log is None:
+        return nullcontext()
+    return slow_operation_log.profile(query, variables, operation_name, track_db)
@@ -0,0 +1,497 @@
+"""
+Throttles counting GraphQL requests in a Django cache backend.
+
+Counters are updated with the atomic `add` and `incr` of the cache, never read and written
+back, so concurrent processes don't lose updates. `FixedWindowThrottle` counts requests per
+window, `TokenBucketThrottle` lets clients burst up to a capacity refilled at the rate.
+
+A throttle is evaluated once per operation, or once per top level field, whichever resolver
+checks it first: nested fields of the same operation reuse the outcome. Throttled resolutions
+raise `Throttled`, whose error carries the `retryAfter` seconds in its extensions.
+
+`QueryCostThrottle` charges operations their estimated cost, see `ariadne_extended.cost`,
+against a budget of cost points per window. `QueryCostExtension` reports the remaining budget
+in the response extensions, and may correct the charge with the objects actually resolved.
+"""
+import math
+import re
+import time
+from collections.abc import Sized
+from contextvars import ContextVar
+from inspect import isawaitable
+from threading import Lock, local
+from typing import Any
+
+from ariadne.types import Extension, Resolver
+from django.conf import settings
+from django.core.cache import caches
+from graphql import GraphQLError, GraphQLResolveInfo
+from graphql.language import DocumentNode
+
+from .context import find_request_context, get_request
+from .cost import QueryCostValidator
+from .resolvers.exceptions import Throttled
+
+DURATIONS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+# period of a rate, such as `min` or `5s`
+RATE_PERIOD = re.compile(r"^(\d*)([smhd])")
+# budget charged by `QueryCostThrottle` for the execution of the current operation
+_query_cost = ContextVar("query_cost", default=None)
+
+
+def parse_rate(rate):
+    """
+    Return the `(number of requests, duration in seconds)` of a rate such as `100/min` or
+    `10/5s`, `(None, None)` when the rate is `None`.
+    """
+    if rate is None:
+        return (None, None)
+    num, period = rate.split("/")
+    match = RATE_PERIOD.match(period)
+    if match is None:
+        raise ValueError("Invalid throttle rate %r" % rate)
+    multiplier, unit = match.groups()
+    return (int(num), int(multiplier or 1) * DURATIONS[unit])
+
+
+def add_or_incr(cache, key, delta, timeout):
+    """
+    Atomically add `delta` to the counter `key` and return its value, the counter is created
+    with `timeout` when missing.
+    """
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        pass
+    if cache.add(key, delta, timeout):
+        return delta
+    # added by another process in between
+    return cache.incr(key, delta)
+
+
+class LocalReservations:
+    """
+    Requests reserved in batches from shared counters and granted locally, so a process only
+    updates the cache once per batch.
+    """
+
+    def __init__(self, maxsize=1000):
+        self.maxsize = maxsize
+        # `{key: (expires, remaining)}`, `remaining` is `None` once the counter is exhausted
+        self.reservations = {}
+        self.lock = Lock()
+
+    def take(self, key):
+        """
+        Grant a reserved request, return `None` when more requests must be reserved and
+        `False` when the counter is exhausted.
+        """
+        with self.lock:
+            expires, remaining = self.reservations.get(key, (0, 0))
+            if expires <= time.time():
+                return None
+            if remaining is None:
+                return False
+            if not remaining:
+                return None
+            self.reservations[key] = (expires, remaining - 1)
+            return True
+
+    def add(self, key, expires, remaining):
+        with self.lock:
+            now = time.time()
+            if len(self.reservations) >= self.maxsize:
+                self.reservations = {
+                    k: value for k, value in self.reservations.items() if value[0] > now
+                }
+            if len(self.reservations) < self.maxsize:
+                self.reservations[key] = (expires, remaining)
+
+
+local_reservations = LocalReservations()
+
+
+class GraphQLThrottle:
+    """
+    Base class of the throttles of resolvers, used in `throttle_classes`. Subclasses implement
+    `consume`.
+
+    `rate` is the number of requests per period, eg. `100/min`, and `scope` namespaces the
+    counters of throttles sharing the same cache. `evaluate` is `operation` to count each
+    operation once, `field` to count each top level field, or `resolution` to count every
+    resolution of the fields using the throttle.
+    """
+
+    rate = None
+    scope = None
+    evaluate = "operation"
+    cache_alias = "default"
+    key_prefix = "graphql-throttle"
+    # proxies in front of the application adding to `X-Forwarded-For`, defaults to the
+    # `ARIADNE_EXTENDED_NUM_PROXIES` setting, the remote address is used when not set
+    num_proxies = None
+    # outcomes are reused according to `evaluate` instead of per resolver
+    memoize = False
+
+    def __init__(self):
+        self.num_requests, self.duration = parse_rate(self.get_rate())
+        # outcome of the last `allow_request` of the thread, for `wait`
+        self._local = local()
+
+    def get_rate(self):
+        return self.rate
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def get_num_proxies(self):
+        if self.num_proxies is not None:
+            return self.num_proxies
+        return getattr(settings, "ARIADNE_EXTENDED_NUM_PROXIES", None)
+
+    def get_ident(self, request):
+        """
+        Identify the client, by user when authenticated otherwise by remote address.
+
+        `X-Forwarded-For` is set by clients, it is only read behind `num_proxies` proxies,
+        taking the address added by the outermost one as DRF does.
+        """
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            return "user:%s" % user.pk
+        meta = getattr(request, "META", {})
+        remote_addr = meta.get("REMOTE_ADDR")
+        forwarded = meta.get("HTTP_X_FORWARDED_FOR")
+        num_proxies = self.get_num_proxies()
+        if not num_proxies or not forwarded:
+            return "ip:%s" % remote_addr
+        addresses = forwarded.split(",")
+        return "ip:%s" % addresses[-min(num_proxies, len(addresses))].strip()
+
+    def get_client_key(self, request):
+        return "%s:%s:%s" % (
+            self.key_prefix,
+            self.scope or self.__class__.__name__.lower(),
+            self.get_ident(request),
+        )
+
+    def get_cache_key(self, info, resolver):
+        """
+        Key of the counter of the client, `None` to not throttle the resolution.
+        """
+        return self.get_client_key(get_request(info.context))
+
+    def get_cost(self, info):
+        """
+        Amount counted for the operation, or field, resolved with `info`.
+        """
+        return 1
+
+    def get_evaluation_key(self, info):
+        """
+        Identify the operation, or top level field, the outcome of the throttle is reused for.
+        """
+        if self.evaluate == "resolution":
+            return None
+        # variables are coerced for each execution, they identify it along with the operation
+        key = (id(info.operation), id(info.variable_values))
+        if self.evaluate == "field":
+            path = info.path
+            while path.prev is not None:
+                path = path.prev
+            key += (path.key,)
+        return key
+
+    def allow_request(self, info, resolver):
+        allowed, self._local.wait = self.throttle_request(info, resolver)
+        return allowed
+
+    def throttle_request(self, info, resolver):
+        """
+        Return `(allowed, wait)` for the resolution, used by resolvers instead of
+        `allow_request` and `wait` so concurrent requests never share the outcome.
+        """
+        if self.num_requests is None:
+            return (True, None)
+        key = self.get_cache_key(info, resolver)
+        if key is None:
+            return (True, None)
+
+        evaluation_key = self.get_evaluation_key(info)
+        context = getattr(info, "context", None)
+        request_context = None
+        if evaluation_key is not None and context is not None:
+            request_context = find_request_context(context)
+        if request_context is None:
+            return self.count_request(info, key)
+
+        outcomes = request_context.get_cache("throttles")
+        outcome = outcomes.get((key, evaluation_key))
+        if outcome is None:
+            # the variables are kept so their id isn't reused by another execution
+            outcome = outcomes[(key, evaluation_key)] = (
+                info.variable_values,
+                *self.count_request(info, key),
+            )
+        return outcome[1:]
+
+    def count_request(self, info, key):
+        """
+        Count the resolution with `info` against the counter `key`, return `(allowed, wait)`.
+        """
+        return self.consume(key, self.get_cost(info))
+
+    def consume(self, key, cost=1):
+        """
+        Count a request costing `cost` against the counter `key`, return `(allowed, wait)`
+        where `wait` is the number of seconds before a request is allowed again.
+        """
+        raise NotImplementedError(".consume() must be overridden.")
+
+    def wait(self):
+        return getattr(self._local, "wait", None)
+
+
+class FixedWindowThrottle(GraphQLThrottle):
+    """
+    Allows `rate` requests per window of its period.
+
+    Set `local_batch` to reserve requests by batches, a process then updates the cache once
+    per batch at the cost of clients being throttled up to `local_batch - 1` requests early
+    per process.
+    """
+
+    local_batch = 1
+
+    def consume(self, key, cost=1):
+        now = time.time()
+        window = int(now // self.duration)
+        key = "%s:%d" % (key, window)
+        expires = (window + 1) * self.duration
+        if self.local_batch > 1 and cost == 1:
+            allowed = self.reserve(key, expires)
+        else:
+            count = add_or_incr(self.cache, key, cost, self.duration + 1)
+            allowed = count <= self.num_requests
+            if not allowed and cost > 1:
+                # give the cost back, a cheaper request may still be allowed
+                self.cache.decr(key, cost)
+        return (allowed, None if allowed else expires - now)
+
+    def reserve(self, key, expires):
+        reservations_key = (self.cache_alias, key)
+        allowed = local_reservations.take(reservations_key)
+        if allowed is not None:
+            return allowed
+        count = add_or_incr(self.cache, key, self.local_batch, self.duration + 1)
+        granted = min(self.local_batch, self.num_requests - (count - self.local_batch))
+        local_reservations.add(reservations_key, expires, granted - 1 if granted > 0 else None)
+        return granted > 0
+
+
+class TokenBucketThrottle(GraphQLThrottle):
+    """
+    Allows bursts of `burst` requests, defaulting to the number of requests of `rate`, the
+    bucket being refilled at `rate`.
+
+    The counter holds the theoretical arrival time of the next request in milliseconds
+    (GCRA), a request moves it by the interval between tokens and is allowed unless it gets
+    further ahead of the clock than the bucket capacity.
+    """
+
+    burst = None
+
+    def consume(self, key, cost=1):
+        token_interval = max(int(self.duration * 1000 / self.num_requests), 1)
+        interval = token_interval * cost
+        tolerance = token_interval * (self.burst or self.num_requests)
+        timeout = math.ceil(tolerance / 1000) + 1
+        now = int(time.time() * 1000)
+
+        if self.cache.add(key, now + interval, timeout):
+            return (True, None)
+        try:
+            arrival = self.cache.incr(key, interval)
+        except ValueError:
+            arrival = None
+        if arrival is None or arrival - interval < now:
+            # the bucket was idle long enough to be full again
+            self.cache.set(key, now + interval, timeout)
+            return (True, None)
+
+        if arrival - now <= tolerance:
+            return (True, None)
+        # give the token back, denied requests aren't counted
+        self.cache.decr(key, interval)
+        self.cache.touch(key, timeout)
+        return (False, (arrival - now - tolerance) / 1000)
+
+
+class QueryCostThrottle(GraphQLThrottle):
+    """
+    Charges each operation its estimated cost against a budget of `rate` cost points per
+    window, eg. `"10000/min"`. Operations exceeding the remaining budget aren't charged.
+
+    Use it in the `throttle_classes` of resolvers, or add an instance to the
+    `validation_rules` of a view to throttle every operation before executing it. Add
+    `QueryCostExtension` to the extensions of the view to report the budget.
+
+    `estimator` is the `QueryCostValidator` estimating costs, with `correct_cost` the charge
+    is corrected once executed with the cost of the objects actually resolved.
+    """
+
+    estimator = QueryCostValidator()
+    correct_cost = False
+
+    def __call__(self, schema, document, data, context_value=None):
+        data = data if isinstance(data, dict) else {}
+        if self.num_requests is None:
+            return []
+        query_cost = self.get_estimator().estimate(
+            schema, document, data.get("variables"), data.get("operationName")
+        )
+        request = get_request(context_value)
+        allowed, wait, status, counter = self.charge(self.get_client_key(request), query_cost.cost)
+        self.record(status, counter)
+        if allowed:
+            return []
+        error = Throttled(wait)
+        return [GraphQLError(str(error), extensions=error.extensions)]
+
+    def get_estimator(self):
+        return self.estimator
+
+    def get_cost(self, info):
+        operation = info.operation
+        document = DocumentNode(
+            definitions=[operation, *info.fragments.values()], loc=operation.loc
+        )
+        return (
+            self.get_estimator()
+            .estimate(
+                info.schema,
+                document,
+                info.variable_values,
+                operation.name.value if operation.name else None,
+            )
+            .cost
+        )
+
+    def count_request(self, info, key):
+        allowed, wait, status, counter = self.charge(key, self.get_cost(info))
+        self.record(status, counter)
+        return allowed, wait
+
+    def consume(self, key, cost=1):
+        return self.charge(key, cost)[:2]
+
+    def charge(self, key, cost=1):
+        """
+        Charge `cost` to the counter `key`, return `(allowed, wait, status, counter)` where
+        `status` is the budget reported by `QueryCostExtension` and `counter` is needed to
+        `correct` the charge.
+        """
+        now = time.time()
+        window = int(now // self.duration)
+        counter = "%s:%d" % (key, window)
+        expires = (window + 1) * self.duration
+        timeout = self.duration + 1
+
+        used = add_or_incr(self.cache, counter, cost, timeout)
+        allowed = used <= self.num_requests
+        if not allowed:
+            self.cache.decr(counter, cost)
+            used -= cost
+        status = {
+            "cost": cost,
+            "budget": self.num_requests,
+            "remaining": max(self.num_requests - used, 0),
+            "resetAfter": math.ceil(expires - now),
+        }
+        return (allowed, None if allowed else expires - now, status, (counter, timeout, allowed))
+
+    def record(self, status, counter):
+        """
+        Keep the budget of the operation for the `QueryCostExtension` of its execution.
+        """
+        query_cost = _query_cost.get()
+        if query_cost is not None:
+            query_cost.update(status=status, throttle=self, counter=counter)
+
+    def correct(self, status, counter, cost):
+        """
+        Charge the difference between the actual `cost` of the operation and its estimate.
+        """
+        counter, timeout, allowed = counter
+        delta = cost - status["cost"]
+        if not allowed or not delta:
+            return
+        used = add_or_incr(self.cache, counter, delta, timeout)
+        status["cost"] = cost
+        status["remaining"] = max(self.num_requests - used, 0)
+
+
+class QueryCostExtension(Extension):
+    """
+    Reports the budget of `QueryCostThrottle` in the `queryCost` response extension, and
+    counts the objects resolved when the throttle corrects its charge.
+    """
+
+    def __init__(self):
+        # `{(parent type, field name): objects}` resolved by the operation
+        self.resolved = {}
+        self.schema = None
+        self.corrected = False
+        # budget charged for the execution, the context of a batch is shared by its entries
+        self.query_cost = {}
+        self.token = None
+
+    def request_started(self, context):
+        self.token = _query_cost.set(self.query_cost)
+
+    def request_finished(self, context):
+        _query_cost.reset(self.token)
+
+    async def resolve(self, next_: Resolver, parent: Any, info: GraphQLResolveInfo, **kwargs):
+        result = next_(parent, info, **kwargs)
+        if isawaitable(result):
+            result = await result
+        self.count(info, result)
+        return result
+
+    def count(self, info, result):
+        self.schema = info.schema
+        key = (info.parent_type, info.field_name)
+        count = 1
+        if isinstance(result, Sized) and not isinstance(result, (str, bytes, dict)):
+            count = len(result)
+        self.resolved[key] = self.resolved.get(key, 0) + count
+
+    def get_actual_cost(self, schema, estimator):
+        return sum(
+            estimator.get_field_complexity(schema, parent_type, field_name) * count
+            for (parent_type, field_name), count in self.resolved.items()
+        )
+
+    def format(self, context):
+        query_cost = self.query_cost
+        status = query_cost.get("status")
+        if status is None:
+            return None
+        throttle = query_cost["throttle"]
+        if throttle.correct_cost and not self.corrected and self.schema is not None:
+            self.corrected = True
+            throttle.correct(
+                status,
+                query_cost["counter"],
+                self.get_actual_cost(self.schema, throttle.get_estimator()),
+            )
+        return {"queryCost": dict(status)}
+
+
+class QueryCostExtensionSync(QueryCostExtension):
+    def resolve(self, next_: Resolver, parent: Any, info: GraphQLResolveInfo, **kwargs):
+        result = next_(parent, info, **kwargs)
+        self.count(info, result)
+        return result
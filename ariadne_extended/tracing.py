@@ -0,0 +1,132 @@
+"""
+Apollo tracing extensions that only trace a sample of requests.
+
+The sample rate is read from the `ARIADNE_EXTENDED_TRACING_SAMPLE_RATE` setting (0 to 1,
+defaults to 0), tracing can be forced for a request by sending the `X-Apollo-Tracing` header,
+a value of `full` returns every resolver instead of the summary of the slowest ones.
+"""
+import heapq
+import random
+from inspect import isawaitable
+from typing import Any
+
+from ariadne.contrib.tracing.apollotracing import (
+    ApolloTracingExtension,
+    TIMESTAMP_FORMAT,
+    perf_counter_ns,
+)
+from ariadne.contrib.tracing.utils import format_path, should_trace
+from ariadne.types import ContextValue, Resolver
+from django.conf import settings
+from graphql import GraphQLResolveInfo
+
+
+class SampledApolloTracingExtension(ApolloTracingExtension):
+    """
+    Traces a sample of the requests, resolver timings are kept as tuples and only the
+    `summary_size` slowest resolvers are formatted into the response.
+    """
+
+    sample_rate = None
+    force_header = "HTTP_X_APOLLO_TRACING"
+    # number of slowest resolvers returned, `None` returns all of them
+    summary_size = 10
+
+    def __init__(self):
+        super().__init__()
+        self.enabled = False
+        self.full = False
+
+    def get_sample_rate(self):
+        if self.sample_rate is not None:
+            return self.sample_rate
+        return getattr(settings, "ARIADNE_EXTENDED_TRACING_SAMPLE_RATE", 0)
+
+    def can_force(self, request):
+        """
+        Forcing tracing is limited to staff users, or anyone when `DEBUG` is on.
+        """
+        user = getattr(request, "user", None)
+        return settings.DEBUG or bool(user and getattr(user, "is_staff", False))
+
+    def request_started(self, context: ContextValue):
+        meta = getattr(context, "META", None) or {}
+        forced = self.force_header and meta.get(self.force_header)
+        if forced and self.can_force(context):
+            self.enabled = True
+            self.full = forced.lower() == "full"
+        else:
+            sample_rate = self.get_sample_rate()
+            self.enabled = bool(sample_rate) and random.random() < sample_rate
+
+        if self.enabled:
+            super().request_started(context)
+
+    def start_record(self, info: GraphQLResolveInfo):
+        if not self.enabled or not should_trace(info):
+            return None
+        record = [info, perf_counter_ns(), None]
+        self.resolvers.append(record)
+        return record
+
+    def end_record(self, record):
+        if record is not None:
+            record[2] = perf_counter_ns() - record[1]
+
+    async def resolve(self, next_: Resolver, parent: Any, info: GraphQLResolveInfo, **kwargs):
+        record = self.start_record(info)
+        try:
+            result = next_(parent, info, **kwargs)
+            if isawaitable(result):
+                result = await result
+            return result
+        finally:
+            self.end_record(record)
+
+    def format_record(self, record):
+        info, start_timestamp, duration = record
+        return {
+            "path": format_path(info.path),
+            "parentType": str(info.parent_type),
+            "fieldName": info.field_name,
+            "returnType": str(info.return_type),
+            "startOffset": start_timestamp - self.start_timestamp,
+            "duration": duration or 0,
+        }
+
+    def format(self, context: ContextValue):
+        if not self.enabled:
+            return None
+
+        totals = self.get_totals()
+        records = totals["resolvers"]
+        if self.summary_size is not None and not self.full:
+            records = heapq.nlargest(self.summary_size, records, key=lambda r: r[2] or 0)
+
+        return {
+            "tracing": {
+                "version": 1,
+                "startTime": totals["start"].strftime(TIMESTAMP_FORMAT),
+                "endTime": totals["end"].strftime(TIMESTAMP_FORMAT),
+                "duration": totals["duration"],
+                "resolverCount": len(totals["resolvers"]),
+                "execution": {"resolvers": [self.format_record(record) for record in records]},
+            }
+        }
+
+
+class SampledApolloTracingExtensionSync(SampledApolloTracingExtension):
+    def resolve(self, next_: Resolver, parent: Any, info: GraphQLResolveInfo, **kwargs):
+        record = self.start_record(info)
+        try:
+            return next_(parent, info, **kwargs)
+        finally:
+            self.end_record(record)
+
+
+def sampled_tracing(extension_class=SampledApolloTracingExtensionSync, **attrs):
+    """
+    Return a tracing extension class configured with the given attributes, eg.
+    `extensions = [sampled_tracing(sample_rate=0.01, summary_size=5)]`
+    """
+    return type(extension_class.__name__, (extension_class,), attrs)
@@ -1,18 +1,25 @@
 import json
+from collections.abc import Sized
+from concurrent.futures import Future, ThreadPoolExecutor
+from queue import Queue
+from threading import Condition, Event, Lock
 from typing import Optional, cast
 
 from ariadne.contrib.django.views import GraphQLView
-from ariadne.contrib.tracing.apollotracing import ApolloTracingExtensionSync
+from ariadne.exceptions import HttpBadRequestError
 from ariadne.format_error import format_error
-from ariadne.graphql import graphql_sync
+from ariadne.graphql import parse_query
 from ariadne.types import ContextValue, ErrorFormatter, GraphQLResult, RootValue
 from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import connections
 from django.http import (
     HttpRequest,
     HttpResponse,
     HttpResponseBadRequest,
     HttpResponseForbidden,
+    HttpResponseNotAllowed,
+    StreamingHttpResponse,
 )
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
@@ -21,31 +28,225 @@ from graphql import GraphQLSchema
 from graphql import format_error as format_graphql_error
 from graphql.error import GraphQLError
 from graphql.execution import MiddlewareManager
+from graphql.language import OperationType
+from graphql.utilities import get_operation_ast
+
+from .cache_control import CacheControl
+from .context import get_request_context, share_request_context
+from .document_cache import default_document_cache
+from .encoders import JSONBackend, get_default_json_backend
+from .graphql import graphql_sync, split_validation_rules
+from .metrics import (
+    BATCH,
+    Metrics,
+    default_metrics,
+    measure,
+    record_response,
+    record_saved_executions,
+)
+from .persisted_queries import PersistedQueryStore, apply_persisted_query
+from .response_cache import ResponseCache
+from .slow_operations import SlowOperationExtensionSync, SlowOperationLog, profile
+from .tracing import SampledApolloTracingExtensionSync
+
+
+def get_operation_name(data):
+    return data.get("operationName") if isinstance(data, dict) else None
+
+
+def get_operation(schema, query, operation_name=None, validation_rules=None, document_cache=None):
+    """
+    Return the operation of `query` to execute, `None` when the query can't be parsed or the
+    operation isn't found.
+    """
+    if not isinstance(query, str):
+        return None
+    try:
+        if document_cache is not None:
+            # parsed through the cache so executing the operation reuses the document
+            rules, _ = split_validation_rules(validation_rules)
+            document, _ = document_cache.parse_and_validate(schema, query, rules)
+        else:
+            document = parse_query(query)
+    except GraphQLError:
+        return None
+    return get_operation_ast(document, operation_name)
+
+
+def check_query_operation(
+    schema, data, persisted_query_store=None, validation_rules=None, document_cache=None
+):
+    """
+    Return a 405 response when the operation of `data` isn't a query, only queries are
+    executed over GET so mutations can't be sent by cross site requests or cached. Operations
+    that can't be parsed are left to report their errors.
+    """
+    query = data.get("query")
+    if not query:
+        try:
+            query = apply_persisted_query(data, persisted_query_store).get("query")
+        except GraphQLError:
+            return None
+    operation = get_operation(
+        schema, query, data.get("operationName"), validation_rules, document_cache
+    )
+    if operation is None or operation.operation == OperationType.QUERY:
+        return None
+    return HttpResponseNotAllowed(
+        ["POST"],
+        "Can only perform a %s operation from a POST request." % operation.operation.value,
+    )
 
 
 @method_decorator(csrf_exempt, name="dispatch")
 class BaseGraphQLView(GraphQLView):
-    extensions = [ApolloTracingExtensionSync]
+    extensions = [SampledApolloTracingExtensionSync]
+    document_cache = default_document_cache
+    # Enables automatic persisted queries, see `persisted_queries.CachePersistedQueryStore`
+    persisted_query_store: Optional[PersistedQueryStore] = None
+    # Caches whole query responses, see `response_cache.ResponseCache`
+    response_cache: Optional[ResponseCache] = None
+    # Sets Cache-Control and ETag headers, see `cache_control.CacheControl`
+    cache_control: Optional[CacheControl] = None
+    # Records per operation metrics, see `metrics.PrometheusMetricsView`
+    metrics: Optional[Metrics] = default_metrics
+    # Logs operations slower than its threshold, see `slow_operations.SlowOperationLog`
+    slow_operation_log: Optional[SlowOperationLog] = None
+    slow_operation_extension = SlowOperationExtensionSync
+    # Defaults to the backend configured by `ARIADNE_EXTENDED_JSON_BACKEND`
+    json_backend: Optional[JSONBackend] = None
+
+    def get_extensions(self):
+        if self.slow_operation_log is None:
+            return self.extensions
+        return [*(self.extensions or ()), self.slow_operation_extension]
+
+    def get_json_backend(self) -> JSONBackend:
+        return self.json_backend or get_default_json_backend()
+
+    def render_result(self, result: dict, status_code: int) -> HttpResponse:
+        return HttpResponse(
+            self.get_json_backend().dumps(result),
+            status=status_code,
+            content_type="application/json",
+        )
+
+    def render_query_result(
+        self, request: HttpRequest, success: bool, result: dict, operation_name=None
+    ):
+        status_code = 200 if success else 400
+        if self.cache_control is None:
+            response = self.render_result(result, status_code)
+        else:
+            response = self.cache_control.patch_response(
+                request,
+                lambda: self.render_result(result, status_code),
+                cacheable=success and not result.get("errors"),
+            )
+        record_response(self.metrics, operation_name, response)
+        return response
+
+    def get(self, request: HttpRequest, *args, **kwargs):
+        """
+        Execute queries sent as query params, such as persisted query hashes, otherwise
+        render the playground.
+        """
+        if not self.is_query_request(request):
+            return super().get(request, *args, **kwargs)
+
+        try:
+            data = self.extract_data_from_query_params(request)
+        except HttpBadRequestError as error:
+            return HttpResponseBadRequest(error.message)
+
+        not_allowed = self.check_query_operation(data)
+        if not_allowed is not None:
+            return not_allowed
+
+        success, result = self.execute_query(request, data)
+        return self.render_query_result(request, success, result, get_operation_name(data))
+
+    def post(self, request: HttpRequest, *args, **kwargs):
+        if not self.schema:
+            raise ValueError("GraphQLView was initialized without schema.")
+
+        try:
+            data = self.extract_data_from_request(request)
+        except HttpBadRequestError as error:
+            return HttpResponseBadRequest(error.message)
+
+        success, result = self.execute_query(request, data)
+        return self.render_query_result(request, success, result, get_operation_name(data))
+
+    def extract_data_from_json_request(self, request: HttpRequest):
+        try:
+            return self.get_json_backend().loads(request.body)
+        except (TypeError, ValueError):
+            raise HttpBadRequestError("Request body is not a valid JSON")
+
+    def check_query_operation(self, data: dict):
+        """
+        Return a 405 response when the operation sent as query params isn't a query.
+        """
+        return check_query_operation(
+            self.schema,
+            data,
+            self.persisted_query_store,
+            self.validation_rules,
+            self.document_cache,
+        )
+
+    @staticmethod
+    def is_query_request(request: HttpRequest):
+        return "query" in request.GET or "extensions" in request.GET
+
+    def extract_data_from_query_params(self, request: HttpRequest):
+        data = {
+            "query": request.GET.get("query"),
+            "operationName": request.GET.get("operationName"),
+        }
+        for param in ["variables", "extensions"]:
+            value = request.GET.get(param)
+            if value:
+                try:
+                    data[param] = self.get_json_backend().loads(value)
+                except (TypeError, ValueError):
+                    raise HttpBadRequestError("Query param '%s' is not a valid JSON" % param)
+        return data
 
     def execute_query(self, request: HttpRequest, data: dict) -> GraphQLResult:
         """TODO: remove when extensions is added to graphql_sync in parent view"""
         if callable(self.context_value):
             context_value = self.context_value(request)  # pylint: disable=not-callable
+            share_request_context(context_value, request)
         else:
             context_value = self.context_value or request
 
-        return graphql_sync(
-            cast(GraphQLSchema, self.schema),
-            data,
-            context_value=context_value,
-            root_value=self.root_value,
-            validation_rules=self.validation_rules,
-            debug=settings.DEBUG,
-            logger=self.logger,
-            error_formatter=self.error_formatter or format_error,
-            extensions=self.extensions,
-            middleware=self.middleware,
-        )
+        operation = data if isinstance(data, dict) else {}
+        with measure(self.metrics, get_operation_name(data)) as measurement, profile(
+            self.slow_operation_log,
+            operation.get("query"),
+            operation.get("variables"),
+            operation.get("operationName"),
+        ):
+            success, result = graphql_sync(
+                cast(GraphQLSchema, self.schema),
+                data,
+                context_value=context_value,
+                root_value=self.root_value,
+                validation_rules=self.validation_rules,
+                debug=settings.DEBUG,
+                logger=self.logger,
+                error_formatter=self.error_formatter or format_error,
+                extensions=self.get_extensions(),
+                middleware=self.middleware,
+                document_cache=self.document_cache,
+                persisted_query_store=self.persisted_query_store,
+                response_cache=self.response_cache,
+                cache_control=self.cache_control,
+            )
+            measurement.failed = not success or bool(result.get("errors"))
+        return success, result
 
 
 @method_decorator(csrf_exempt, name="dispatch")
@@ -54,6 +255,41 @@ class LoginRequiredGraphQLView(LoginRequiredMixin, BaseGraphQLView):
         return HttpResponseForbidden()
 
 
+class _SizeLimitedStream:
+    """
+    Reads the request body, raising the error returned by `error` once more than `max_size`
+    bytes were read.
+    """
+
+    def __init__(self, request, max_size=None, error=None):
+        self.request = request
+        self.max_size = max_size
+        self.error = error
+        self.size = 0
+        try:
+            # not every request stream stops at the end of the body, such as ASGI test payloads
+            self.remaining = int(request.META["CONTENT_LENGTH"])
+        except (KeyError, ValueError):
+            self.remaining = None
+
+    def read(self, size=-1):
+        if self.remaining is not None:
+            size = self.remaining if size < 0 else min(size, self.remaining)
+            if not size:
+                return b""
+        chunk = self.request.read(size)
+        if self.remaining is not None:
+            self.remaining -= len(chunk)
+        self.size += len(chunk)
+        if self.max_size is not None and self.size > self.max_size:
+            raise self.error()
+        return chunk
+
+
+# put on the results queue by each batch worker once it stopped
+_WORKER_DONE = object()
+
+
 class HttpError(Exception):
     def __init__(self, response, message=None, *args, **kwargs):
         self.response = response
@@ -76,8 +312,36 @@ class BatchGraphQLView(LoginRequiredMixin, View):
     validation_rules = None
     error_formatter: Optional[ErrorFormatter] = None
     middleware: Optional[MiddlewareManager] = None
+    extensions = [SampledApolloTracingExtensionSync]
     batch = False
     pretty = False
+    # Execute batch entries concurrently on a thread pool bounded by `max_batch_workers`
+    concurrent_batch = False
+    max_batch_workers = 4
+    # Stream batch entries as they finish, either as a JSON array or as newline delimited JSON
+    stream_batch = False
+    stream_format = "json"
+    # Execute identical query entries of a batch once, mutations always run for each entry
+    deduplicate_batch = True
+    # number of batch entries of the current request answered by a duplicate's result,
+    # recorded by `metrics`
+    saved_executions = 0
+    # Request limits, `None` disables them. Bodies over `max_body_size` bytes get a 413
+    max_body_size: Optional[int] = None
+    max_batch_length: Optional[int] = None
+    max_query_length: Optional[int] = None
+    # Decode batch entries one at a time from the request stream instead of loading the whole
+    # body, with `stream_batch` memory stays flat however large the batch is
+    incremental_parsing = False
+    parsing_chunk_size = 64 * 1024
+    document_cache = default_document_cache
+    persisted_query_store: Optional[PersistedQueryStore] = None
+    response_cache: Optional[ResponseCache] = None
+    cache_control: Optional[CacheControl] = None
+    metrics: Optional[Metrics] = default_metrics
+    slow_operation_log: Optional[SlowOperationLog] = None
+    slow_operation_extension = SlowOperationExtensionSync
+    json_backend: Optional[JSONBackend] = None
 
     def handle_no_permission(self):
         return HttpResponseForbidden()
@@ -92,33 +356,342 @@ class BatchGraphQLView(LoginRequiredMixin, View):
         if not self.schema:
             raise ValueError("GraphQLView was initialized without schema.")
         try:
+            self.check_body_size(request)
             data = self.extract_data_from_request(request)
 
-            if self.batch:
-                responses = [self.get_response(request, entry) for entry in data]
-                result = "[{}]".format(",".join([response[0] for response in responses]))
-                status_code = (
-                    responses and max(responses, key=lambda response: response[1])[1] or 200
-                )
+            if self.batch and self.stream_batch:
+                return self.render_stream(request, data)
+            elif self.batch:
+                responses = self.get_batch_responses(request, data)
             else:
-                result, status_code = self.get_response(request, data)
+                responses = self.get_response(request, data)
 
-            return HttpResponse(
-                status=status_code, content=result, content_type="application/json"
+            response = self.render_responses(request, responses)
+            record_response(
+                self.metrics, BATCH if self.batch else get_operation_name(data), response
             )
+            return response
 
         except HttpError as e:
-            # TODO: return actual JsonResponse
-            response = e.response
-            response["Content-Type"] = "application/json"
-            response.content = self.json_encode(request, {"errors": [self.format_error(e)]})
+            return self.render_http_error(request, e)
+
+    def render_responses(self, request, responses):
+        """
+        Build the http response from a single `(response, status_code)` tuple or a list of
+        them when batching, the whole batch is encoded in a single pass.
+        """
+        if self.batch:
+            result = [response for response, _ in responses]
+            status_code = responses and max(responses, key=lambda response: response[1])[1] or 200
+            cacheable = not any("errors" in response for response in result)
+        else:
+            result, status_code = responses
+            cacheable = "errors" not in result
+
+        def render():
+            return HttpResponse(
+                status=status_code,
+                content=self.json_encode(request, result),
+                content_type="application/json",
+            )
+
+        if self.cache_control is None:
+            return render()
+        return self.cache_control.patch_response(
+            request, render, cacheable=cacheable and status_code == 200
+        )
+
+    def render_stream(self, request, data):
+        """
+        Stream batch entries as soon as each one finishes, clients match results to their
+        operations using the `id` field.
+
+        Headers are sent before any entry is executed so the response status is always 200,
+        the outcome of each entry is given by its own `status` field. Errors raised while
+        handling a single entry are streamed as that entry's result.
+        """
+        ndjson = self.stream_format == "ndjson"
+
+        def get_response(request, entry):
+            try:
+                return self.get_response(request, entry)
+            except HttpError as e:
+                status_code = e.response.status_code
+                response = {"errors": [self.format_error(e)], "status": status_code}
+                response["id"] = entry.get("id") if isinstance(entry, dict) else None
+                return response, status_code
+
+        def encode(position, response):
+            if ndjson:
+                return [self.get_json_backend().dumps(response), "\n"]
+            return ["," if position else "", self.json_encode(request, response)]
+
+        def stream():
+            if not ndjson:
+                yield "["
+            position = size = 0
+            try:
+                for _, (response, _) in self.iter_batch_responses(
+                    request, data, get_response=get_response
+                ):
+                    for chunk in encode(position, response):
+                        size += len(chunk)
+                        yield chunk
+                    position += 1
+            except HttpError as e:
+                # raised while decoding the rest of an incrementally parsed batch
+                status_code = e.response.status_code
+                response = {"errors": [self.format_error(e)], "id": None, "status": status_code}
+                yield from encode(position, response)
+            if not ndjson:
+                yield "]"
+            if self.metrics is not None:
+                # approximate for non ASCII text encoded as str
+                self.metrics.record_response(BATCH, size)
+
+        return StreamingHttpResponse(
+            stream(),
+            status=200,
+            content_type="application/x-ndjson" if ndjson else "application/json",
+        )
+
+    def render_http_error(self, request, error):
+        # TODO: return actual JsonResponse
+        response = error.response
+        response["Content-Type"] = "application/json"
+        response.content = self.json_encode(request, {"errors": [self.format_error(error)]})
+        return response
+
+    def get_batch_responses(self, request, data):
+        """
+        Return the list of `(response, status_code)` tuples for each batch entry, in order.
+        """
+        responses = dict(self.iter_batch_responses(request, data))
+        return [responses[index] for index in range(len(responses))]
+
+    def iter_batch_responses(self, request, data, get_response=None):
+        """
+        Yield `(index, (response, status_code))` for each batch entry as soon as it is done,
+        entries finish out of order when `concurrent_batch` is enabled.
+
+        `data` may be an iterator, such as the entries decoded incrementally from the request
+        body, entries are then only decoded once a worker is ready to execute them.
+        """
+        get_response = get_response or self.get_response
+        self.saved_executions = 0
+        if self.deduplicate_batch:
+            get_response = self.deduplicate_responses(get_response)
+        try:
+            yield from self.iter_executed_responses(request, data, get_response)
+        finally:
+            record_saved_executions(self.metrics, self.saved_executions)
+
+    def iter_executed_responses(self, request, data, get_response):
+        workers = self.max_batch_workers or 1
+        if isinstance(data, Sized):
+            workers = min(workers, len(data))
+        if not self.concurrent_batch or workers < 2:
+            for index, entry in enumerate(data):
+                yield index, get_response(request, entry)
+            return
+
+        pending = enumerate(data)
+        finished = Queue()
+        lock = Lock()
+        cancelled = Event()
+        # number of entries being executed, mutations wait for it to drop to 0
+        running = Condition()
+        in_flight = 0
+
+        def execute(index, entry):
+            try:
+                finished.put((index, get_response(request, entry), None))
+            except Exception as e:
+                finished.put((index, None, e))
+
+        def worker():
+            # Each worker drains entries until the batch is exhausted so only one database
+            # connection is opened per thread, it is closed once the worker is done.
+            nonlocal in_flight
+            try:
+                while not cancelled.is_set():
+                    with lock:
+                        try:
+                            index, entry = next(pending)
+                        except StopIteration:
+                            return
+                        except Exception as e:
+                            # the body failed to decode, such as invalid JSON
+                            finished.put((None, None, e))
+                            return
+                        if self.is_mutation_entry(request, entry):
+                            # run alone while holding the lock, entries after it wait
+                            with running:
+                                running.wait_for(lambda: in_flight == 0)
+                            execute(index, entry)
+                            continue
+                        with running:
+                            in_flight += 1
+                    try:
+                        execute(index, entry)
+                    finally:
+                        with running:
+                            in_flight -= 1
+                            running.notify_all()
+            finally:
+                finished.put(_WORKER_DONE)
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for _ in range(workers):
+                executor.submit(worker)
+            try:
+                done = 0
+                while done < workers:
+                    item = finished.get()
+                    if item is _WORKER_DONE:
+                        done += 1
+                        continue
+                    index, response, error = item
+                    if error is not None:
+                        # re-raise anything that escaped a worker, such as an HttpError
+                        raise error
+                    yield index, response
+            finally:
+                # stop workers early when failing or when the consumer goes away
+                cancelled.set()
+
+    def deduplicate_responses(self, get_response):
+        """
+        Wrap `get_response` so duplicates of an entry reuse its response instead of being
+        executed, they wait for it when it is still running on another worker.
+        `saved_executions` counts the skipped entries.
+        """
+        executions = {}
+        lock = Lock()
+
+        def get_deduplicated_response(request, entry):
+            key = self.get_deduplication_key(request, entry)
+            if key is None:
+                return get_response(request, entry)
+            with lock:
+                execution = executions.get(key)
+                duplicate = execution is not None
+                if duplicate:
+                    self.saved_executions += 1
+                else:
+                    execution = executions[key] = Future()
+            if duplicate:
+                return self.copy_response(execution.result(), entry)
+
+            try:
+                response = get_response(request, entry)
+            except BaseException as e:
+                execution.set_exception(e)
+                raise
+            execution.set_result(response)
             return response
 
+        return get_deduplicated_response
+
+    def get_deduplication_key(self, request, entry):
+        """
+        Key identifying identical query operations, `None` for entries that must always be
+        executed such as mutations.
+        """
+        if not isinstance(entry, dict):
+            return None
+        try:
+            params = self.get_graphql_params(request, entry)
+            variables = json.dumps(params["variables"] or {}, sort_keys=True, default=str)
+        except (HttpError, TypeError, ValueError):
+            return None
+
+        if not self.is_query(params):
+            return None
+        return params["query"], variables, params["operation_name"]
+
+    def is_query(self, params):
+        """
+        Whether the operation of an entry is known to be a query, entries that can't be
+        parsed, or only send a persisted query hash, are treated like mutations.
+        """
+        operation = get_operation(
+            self.schema,
+            params["query"],
+            params["operation_name"],
+            self.validation_rules,
+            self.document_cache,
+        )
+        return operation is not None and operation.operation == OperationType.QUERY
+
+    def is_mutation_entry(self, request, entry):
+        """
+        Whether an entry must run alone, entries that fail to parse are reported when they
+        are executed.
+        """
+        if not isinstance(entry, dict):
+            return True
+        try:
+            return not self.is_query(self.get_graphql_params(request, entry))
+        except HttpError:
+            return False
+
+    def copy_response(self, response, entry):
+        """
+        Reuse the `(response, status_code)` of an entry for one of its duplicates.
+        """
+        response, status_code = response
+        if self.batch:
+            response = dict(response, id=entry.get("id"))
+        return response, status_code
+
+    def check_query_operation(self, request, params):
+        """
+        Refuse the entries sent by GET whose operation isn't a query, see
+        `check_query_operation`.
+        """
+        if request.method != "GET":
+            return
+        not_allowed = check_query_operation(
+            self.schema,
+            self.get_execution_data(params),
+            self.persisted_query_store,
+            self.validation_rules,
+            self.document_cache,
+        )
+        if not_allowed is not None:
+            raise HttpError(not_allowed)
+
     def get_response(self, request, data):
         params = self.get_graphql_params(request, data)
+        self.check_query_operation(request, params)
+
+        request_context = get_request_context(request)
+        with measure(self.metrics, params["operation_name"]) as measurement:
+            with request_context.time_operation(params["id"], params["operation_name"]), profile(
+                self.slow_operation_log,
+                params["query"],
+                params["variables"],
+                params["operation_name"],
+            ):
+                execution_result_passed, execution_result = self.execute_graphql_request(
+                    request, params
+                )
+            measurement.failed = not execution_result_passed or bool(
+                execution_result.get("errors")
+            )
+        if not self.is_query(params):
+            # data cached by earlier entries may have been changed by the mutation
+            request_context.clear()
 
-        execution_result_passed, execution_result = self.execute_graphql_request(request, params)
+        return self.build_response(request, params, execution_result_passed, execution_result)
 
+    def build_response(self, request, params, execution_result_passed, execution_result):
+        """
+        Build the response data of a single execution result, returns a
+        `(response, status_code)` tuple.
+        """
         status_code = 200
         response = {}
         if execution_result_passed:
@@ -129,14 +702,20 @@ class BatchGraphQLView(LoginRequiredMixin, View):
 
         else:
             status_code = 400
-            response["errors"] = [self.format_error(e) for e in execution_result["errors"]]
+            # errors are already formatted by the executor
+            response["errors"] = [
+                e if isinstance(e, dict) else self.format_error(e)
+                for e in execution_result["errors"]
+            ]
+
+        if execution_result.get("extensions"):
+            response["extensions"] = execution_result["extensions"]
 
         if self.batch:
             response["id"] = params["id"]
             response["status"] = status_code
 
-        result = self.json_encode(request, response)
-        return result, status_code
+        return response, status_code
 
     def extract_data_from_request(self, request):
         content_type = self.get_content_type(request)
@@ -145,19 +724,17 @@ class BatchGraphQLView(LoginRequiredMixin, View):
             return {"query": request.body.decode()}
 
         elif content_type == "application/json":
-            # noinspection PyBroadException
-            try:
-                body = request.body.decode("utf-8")
-            except Exception as e:
-                raise HttpError(HttpResponseBadRequest(str(e)))
-
+            if self.batch and self.incremental_parsing:
+                return self.iter_request_entries(request)
             try:
-                request_json = json.loads(body)
+                # decoded straight from bytes to avoid holding another copy of the body
+                request_json = self.get_json_backend().loads(request.body)
                 if self.batch:
                     assert isinstance(request_json, list), (
                         "Batch requests should receive a list, but received {}."
                     ).format(repr(request_json))
                     assert len(request_json) > 0, "Received an empty list in the batch request."
+                    self.check_batch_length(len(request_json))
                 else:
                     assert isinstance(
                         request_json, dict
@@ -173,41 +750,158 @@ class BatchGraphQLView(LoginRequiredMixin, View):
 
         return {}
 
-    def execute_graphql_request(self, request, data):
-        if callable(self.context_value):
-            context_value = self.context_value(request)
+    def get_context_value(self, request):
+        """
+        Build the context value once per HTTP request, every entry of a batch shares it along
+        with the caches and loaders of `context.get_request_context(request)`.
+        """
+
+        def build_context_value():
+            if callable(self.context_value):
+                return share_request_context(self.context_value(request), request)
+            return self.context_value or request
+
+        return get_request_context(request).get_context_value(build_context_value)
+
+    def check_body_size(self, request):
+        if self.max_body_size is None:
+            return
+        try:
+            length = int(request.META.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            length = 0
+        if length > self.max_body_size:
+            raise self.body_too_large()
+
+    def body_too_large(self):
+        return HttpError(
+            HttpResponse(
+                "Request body exceeds the maximum size of %d bytes." % self.max_body_size,
+                status=413,
+            )
+        )
+
+    def check_batch_length(self, length):
+        if self.max_batch_length is not None and length > self.max_batch_length:
+            raise HttpError(
+                HttpResponseBadRequest(
+                    "Batch requests are limited to %d entries." % self.max_batch_length
+                )
+            )
+
+    def iter_request_entries(self, request):
+        """
+        Decode the first batch entry so invalid bodies are rejected before anything is
+        executed, then return an iterator decoding the remaining entries as they are needed.
+
+        With `max_batch_length` the entries are decoded up to the limit first, batches over
+        it are rejected before any entry is executed.
+        """
+        stream = _SizeLimitedStream(request, self.max_body_size, self.body_too_large)
+        entries = self.get_json_backend().iter_array(stream, self.parsing_chunk_size)
+
+        def next_entry():
+            try:
+                return next(entries)
+            except ValueError as e:
+                raise HttpError(HttpResponseBadRequest("POST body sent invalid JSON. %s" % e))
+
+        if self.max_batch_length is None:
+            length = 1
         else:
-            context_value = self.context_value or request
+            length = self.max_batch_length + 1
+        decoded = []
+        for _ in range(length):
+            try:
+                decoded.append(next_entry())
+            except StopIteration:
+                break
+        if not decoded:
+            raise HttpError(HttpResponseBadRequest("Received an empty list in the batch request."))
+        self.check_batch_length(len(decoded))
+
+        def iter_entries():
+            yield from decoded
+            while True:
+                try:
+                    yield next_entry()
+                except StopIteration:
+                    return
+
+        return iter_entries()
 
+    def execute_graphql_request(self, request, data):
         return graphql_sync(
             cast(GraphQLSchema, self.schema),
-            data,
-            context_value=context_value,
+            self.get_execution_data(data),
+            context_value=self.get_context_value(request),
             root_value=self.root_value,
             debug=settings.DEBUG,
             logger=self.logger,
             validation_rules=self.validation_rules,
             error_formatter=self.error_formatter or format_error,
+            extensions=self.get_extensions(),
             middleware=self.middleware,
+            document_cache=self.document_cache,
+            persisted_query_store=self.persisted_query_store,
+            response_cache=self.response_cache,
+            cache_control=self.cache_control,
         )
 
-    @staticmethod
-    def get_graphql_params(request, data):
+    def get_graphql_params(self, request, data):
         query = request.GET.get("query") or data.get("query")
         variables = request.GET.get("variables") or data.get("variables")
         id = request.GET.get("id") or data.get("id")
 
+        if (
+            self.max_query_length is not None
+            and isinstance(query, str)
+            and len(query) > self.max_query_length
+        ):
+            raise HttpError(
+                HttpResponseBadRequest(
+                    "Query exceeds the maximum length of %d characters." % self.max_query_length
+                )
+            )
+
         if variables and isinstance(variables, str):
             try:
-                variables = json.loads(variables)
+                variables = self.get_json_backend().loads(variables)
             except Exception:
                 raise HttpError(HttpResponseBadRequest("Variables are invalid JSON."))
 
+        extensions = request.GET.get("extensions") or data.get("extensions")
+        if extensions and isinstance(extensions, str):
+            try:
+                extensions = self.get_json_backend().loads(extensions)
+            except Exception:
+                raise HttpError(HttpResponseBadRequest("Extensions are invalid JSON."))
+
         operation_name = request.GET.get("operationName") or data.get("operationName")
         if operation_name == "null":
             operation_name = None
 
-        return dict(query=query, variables=variables, operation_name=operation_name, id=id)
+        return dict(
+            query=query,
+            variables=variables,
+            operation_name=operation_name,
+            id=id,
+            extensions=extensions,
+        )
+
+    @staticmethod
+    def get_execution_data(params):
+        """
+        Return the data passed to the executor for the params of an entry, keyed as in
+        request bodies. The response cache and the cost validators read the operation name
+        from it.
+        """
+        return {
+            "query": params["query"],
+            "variables": params["variables"],
+            "operationName": params["operation_name"],
+            "extensions": params["extensions"],
+        }
 
     @staticmethod
     def format_error(error):
@@ -222,8 +916,14 @@ class BatchGraphQLView(LoginRequiredMixin, View):
         content_type = meta.get("CONTENT_TYPE", meta.get("HTTP_CONTENT_TYPE", ""))
         return content_type.split(";", 1)[0].lower()
 
-    def json_encode(self, request, data, pretty=False):
-        if not (self.pretty or pretty) and not request.GET.get("pretty"):
-            return json.dumps(data, separators=(",", ":"))
+    def get_extensions(self):
+        if self.slow_operation_log is None:
+            return self.extensions
+        return [*(self.extensions or ()), self.slow_operation_extension]
 
-        return json.dumps(data, sort_keys=True, indent=2, separators=(",", ": "))
+    def get_json_backend(self) -> JSONBackend:
+        return self.json_backend or get_default_json_backend()
+
+    def json_encode(self, request, data, pretty=False):
+        pretty = bool(self.pretty or pretty or request.GET.get("pretty"))
+        return self.get_json_backend().dumps(data, pretty=pretty)
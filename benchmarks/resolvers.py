@@ -0,0 +1,121 @@
+"""
+Per call overhead of class based resolvers, compiled or not, and of the conversion of large
+inputs to snake_case.
+
+Run from the repository root with:
+
+    DJANGO_SETTINGS_MODULE=tests.settings python -m benchmarks.resolvers
+"""
+import timeit
+
+import django
+import humps.main as humps
+
+django.setup()
+
+from ariadne import QueryType, make_executable_schema  # noqa: E402
+from ariadne_extended.resolvers import Resolver  # noqa: E402
+from ariadne_extended.resolvers.normalize import normalize_arguments  # noqa: E402
+from graphql import graphql_sync  # noqa: E402
+
+
+class AllowAny:
+    def has_permission(self, info, resolver):
+        return True
+
+
+class ItemResolver(Resolver):
+    permission_classes = [AllowAny, AllowAny]
+
+    def retrieve(self, parent, *args, **kwargs):
+        return parent
+
+
+KWARGS = {"itemFilter": {"createdAfter": "2020-01-01", "tagNames": ["a", "b"]}, "pageSize": 10}
+
+
+def get_item_info():
+    """
+    Return the resolve info of a field taking the arguments of `KWARGS`.
+    """
+    type_defs = """
+        input ItemFilter {
+            createdAfter: String
+            tagNames: [String]
+        }
+
+        type Query {
+            item(itemFilter: ItemFilter, pageSize: Int): String
+        }
+    """
+    resolved = []
+    query = QueryType()
+    query.set_field("item", lambda parent, info, **kwargs: resolved.append(info))
+    schema = make_executable_schema(type_defs, [query])
+    graphql_sync(
+        schema,
+        "query ($filter: ItemFilter) { item(itemFilter: $filter, pageSize: 10) }",
+        variable_values={"filter": KWARGS["itemFilter"]},
+    )
+    return resolved[0]
+
+
+def run(resolver, info, number):
+    return min(timeit.repeat(lambda: resolver("parent", info, **KWARGS), number=number, repeat=5))
+
+
+def get_bulk_input():
+    """
+    Return the resolve info and arguments of a mutation with 1000 input objects.
+    """
+    type_defs = """
+        input LineInput {
+            productCode: String
+            unitPrice: Float
+            lineOptions: [String]
+        }
+
+        input OrderInput {
+            orderNumber: String
+            orderLines: [LineInput]
+        }
+
+        type Query {
+            createOrder(orderInput: OrderInput): Boolean
+        }
+    """
+    resolved = []
+    query = QueryType()
+    query.set_field("createOrder", lambda parent, info, **kwargs: resolved.append((info, kwargs)))
+    schema = make_executable_schema(type_defs, [query])
+    lines = [
+        {"productCode": "p%d" % i, "unitPrice": 1.5, "lineOptions": ["a"]} for i in range(1000)
+    ]
+    graphql_sync(
+        schema,
+        "query ($order: OrderInput) { createOrder(orderInput: $order) }",
+        variable_values={"order": {"orderNumber": "1", "orderLines": lines}},
+    )
+    return resolved[0]
+
+
+def main(number=20000):
+    info = get_item_info()
+    default = run(ItemResolver.as_resolver(), info, number)
+    compiled = run(ItemResolver.as_compiled_resolver(), info, number)
+    print("default:  %.2f us/call" % (default / number * 1e6))
+    print("compiled: %.2f us/call" % (compiled / number * 1e6))
+    print("speedup:  %.1fx" % (default / compiled))
+
+    info, kwargs = get_bulk_input()
+    regex = min(timeit.repeat(lambda: humps.decamelize(kwargs), number=20, repeat=5)) / 20
+    schema = (
+        min(timeit.repeat(lambda: normalize_arguments(info, kwargs), number=20, repeat=5)) / 20
+    )
+    print("1000 line input, humps:  %.2f ms" % (regex * 1e3))
+    print("1000 line input, schema: %.2f ms" % (schema * 1e3))
+    print("speedup:  %.1fx" % (regex / schema))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+from unittest.mock import Mock
+
+import pytest
+from ariadne import QueryType, make_executable_schema
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory
+from rest_framework import serializers
+
+from ariadne_extended.graphql import graphql_sync
+from ariadne_extended.resolvers import ListModelResolver, ModelResolver
+from ariadne_extended.response_cache import ResponseCache
+from tests.models import Tag
+from tests.pagination.models import Item
+
+
+class TagSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Tag
+        fields = ["name", "item", "position"]
+
+
+class TagResolver(ModelResolver):
+    queryset = Tag.objects.all()
+    serializer_class = TagSerializer
+    bulk = True
+
+
+def create(items, **config):
+    resolver = TagResolver(None, None, input=items, config=dict(method="create", **config))
+    return resolver.create(None)
+
+
+@pytest.fixture
+def items():
+    return [Item.objects.create(number=str(index), description="") for index in range(2)]
+
+
+@pytest.mark.django_db
+def test_bulk_create(items, django_assert_max_num_queries):
+    Tag.objects.create(name="existing", item=items[0], position=0)
+    inputs = [
+        {"name": "first", "item": items[0].pk, "position": 1},
+        {"name": "existing", "item": items[1].pk, "position": 0},
+        {"name": "second", "item": items[1].pk, "position": 0},
+        {"name": "first", "item": items[1].pk, "position": 1},
+        {"name": "third", "item": items[0].pk, "position": 0},
+        {"name": "fourth", "item": 0, "position": 2},
+        {"name": "fifth", "item": str(items[0].pk), "position": 2},
+    ]
+
+    # related items, unique names and positions, then the insert within a savepoint, the
+    # created tags are inserted one by one when the database doesn't return their keys
+    inserts = 1 if connection.features.can_return_rows_from_bulk_insert else 3
+    with django_assert_max_num_queries(5 + inserts):
+        payloads = create(inputs)
+
+    assert [payload["success"] for payload in payloads] == [
+        True,
+        False,
+        True,
+        False,
+        False,
+        False,
+        True,
+    ]
+    assert payloads[1]["errors"] == {"name": ["tag with this name already exists."]}
+    assert payloads[1]["errors"]["name"][0].code == "unique"
+    assert payloads[3]["errors"] == {"name": ["tag with this name already exists."]}
+    assert payloads[4]["errors"] == {
+        "non_field_errors": ["The fields item, position must make a unique set."]
+    }
+    assert payloads[5]["errors"]["item"][0].code == "does_not_exist"
+    assert payloads[5]["object"] == inputs[5]
+    assert payloads[0]["object"].name == "first"
+    created = [payload["object"] for payload in payloads if payload["success"]]
+    assert all(tag.pk is not None for tag in created)
+    assert [Tag.objects.get(pk=tag.pk).name for tag in created] == ["first", "second", "fifth"]
+
+    assert sorted(Tag.objects.values_list("name", "item", "position")) == [
+        ("existing", items[0].pk, 0),
+        ("fifth", items[0].pk, 2),
+        ("first", items[0].pk, 1),
+        ("second", items[1].pk, 0),
+    ]
+
+
+@pytest.mark.django_db
+def test_bulk_create_disabled(items):
+    # list inputs are passed to a single serializer as before
+    payload = create([{"name": "first", "item": items[0].pk}], bulk=False)
+    assert payload["success"] is False
+    assert not Tag.objects.exists()
+
+
+@pytest.mark.django_db
+def test_bulk_create_invalidates_cached_responses(items):
+    class TagsResolver(ListModelResolver):
+        queryset = Tag.objects.order_by("name")
+
+    query = QueryType()
+    query.set_field("tags", TagsResolver.as_resolver(method="list"))
+    schema = make_executable_schema(
+        """
+        type Query {
+            tags: [Tag!]!
+        }
+
+        type Tag {
+            name: String!
+        }
+        """,
+        [query],
+    )
+    request = RequestFactory().post("/graphql/")
+    request.user = Mock(is_authenticated=True, pk=1)
+    cache.clear()
+    response_cache = ResponseCache()
+
+    def execute():
+        return graphql_sync(
+            schema,
+            {"query": "{ tags { name } }"},
+            context_value=request,
+            response_cache=response_cache,
+        )[1]
+
+    assert execute() == {"data": {"tags": []}}
+    create([{"name": "first", "item": items[0].pk, "position": 0}])
+    # `bulk_create` sends no `post_save`, the tag is invalidated by the resolver
+    assert execute() == {"data": {"tags": [{"name": "first"}]}}
+    cache.clear()
+
+
+class NamedTagSerializer(TagSerializer):
+    def create(self, validated_data):
+        validated_data["name"] = validated_data["name"].upper()
+        return super().create(validated_data)
+
+
+class NamedTagResolver(TagResolver):
+    serializer_class = NamedTagSerializer
+
+
+@pytest.mark.django_db
+def test_bulk_create_serializer_create(items):
+    resolver = NamedTagResolver(
+        None,
+        None,
+        input=[
+            {"name": "first", "item": items[0].pk, "position": 0},
+            {"name": "first", "item": items[1].pk, "position": 0},
+            {"name": "second", "item": items[1].pk, "position": 0},
+        ],
+        config=dict(method="create"),
+    )
+    payloads = resolver.create(None)
+
+    assert [payload["success"] for payload in payloads] == [True, False, True]
+    assert payloads[2]["object"].name == "SECOND"
+    assert sorted(Tag.objects.values_list("name", flat=True)) == ["FIRST", "SECOND"]
+
+
+class OwnedTagResolver(TagResolver):
+    def perform_create(self, serializer):
+        return serializer.save(position=9)
+
+
+@pytest.mark.django_db
+def test_bulk_create_perform_create(items):
+    resolver = OwnedTagResolver(
+        None,
+        None,
+        input=[
+            {"name": "first", "item": items[0].pk, "position": 0},
+            {"name": "first", "item": items[1].pk, "position": 0},
+            {"name": "second", "item": items[1].pk, "position": 0},
+        ],
+        config=dict(method="create"),
+    )
+    payloads = resolver.create(None)
+
+    # the values set by `perform_create` aren't skipped by bulk inputs
+    assert [payload["success"] for payload in payloads] == [True, False, True]
+    assert payloads[2]["object"].pk is not None
+    assert sorted(Tag.objects.values_list("name", "position")) == [("first", 9), ("second", 9)]
+
+
+class PlainTagSerializer(serializers.Serializer):
+    name = serializers.CharField()
+    item = serializers.PrimaryKeyRelatedField(queryset=Item.objects.all())
+
+    def create(self, validated_data):
+        return Tag.objects.create(position=0, **validated_data)
+
+
+class PlainTagResolver(TagResolver):
+    serializer_class = PlainTagSerializer
+
+
+@pytest.mark.django_db
+def test_bulk_create_plain_serializer(items):
+    resolver = PlainTagResolver(
+        None,
+        None,
+        input=[{"name": "first", "item": items[0].pk}, {"name": "second", "item": 0}],
+        config=dict(method="create"),
+    )
+    payloads = resolver.create(None)
+
+    assert [payload["success"] for payload in payloads] == [True, False]
+    assert payloads[0]["object"].pk == Tag.objects.get(name="first").pk
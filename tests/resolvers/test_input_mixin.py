@@ -84,3 +84,59 @@ def test_enum_input_value_resolution(mocker):
     assert result.errors is None
     assert glom(result.data, "on") == "HAPPY"
     assert glom(result.data, "off") == "HAPPY"
+
+
+def test_nested_enum_input_value_resolution():
+    class ClownTypes(Enum):
+        SAD = "Sad Clown"
+        HAPPY = "Happy Clown"
+
+    class ClownActResolver(InputMixin, Resolver):
+        def retrieve(self, *args, **kwargs):
+            data = self.get_input_data()
+            assert data["act_name"] == "juggling"
+            assert data["lead_clown"] == {"clown_type": "Sad Clown"}
+            assert data["other_clowns"] == [{"clown_type": "Happy Clown"}, None]
+            # the operation kwargs keep their enums
+            assert self.operation_kwargs["input"]["lead_clown"]["clown_type"] == ClownTypes.SAD
+            return True
+
+    type_defs = """
+        enum ClownTypes {
+            SAD
+            HAPPY
+        }
+
+        input ClownInput {
+            clownType: ClownTypes
+        }
+
+        input ClownActInput {
+            actName: String
+            leadClown: ClownInput
+            otherClowns: [ClownInput]
+        }
+
+        type Query {
+            clownAct(input: ClownActInput!): Boolean
+        }
+    """
+
+    query = QueryType()
+    query.set_field("clownAct", ClownActResolver.as_resolver())
+    schema = make_executable_schema(type_defs, [query, EnumType("ClownTypes", ClownTypes)])
+
+    result = graphql_sync(
+        schema,
+        """
+            query {
+                clownAct(input: {
+                    actName: "juggling",
+                    leadClown: {clownType: SAD},
+                    otherClowns: [{clownType: HAPPY}, null]
+                })
+            }
+        """,
+    )
+    assert result.errors is None
+    assert result.data == {"clownAct": True}
@@ -0,0 +1,106 @@
+from enum import Enum
+
+from ariadne import EnumType, QueryType, ScalarType, make_executable_schema
+from ariadne_extended.resolvers.normalize import (
+    convert_argument_enums,
+    decamelize,
+    get_field_normalizer,
+    normalize_arguments,
+)
+from graphql import graphql_sync
+
+type_defs = """
+    scalar JSON
+
+    enum Color {
+        DARK_RED
+        LIGHT_BLUE
+    }
+
+    input TreeInput {
+        nodeName: String
+        nodeColor: Color
+        childNodes: [TreeInput!]
+        extraData: JSON
+    }
+
+    type Query {
+        tree(treeInput: TreeInput, maxDepth: Int): Boolean
+    }
+"""
+
+
+class Color(Enum):
+    DARK_RED = "dark-red"
+    LIGHT_BLUE = "light-blue"
+
+
+def execute(query, variables=None):
+    infos = []
+
+    def resolve_tree(parent, info, **kwargs):
+        infos.append((info, kwargs))
+        return True
+
+    query_type = QueryType()
+    query_type.set_field("tree", resolve_tree)
+    schema = make_executable_schema(
+        type_defs, [query_type, ScalarType("JSON"), EnumType("Color", Color)]
+    )
+    result = graphql_sync(schema, query, variable_values=variables)
+    assert result.errors is None
+    return infos[0]
+
+
+TREE = {
+    "nodeName": "root",
+    "nodeColor": "DARK_RED",
+    "childNodes": [{"nodeName": "leaf", "nodeColor": "LIGHT_BLUE", "childNodes": None}],
+    "extraData": {"someKey": [{"otherKey": 1}]},
+}
+
+
+def test_normalize_arguments():
+    info, kwargs = execute(
+        "query ($tree: TreeInput) { tree(treeInput: $tree, maxDepth: 2) }", {"tree": TREE}
+    )
+
+    assert normalize_arguments(info, kwargs) == {
+        "tree_input": {
+            "node_name": "root",
+            "node_color": Color.DARK_RED,
+            "child_nodes": [
+                {"node_name": "leaf", "node_color": Color.LIGHT_BLUE, "child_nodes": None}
+            ],
+            # values of scalars get the same conversion as humps
+            "extra_data": {"some_key": [{"other_key": 1}]},
+        },
+        "max_depth": 2,
+    }
+    # the same names and values as humps
+    assert normalize_arguments(info, kwargs) == decamelize(kwargs)
+    # normalizers are built once per field of a schema
+    assert get_field_normalizer(info) is get_field_normalizer(info)
+
+
+def test_convert_argument_enums():
+    info, kwargs = execute("query ($tree: TreeInput) { tree(treeInput: $tree) }", {"tree": TREE})
+    tree_input = normalize_arguments(info, kwargs)["tree_input"]
+
+    assert convert_argument_enums(info, "tree_input", tree_input) == {
+        "node_name": "root",
+        "node_color": "dark-red",
+        "child_nodes": [{"node_name": "leaf", "node_color": "light-blue", "child_nodes": None}],
+        "extra_data": {"some_key": [{"other_key": 1}]},
+    }
+    # the normalized arguments are left untouched
+    assert tree_input["node_color"] == Color.DARK_RED
+
+
+def test_without_resolve_info():
+    assert normalize_arguments(None, {"someArg": {"nestedArg": 1}}) == {
+        "some_arg": {"nested_arg": 1}
+    }
+    assert convert_argument_enums(None, "input", [{"color": Color.DARK_RED}]) == [
+        {"color": "dark-red"}
+    ]
@@ -1,10 +1,16 @@
-from unittest.mock import Mock, patch
+import asyncio
+import inspect
+from types import MappingProxyType
+from unittest.mock import ANY, Mock, patch
 
 import pytest
-from ariadne import QueryType, make_executable_schema
+from ariadne import ObjectType, QueryType, make_executable_schema
 from ariadne_extended.resolvers import Resolver
+from ariadne_extended.resolvers.exceptions import PermissionDenied
+from ariadne_extended.resolvers.normalize import get_field_normalizer
+from django.test import RequestFactory
 from glom import glom
-from graphql import graphql_sync
+from graphql import graphql, graphql_sync
 
 
 def test_resolver_e2e():
@@ -198,4 +204,274 @@ def test_as_reference_resolver(mock_as_resolver):
     mock_as_resolver.assert_called_with(reference=True, additional_kwargs=True)
 
 
+def test_as_async_resolver_e2e():
+    class ThisResolver(Resolver):
+        def retrieve(self, *args, some_arg=None, **kwargs):
+            return dict(id=123, additional=some_arg)
+
+    type_defs = """
+        type SomethingType {
+            id: ID!
+            additional: String
+        }
+
+        type Query {
+            getThing(someArg: String): SomethingType
+        }
+    """
+
+    query = QueryType()
+
+    resolver = ThisResolver.as_async_resolver()
+    assert inspect.iscoroutinefunction(resolver)
+    assert resolver.resolver_class == ThisResolver
+    query.set_field("getThing", resolver)
+
+    schema = make_executable_schema(type_defs, [query])
+
+    result = asyncio.run(
+        graphql(schema, '{ thing: getThing(someArg: "async") { id additional } }')
+    )
+    assert result.errors is None
+    assert glom(result.data, "thing.id") == "123"
+    assert glom(result.data, "thing.additional") == "async"
+
+
+class CountedPermission:
+    instances = 0
+
+    def __init__(self):
+        CountedPermission.instances += 1
+
+    def has_permission(self, info, resolver):
+        return True
+
+
+def test_compiled_resolver_e2e():
+    class ItemsResolver(Resolver):
+        def retrieve(self, *args, **kwargs):
+            return [dict(id=index) for index in range(3)]
+
+    class LabelResolver(Resolver):
+        permission_classes = [CountedPermission]
+
+        def retrieve(self, parent, *args, label_input=None, **kwargs):
+            assert isinstance(self.config, MappingProxyType)
+            assert self.get_permissions() == self._compiled.permissions
+            options = label_input["label_options"]
+            return "%s-%s-%s" % (label_input["label_prefix"], parent["id"], options["max_length"])
+
+    type_defs = """
+        input LabelOptions {
+            maxLength: Int
+        }
+
+        input LabelInput {
+            labelPrefix: String
+            labelOptions: LabelOptions
+        }
+
+        type Item {
+            id: ID!
+            label(labelInput: LabelInput): String
+        }
+
+        type Query {
+            items: [Item]
+        }
+    """
+
+    query = QueryType()
+    query.set_field("items", ItemsResolver.as_resolver())
+    item = ObjectType("Item")
+    CountedPermission.instances = 0
+    label = LabelResolver.as_compiled_resolver()
+    assert label.resolver_class == LabelResolver
+    item.set_field("label", label)
+
+    schema = make_executable_schema(type_defs, [query, item])
+
+    with patch(
+        "ariadne_extended.resolvers.abc.get_field_normalizer",
+        side_effect=get_field_normalizer,
+    ) as lookup:
+        result = graphql_sync(
+            schema,
+            '{ items { label(labelInput: { labelPrefix: "item", labelOptions: { maxLength: 5 } }) } }',
+        )
+    assert result.errors is None
+    assert [i["label"] for i in result.data["items"]] == ["item-0-5", "item-1-5", "item-2-5"]
+    # permissions are instantiated once per resolver function
+    assert CountedPermission.instances == 1
+    # the argument names of the field are looked up once, not for every item
+    assert lookup.call_count == 1
+
+
+def test_compiled_resolver_method(mocker):
+    method_spy = mocker.spy(ChildResolver, "stub_resolve_method")
+    resolver = ChildResolver.as_resolver(compiled=True, method="stub_resolve_method")
+    assert resolver.resolver_class == ChildResolver
+
+    resolver("parent", "info_obj", someArg={"nestedArg": [{"deepArg": 1}]})
+    method_spy.assert_called_with(ANY, "parent", some_arg={"nested_arg": [{"deep_arg": 1}]})
+
+
+@patch("ariadne_extended.resolvers.Resolver.as_resolver")
+def test_as_compiled_resolver(mock_as_resolver):
+    """
+    Calls `as_resolver` with compiled config kwarg
+    """
+    resolver = ChildResolver.as_compiled_resolver(additional_kwargs=True)
+    mock_as_resolver.assert_called_with(compiled=True, additional_kwargs=True)
+
+
 # def test_all_the_cloned_drf_methods
+
+
+class ItemsPermission:
+    calls = 0
+
+    def has_permission(self, info, resolver):
+        ItemsPermission.calls += 1
+        return True
+
+
+class ParentPermission(ItemsPermission):
+    memoize = False
+
+    def has_permission(self, info, resolver):
+        super().has_permission(info, resolver)
+        return resolver.parent["id"] != 1
+
+
+class CountedThrottle:
+    calls = 0
+
+    def allow_request(self, info, resolver):
+        CountedThrottle.calls += 1
+        return True
+
+
+def make_memoized_schema(permission_classes, **resolver_config):
+    class ItemsResolver(Resolver):
+        def retrieve(self, *args, **kwargs):
+            return [dict(id=index) for index in range(3)]
+
+    class LabelResolver(Resolver):
+        throttle_classes = [CountedThrottle]
+
+        def retrieve(self, parent, *args, **kwargs):
+            return "item-%s" % parent["id"]
+
+    LabelResolver.permission_classes = permission_classes
+    query = QueryType()
+    query.set_field("items", ItemsResolver.as_resolver())
+    item = ObjectType("Item")
+    item.set_field("label", LabelResolver.as_resolver(**resolver_config))
+    item.set_field("other", LabelResolver.as_compiled_resolver(**resolver_config))
+    type_defs = """
+        type Item {
+            label: String
+            other: String
+        }
+
+        type Query {
+            items: [Item]
+        }
+    """
+    return make_executable_schema(type_defs, [query, item])
+
+
+def test_memoized_checks():
+    ItemsPermission.calls = CountedThrottle.calls = 0
+    schema = make_memoized_schema([ItemsPermission], memoize_checks=True)
+
+    result = graphql_sync(
+        schema, "{ items { label other } }", context_value=RequestFactory().get("/graphql/")
+    )
+    assert result.errors is None
+    # checked once per request for each resolver function config
+    assert ItemsPermission.calls == 2
+    assert CountedThrottle.calls == 2
+
+    result = graphql_sync(
+        schema, "{ items { label other } }", context_value=RequestFactory().get("/graphql/")
+    )
+    assert ItemsPermission.calls == 4
+
+
+def test_memoized_checks_opt_out():
+    ItemsPermission.calls = CountedThrottle.calls = 0
+    schema = make_memoized_schema([ParentPermission], memoize_checks=True)
+
+    result = graphql_sync(
+        schema, "{ items { label } }", context_value=RequestFactory().get("/graphql/")
+    )
+    assert ItemsPermission.calls == 3
+    assert [error.path for error in result.errors] == [["items", 1, "label"]]
+
+    CountedThrottle.calls = 0
+    schema = make_memoized_schema([ItemsPermission])
+    graphql_sync(schema, "{ items { label } }", context_value=RequestFactory().get("/graphql/"))
+    assert ItemsPermission.calls == 6
+    assert CountedThrottle.calls == 3
+
+
+class ArgumentPermission:
+    def has_permission(self, info, resolver):
+        return resolver.operation_kwargs.get("secret") is None
+
+
+def test_checks_not_memoized_by_default():
+    class LabelResolver(Resolver):
+        permission_classes = [ArgumentPermission]
+
+        def retrieve(self, parent, *args, **kwargs):
+            return "label"
+
+    query = QueryType()
+    query.set_field("label", LabelResolver.as_resolver())
+    query.set_field("other", LabelResolver.as_compiled_resolver())
+    schema = make_executable_schema(
+        """
+        type Query {
+            label(secret: String): String
+            other(secret: String): String
+        }
+        """,
+        [query],
+    )
+
+    # the outcome of the first field isn't reused for the others
+    result = graphql_sync(
+        schema,
+        '{ label a: label(secret: "x") other b: other(secret: "x") }',
+        context_value=RequestFactory().get("/graphql/"),
+    )
+    assert result.data == {"label": "label", "a": None, "other": "label", "b": None}
+    assert [error.path for error in result.errors] == [["a"], ["b"]]
+
+
+def test_memoized_checks_dict_context():
+    ItemsPermission.calls = CountedThrottle.calls = 0
+    schema = make_memoized_schema([ItemsPermission], memoize_checks=True)
+
+    # no request to scope the outcomes to, checks aren't memoized
+    result = graphql_sync(schema, "{ items { label } }", context_value={})
+    assert result.errors is None
+    assert ItemsPermission.calls == 3
+    assert CountedThrottle.calls == 3
+
+
+def test_check_objects_permissions(mocker):
+    class PagePermission:
+        message = "Too many objects"
+
+        def has_objects_permission(self, info, resolver, objs):
+            return len(objs) < 3
+
+    resolver = Resolver(None, "info_obj")
+    resolver.permission_classes = [CountedPermission, PagePermission]
+    resolver.check_objects_permissions("info_obj", [1, 2])
+    with pytest.raises(PermissionDenied, match="Too many objects"):
+        resolver.check_objects_permissions("info_obj", [1, 2, 3])
@@ -26,6 +26,8 @@ INSTALLED_APPS = [
     "ariadne_extended.cursor_pagination",
     "ariadne_extended.uuid",
     "ariadne_extended.payload",
+    "ariadne_extended.cost",
+    "ariadne_extended.cache_control",
     "ariadne_extended.contrib.waffle_graph",
 ]
 
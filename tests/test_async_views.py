@@ -0,0 +1,264 @@
+import asyncio
+import hashlib
+import json
+from collections import defaultdict
+from urllib.parse import urlencode
+from unittest.mock import Mock
+
+import django
+import pytest
+
+if django.VERSION < (3, 1):
+    pytest.skip("Async views require Django 3.1", allow_module_level=True)
+
+from ariadne import QueryType, make_executable_schema
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.test import AsyncClient, AsyncRequestFactory
+from django.urls import path
+
+from ariadne_extended.async_views import AsyncBaseGraphQLView, AsyncBatchGraphQLView
+from ariadne_extended.metrics import InMemoryExporter, Metrics
+from ariadne_extended.persisted_queries import LocalPersistedQueryStore
+from ariadne_extended.resolvers import Resolver
+from ariadne_extended.response_cache import ResponseCache, anonymous_scope
+
+type_defs = """
+    type Query {
+        hello(name: String): String
+        wait(delay: Float!): Float
+        signal(name: String!): String
+        waitFor(name: String!): String
+    }
+"""
+
+
+class HelloResolver(Resolver):
+    def retrieve(self, parent, name=None):
+        return "Hello %s" % (name or "world")
+
+
+async def resolve_wait(*_, delay):
+    await asyncio.sleep(delay)
+    return delay
+
+
+events = defaultdict(asyncio.Event)
+
+
+async def resolve_signal(*_, name):
+    events[name].set()
+    return name
+
+
+async def resolve_wait_for(*_, name):
+    # only set by an entry running at the same time
+    await asyncio.wait_for(events[name].wait(), timeout=5)
+    return name
+
+
+query = QueryType()
+query.set_field("hello", HelloResolver.as_async_resolver())
+query.set_field("wait", resolve_wait)
+query.set_field("signal", resolve_signal)
+query.set_field("waitFor", resolve_wait_for)
+
+schema = make_executable_schema(type_defs, [query])
+
+
+class AuthenticatedMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.user = Mock(is_authenticated=True)
+        return self.get_response(request)
+
+
+urlpatterns = [
+    path("graphql/", AsyncBaseGraphQLView.as_view(schema=schema)),
+    path("batch/", AsyncBatchGraphQLView.as_view(schema=schema, batch=True)),
+]
+
+
+def make_request(data):
+    request = AsyncRequestFactory().post(
+        "/graphql/", data=json.dumps(data), content_type="application/json"
+    )
+    request.user = Mock(is_authenticated=True)
+    return request
+
+
+def test_async_base_view():
+    view = AsyncBaseGraphQLView.as_view(schema=schema)
+    response = asyncio.run(view(make_request({"query": '{ hello(name: "async") }'})))
+    assert response.status_code == 200
+    assert json.loads(response.content)["data"] == {"hello": "Hello async"}
+
+
+def test_async_batch_view_runs_entries_concurrently():
+    events.clear()
+    view = AsyncBatchGraphQLView.as_view(schema=schema, batch=True)
+    # the first entry waits for the last one, it would time out if they ran in order
+    entries = [
+        {"id": 1, "query": '{ waitFor(name: "last") }'},
+        {"id": 2, "query": "{ hello }"},
+        {"id": 3, "query": '{ signal(name: "last") }'},
+    ]
+
+    response = asyncio.run(view(make_request(entries)))
+    assert response.status_code == 200
+    assert json.loads(response.content) == [
+        {"data": {"waitFor": "last"}, "id": 1, "status": 200},
+        {"data": {"hello": "Hello world"}, "id": 2, "status": 200},
+        {"data": {"signal": "last"}, "id": 3, "status": 200},
+    ]
+
+
+def test_async_batch_view_operation_name():
+    view = AsyncBatchGraphQLView.as_view(schema=schema, batch=True)
+    document = 'query A { hello(name: "a") } query B { hello(name: "b") }'
+    entries = [
+        {"id": 1, "query": document, "operationName": "A"},
+        {"id": 2, "query": document, "operationName": "B"},
+    ]
+
+    response = asyncio.run(view(make_request(entries)))
+    assert json.loads(response.content) == [
+        {"data": {"hello": "Hello a"}, "id": 1, "status": 200},
+        {"data": {"hello": "Hello b"}, "id": 2, "status": 200},
+    ]
+
+
+def test_async_views_served_by_django(settings):
+    settings.ROOT_URLCONF = "tests.test_async_views"
+    settings.MIDDLEWARE = ["tests.test_async_views.AuthenticatedMiddleware"]
+    client = AsyncClient()
+
+    async def run():
+        return (
+            await client.post(
+                "/graphql/", {"query": "{ hello }"}, content_type="application/json"
+            ),
+            await client.get("/graphql/?%s" % urlencode({"query": "{ hello }"})),
+            await client.put("/graphql/"),
+            await client.post(
+                "/batch/", [{"id": 1, "query": "{ hello }"}], content_type="application/json"
+            ),
+        )
+
+    post, get, put, batch = asyncio.run(run())
+    assert json.loads(post.content) == {"data": {"hello": "Hello world"}}
+    assert json.loads(get.content) == {"data": {"hello": "Hello world"}}
+    assert put.status_code == 405
+    assert json.loads(batch.content) == [
+        {"data": {"hello": "Hello world"}, "id": 1, "status": 200}
+    ]
+
+
+def test_async_batch_view_incremental_parsing():
+    view = AsyncBatchGraphQLView.as_view(
+        schema=schema, batch=True, incremental_parsing=True, parsing_chunk_size=7
+    )
+    response = asyncio.run(view(make_request([{"id": 1, "query": "{ hello }"}] * 3)))
+    assert [result["data"]["hello"] for result in json.loads(response.content)] == [
+        "Hello world"
+    ] * 3
+
+    request = AsyncRequestFactory().post(
+        "/graphql/",
+        data='[{"id": 1, "query": "{ hello }"}, {"id": 2',
+        content_type="application/json",
+    )
+    request.user = Mock(is_authenticated=True)
+    assert asyncio.run(view(request)).status_code == 400
+
+
+def test_async_batch_view_stream_batch():
+    with pytest.raises(ImproperlyConfigured):
+        AsyncBatchGraphQLView.as_view(schema=schema, batch=True, stream_batch=True)
+
+
+def test_async_batch_view_records_saved_executions():
+    exporter = InMemoryExporter()
+    view = AsyncBatchGraphQLView.as_view(schema=schema, batch=True, metrics=Metrics([exporter]))
+    response = asyncio.run(view(make_request([{"id": 1, "query": "{ hello }"}] * 3)))
+    assert [result["id"] for result in json.loads(response.content)] == [1, 1, 1]
+    assert exporter.saved_executions == 2
+
+
+def in_event_loop():
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+class ThreadCheckingResponseCache(ResponseCache):
+    calls = []
+
+    def get(self, key):
+        self.calls.append(("get", in_event_loop()))
+        return super().get(key)
+
+    def set(self, key, response, versions):
+        self.calls.append(("set", in_event_loop()))
+        return super().set(key, response, versions)
+
+
+class ThreadCheckingQueryStore(LocalPersistedQueryStore):
+    calls = []
+
+    def get(self, query_hash):
+        self.calls.append(("get", in_event_loop()))
+        return super().get(query_hash)
+
+    def set(self, query_hash, query):
+        self.calls.append(("set", in_event_loop()))
+        return super().set(query_hash, query)
+
+
+def test_async_view_caches_outside_of_event_loop():
+    cache.clear()
+    response_cache = ThreadCheckingResponseCache(scope=anonymous_scope)
+    query_store = ThreadCheckingQueryStore()
+    view = AsyncBaseGraphQLView.as_view(
+        schema=schema, response_cache=response_cache, persisted_query_store=query_store
+    )
+    query = "{ hello }"
+    data = {
+        "query": query,
+        "extensions": {
+            "persistedQuery": {
+                "version": 1,
+                "sha256Hash": hashlib.sha256(query.encode("utf-8")).hexdigest(),
+            }
+        },
+    }
+
+    for _ in range(2):
+        response = asyncio.run(view(make_request(data)))
+        assert json.loads(response.content)["data"] == {"hello": "Hello world"}
+    # the second response is cached, the synchronous cache is never called on the loop
+    assert ("set", False) in response_cache.calls
+    assert ("get", False) in response_cache.calls
+    assert all(not in_loop for _, in_loop in response_cache.calls + query_store.calls)
+    assert query_store.calls
+    cache.clear()
+
+
+def test_async_batch_view_refuses_mutations_over_get():
+    view = AsyncBatchGraphQLView.as_view(schema=schema, batch=True)
+    request = AsyncRequestFactory().generic(
+        "GET",
+        "/graphql/",
+        data=json.dumps(
+            [{"id": 1, "query": "{ hello }"}, {"id": 2, "query": "mutation { hello }"}]
+        ),
+        content_type="application/json",
+    )
+    request.user = Mock(is_authenticated=True)
+    response = asyncio.run(view(request))
+    assert response.status_code == 405
+    assert response["Allow"] == "POST"
@@ -0,0 +1,206 @@
+import json
+import os
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+from ariadne import MutationType, QueryType, make_executable_schema
+from django.test import RequestFactory
+from graphql import parse
+
+import ariadne_extended.cache_control
+from ariadne_extended.cache_control import (
+    CacheControl,
+    CachePolicy,
+    add_version_token,
+    set_cache_hint,
+)
+from ariadne_extended.graphql import graphql_sync
+from ariadne_extended.views import BaseGraphQLView, BatchGraphQLView
+
+with open(
+    os.path.join(os.path.dirname(ariadne_extended.cache_control.__file__), "schema.graphql")
+) as f:
+    cache_control_type_defs = f.read()
+
+type_defs = """
+    type Query {
+        news: [Article!]! @cacheControl(maxAge: 30)
+        profile: Profile @cacheControl(maxAge: 120, scope: PRIVATE)
+        static: Static
+        version: String
+        hello: String @cacheControl(maxAge: 300)
+        hinted: String @cacheControl(maxAge: 300)
+    }
+
+    type Mutation {
+        hello: String
+    }
+
+    type Article @cacheControl(maxAge: 60) {
+        title: String
+        author: Author
+    }
+
+    type Author {
+        name: String
+    }
+
+    type Profile {
+        name: String
+    }
+
+    type Static @cacheControl(maxAge: 600) {
+        name: String
+        article: Article @cacheControl(inheritMaxAge: true)
+    }
+"""
+
+query = QueryType()
+mutation = MutationType()
+
+
+@query.field("hello")
+@mutation.field("hello")
+def resolve_hello(*_):
+    return "Hello"
+
+
+@query.field("news")
+def resolve_news(*_):
+    return []
+
+
+@query.field("version")
+def resolve_version(_, info):
+    add_version_token(info, info.context.GET.get("token", "1"))
+    return "versioned"
+
+
+@query.field("hinted")
+def resolve_hinted(_, info):
+    set_cache_hint(info, 20, "PRIVATE")
+    return "hinted"
+
+
+schema = make_executable_schema([cache_control_type_defs, type_defs], [query, mutation])
+
+
+def get_policy(query_string, **kwargs):
+    return CacheControl(**kwargs).get_policy(schema, parse(query_string))
+
+
+def test_cache_policy_from_hints():
+    assert get_policy("{ hello }") == CachePolicy(300, "PUBLIC")
+    assert get_policy("{ hello news { title } }") == CachePolicy(30, "PUBLIC")
+    assert get_policy("{ hello profile { name } }") == CachePolicy(120, "PRIVATE")
+    assert get_policy("{ static { name article { title } } }") == CachePolicy(600, "PUBLIC")
+    assert get_policy("{ static { article { author { name } } } }") == CachePolicy(0, "PUBLIC")
+
+
+def test_cache_policy_defaults():
+    assert get_policy("{ version }") == CachePolicy(0, "PUBLIC")
+    assert get_policy("{ version }", default_max_age=10) == CachePolicy(10, "PUBLIC")
+    assert get_policy("{ hello news { author { name } } }", default_max_age=5) == CachePolicy(
+        5, "PUBLIC"
+    )
+    assert get_policy("fragment F on Article { author { name } } { news { ...F } }") == (
+        CachePolicy(0, "PUBLIC")
+    )
+    assert get_policy("mutation { hello }") == CachePolicy(0, "PUBLIC")
+
+
+def get(view, query_string, **extra):
+    request = RequestFactory().get("/graphql/", {"query": query_string}, **extra)
+    request.user = Mock(is_authenticated=True, pk=1)
+    return view(request)
+
+
+def test_view_conditional_get():
+    view = BaseGraphQLView.as_view(schema=schema, cache_control=CacheControl())
+    response = get(view, "{ hello }")
+    assert response.status_code == 200
+    assert response["Cache-Control"] == "max-age=300, public"
+    etag = response["ETag"]
+
+    response = get(view, "{ hello }", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response["ETag"] == etag
+    assert response["Cache-Control"] == "max-age=300, public"
+
+    response = get(view, "{ hello news { title } }", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response["Cache-Control"] == "max-age=30, public"
+
+
+def test_view_without_cache_control():
+    view = BaseGraphQLView.as_view(schema=schema)
+    response = get(view, "{ hello }")
+    assert not response.has_header("Cache-Control")
+    assert not response.has_header("ETag")
+
+
+def test_view_uncacheable_responses():
+    view = BaseGraphQLView.as_view(schema=schema, cache_control=CacheControl())
+    response = get(view, "{ version }")
+    assert response["Cache-Control"] == "no-cache"
+
+    response = get(view, "{ nope }")
+    assert response.status_code == 400
+    assert not response.has_header("Cache-Control")
+    assert not response.has_header("ETag")
+
+    request = RequestFactory().post(
+        "/graphql/", {"query": "mutation { hello }"}, content_type="application/json"
+    )
+    response = view(request)
+    assert response["Cache-Control"] == "no-cache"
+    assert not response.has_header("ETag")
+
+
+def test_view_version_tokens_skip_rendering(mocker):
+    render = mocker.spy(BaseGraphQLView, "render_result")
+    view = BaseGraphQLView.as_view(schema=schema, cache_control=CacheControl())
+    etag = get(view, "{ version }", HTTP_IF_NONE_MATCH="nope")["ETag"]
+    assert render.call_count == 1
+
+    response = get(view, "{ version }", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert render.call_count == 1
+
+    request = RequestFactory().get(
+        "/graphql/", {"query": "{ version }", "token": "2"}, HTTP_IF_NONE_MATCH=etag
+    )
+    response = view(request)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+
+def test_batch_view_conditional_get():
+    view = BatchGraphQLView.as_view(schema=schema, cache_control=CacheControl())
+    response = get(view, "{ hello profile { name } }")
+    assert json.loads(response.content) == {"data": {"hello": "Hello", "profile": None}}
+    assert response["Cache-Control"] == "max-age=120, private"
+
+    response = get(view, "{ hello profile { name } }", HTTP_IF_NONE_MATCH=response["ETag"])
+    assert response.status_code == 304
+
+
+def test_hints_with_dict_context():
+    # no request to cache the response of, hints are ignored
+    success, result = graphql_sync(
+        schema, {"query": "{ hinted }"}, context_value={}, cache_control=CacheControl()
+    )
+    assert success
+    assert result == {"data": {"hinted": "hinted"}}
+
+
+def test_hints_with_custom_context():
+    view = BaseGraphQLView.as_view(
+        schema=schema,
+        cache_control=CacheControl(),
+        context_value=lambda request: SimpleNamespace(user=request.user),
+    )
+    response = get(view, "{ hinted }")
+    assert response.status_code == 200
+    assert response["Cache-Control"] == "max-age=20, private"
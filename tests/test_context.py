@@ -0,0 +1,102 @@
+import json
+from unittest.mock import Mock
+
+from ariadne import MutationType, QueryType, make_executable_schema
+from django.test import RequestFactory
+
+from ariadne_extended.context import RequestContext, get_request_context
+from ariadne_extended.views import BatchGraphQLView
+
+from .test_views import batch_request
+
+type_defs = """
+    type Query {
+        value: Int
+    }
+
+    type Mutation {
+        increment: Int
+    }
+"""
+
+query = QueryType()
+mutation = MutationType()
+state = {"value": 0, "loads": 0}
+
+
+@query.field("value")
+def resolve_value(_, info):
+    cache = get_request_context(info.context).get_cache("value")
+    if "value" not in cache:
+        state["loads"] += 1
+        cache["value"] = state["value"]
+    return cache["value"]
+
+
+@mutation.field("increment")
+def resolve_increment(*_):
+    state["value"] += 1
+    return state["value"]
+
+
+schema = make_executable_schema(type_defs, [query, mutation])
+
+
+def test_request_context_loaders_and_caches():
+    request_context = RequestContext()
+    loader = request_context.get_loader("things", dict)
+    assert request_context.get_loader("things", dict) is loader
+    request_context.get_cache("things")["a"] = 1
+    assert request_context.get_cache("things") == {"a": 1}
+
+    request_context.clear()
+    assert request_context.get_loader("things", dict) is not loader
+    assert request_context.get_cache("things") == {}
+
+
+def test_request_context_of_context_value():
+    request = RequestFactory().get("/graphql/")
+    assert get_request_context({"request": request}) is get_request_context(request)
+    assert get_request_context(Mock(request=request)) is get_request_context(request)
+
+
+def test_batch_entries_share_context():
+    state.update(value=0, loads=0)
+    context_value = Mock(side_effect=lambda request: request)
+    view = BatchGraphQLView.as_view(
+        schema=schema, batch=True, context_value=context_value, deduplicate_batch=False
+    )
+    request = batch_request([{"id": i, "query": "{ value }"} for i in range(5)])
+    response = view(request)
+
+    assert [result["data"]["value"] for result in json.loads(response.content)] == [0] * 5
+    assert state["loads"] == 1
+    context_value.assert_called_once()
+
+    timings = get_request_context(request).timings
+    assert [timing["id"] for timing in timings] == list(range(5))
+    assert all(timing["duration"] > 0 for timing in timings)
+
+
+def test_mutations_clear_batch_caches():
+    state.update(value=0, loads=0)
+    view = BatchGraphQLView.as_view(
+        schema=schema, batch=True, concurrent_batch=True, deduplicate_batch=False
+    )
+    response = view(
+        batch_request(
+            [
+                {"id": 1, "query": "{ value }"},
+                {"id": 2, "query": "{ value }"},
+                {"id": 3, "query": "mutation { increment }"},
+                {"id": 4, "query": "{ value }"},
+            ]
+        )
+    )
+    assert [result["data"] for result in json.loads(response.content)] == [
+        {"value": 0},
+        {"value": 0},
+        {"increment": 1},
+        {"value": 1},
+    ]
+    assert state["loads"] == 2
@@ -0,0 +1,118 @@
+import pytest
+from ariadne import QueryType, make_executable_schema
+from graphql import parse
+
+from ariadne_extended.cost import QueryCostValidator, cost_validator
+from ariadne_extended.graphql import graphql_sync
+
+type_defs = """
+    directive @cost(complexity: Int, multipliers: [String!]) on FIELD_DEFINITION
+
+    type Thing {
+        id: ID!
+        name: String
+        children(first: Int, last: Int): [Thing] @cost(complexity: 2)
+        related: Thing
+    }
+
+    type Query {
+        things(first: Int, last: Int): [Thing]
+        limited(size: Int = 5): [Thing] @cost(complexity: 1, multipliers: ["size"])
+        thing: Thing
+    }
+"""
+
+query = QueryType()
+query.set_field("things", lambda *_, **kwargs: [])
+query.set_field("thing", lambda *_: {"id": 1, "name": "one"})
+
+schema = make_executable_schema(type_defs, [query])
+
+
+def estimate(validator, query, variables=None, operation_name=None):
+    return validator.estimate(schema, parse(query), variables, operation_name)
+
+
+def test_cost_uses_multipliers_and_directive():
+    validator = QueryCostValidator()
+    assert estimate(validator, "{ thing { id name } }") == (1, 2)
+    # (1 + 10 * (2 + 0)) * 5
+    assert estimate(validator, "{ things(first: 5) { id children(first: 10) { id } } }") == (
+        105,
+        3,
+    )
+    assert estimate(validator, "{ things(last: 3) { related { id } } }") == (6, 3)
+
+
+def test_cost_uses_argument_defaults_and_default_list_size():
+    validator = QueryCostValidator(default_list_size=20)
+    assert estimate(validator, "{ limited { id } }") == (5, 2)
+    assert estimate(validator, "{ things { id } }") == (20, 2)
+
+
+def test_cost_with_fragments_and_variables():
+    validator = QueryCostValidator()
+    document = """
+        query Things($first: Int = 2) {
+            things(first: $first) { ...ThingFields }
+        }
+        fragment ThingFields on Thing {
+            ... on Thing { related { id } }
+        }
+    """
+    assert estimate(validator, document) == (4, 3)
+    assert estimate(validator, document, {"first": 50}) == (100, 3)
+
+
+def test_cost_map():
+    validator = QueryCostValidator(cost_map={"Query": {"thing": {"complexity": 7}}})
+    assert estimate(validator, "{ thing { id } }") == (7, 2)
+
+
+def test_cost_is_cached_per_variable_shape(mocker):
+    validator = QueryCostValidator()
+    analyze = mocker.spy(validator, "analyze")
+    document = parse("query ($first: Int, $name: String) { things(first: $first) { id } }")
+
+    validator.estimate(schema, document, {"first": 10, "name": "a"})
+    validator.estimate(schema, document, {"first": 10, "name": "b"})
+    assert analyze.call_count == 1
+    assert validator.estimate(schema, document, {"first": 11}).cost == 11
+    assert analyze.call_count == 2
+
+
+def test_cost_validator_rejects_expensive_operations():
+    validator = QueryCostValidator(maximum_cost=50, maximum_depth=2)
+    success, result = graphql_sync(
+        schema,
+        {"query": "{ things(first: 100) { id } }"},
+        validation_rules=[validator],
+    )
+    assert not success
+    assert result["errors"][0]["extensions"]["code"] == "COST_LIMIT_EXCEEDED"
+
+    success, result = graphql_sync(
+        schema,
+        {"query": "{ thing { related { related { id } } } }"},
+        validation_rules=[validator],
+    )
+    assert not success
+    assert result["errors"][0]["extensions"]["code"] == "DEPTH_LIMIT_EXCEEDED"
+
+    success, result = graphql_sync(
+        schema,
+        {"query": "query ($n: Int) { things(first: $n) { id } }", "variables": {"n": 10}},
+        validation_rules=[validator],
+    )
+    assert success
+    assert result == {"data": {"things": []}}
+
+
+def test_cost_validator_rule_class():
+    success, result = graphql_sync(
+        schema,
+        {"query": "{ things(first: 100) { id } }"},
+        validation_rules=[cost_validator(maximum_cost=10)],
+    )
+    assert not success
+    assert result["errors"][0]["extensions"]["cost"] == 100
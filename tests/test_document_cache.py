@@ -0,0 +1,76 @@
+import pytest
+from ariadne import QueryType, make_executable_schema
+from graphql import GraphQLError
+from graphql.validation import ValidationRule
+
+from ariadne_extended.document_cache import DocumentCache
+from ariadne_extended.graphql import graphql_sync
+
+type_defs = """
+    type Query {
+        hello: String
+    }
+"""
+
+query = QueryType()
+query.set_field("hello", lambda *_: "world")
+
+schema = make_executable_schema(type_defs, [query])
+
+
+class NoopRule(ValidationRule):
+    pass
+
+
+def test_document_cache_hits_and_misses():
+    cache = DocumentCache(maxsize=10)
+    document, errors = cache.parse_and_validate(schema, "{ hello }")
+    assert errors == []
+    assert cache.parse_and_validate(schema, "{ hello }")[0] is document
+    assert cache.info() == (1, 1, 0, 10, 1)
+
+
+def test_document_cache_keys_on_schema_and_rules():
+    cache = DocumentCache()
+    other_schema = make_executable_schema(type_defs, [query])
+    cache.parse_and_validate(schema, "{ hello }")
+    cache.parse_and_validate(other_schema, "{ hello }")
+    cache.parse_and_validate(schema, "{ hello }", [NoopRule])
+    assert cache.info().misses == 3
+    assert cache.info().currsize == 3
+
+
+def test_document_cache_caches_validation_errors():
+    cache = DocumentCache()
+    _, errors = cache.parse_and_validate(schema, "{ nope }")
+    assert len(errors) == 1
+    assert cache.parse_and_validate(schema, "{ nope }")[1] is errors
+    assert cache.info().hits == 1
+
+
+def test_document_cache_does_not_cache_syntax_errors():
+    cache = DocumentCache()
+    with pytest.raises(GraphQLError):
+        cache.parse_and_validate(schema, "{ hello")
+    assert cache.info().currsize == 0
+
+
+def test_document_cache_evicts_least_recently_used():
+    cache = DocumentCache(maxsize=2)
+    first, _ = cache.parse_and_validate(schema, "{ hello }")
+    cache.parse_and_validate(schema, "query A { hello }")
+    cache.parse_and_validate(schema, "{ hello }")
+    cache.parse_and_validate(schema, "query B { hello }")
+    assert cache.info().evictions == 1
+    assert cache.parse_and_validate(schema, "{ hello }")[0] is first
+    cache.parse_and_validate(schema, "query A { hello }")
+    assert cache.info().misses == 4
+
+
+def test_graphql_sync_uses_document_cache():
+    cache = DocumentCache()
+    for _ in range(3):
+        success, result = graphql_sync(schema, {"query": "{ hello }"}, document_cache=cache)
+        assert success
+        assert result == {"data": {"hello": "world"}}
+    assert cache.info().hits == 2
@@ -0,0 +1,107 @@
+import datetime
+import io
+import json
+import uuid
+from decimal import Decimal
+from unittest.mock import Mock
+
+import pytest
+from django.test import RequestFactory
+
+from ariadne_extended import encoders
+from ariadne_extended.encoders import (
+    OrjsonBackend,
+    StdlibJSONBackend,
+    get_default_json_backend,
+    iter_json_array,
+)
+from ariadne_extended.views import BatchGraphQLView
+
+from .test_views import batch_request, schema
+
+VALUES = {
+    "uuid": uuid.UUID("3f1c9d6e-0b5a-4a4e-9c61-4bb0b0c2f5de"),
+    "date": datetime.date(2020, 5, 1),
+    "decimal": Decimal("1.50"),
+}
+
+backends = [StdlibJSONBackend]
+if encoders.orjson is not None:
+    backends.append(OrjsonBackend)
+
+
+@pytest.mark.parametrize("backend_class", backends)
+def test_backend_round_trip(backend_class):
+    backend = backend_class()
+    assert backend.loads(backend.dumps(VALUES)) == {
+        "uuid": "3f1c9d6e-0b5a-4a4e-9c61-4bb0b0c2f5de",
+        "date": "2020-05-01",
+        "decimal": "1.50",
+    }
+    assert backend.loads(b'{"a": [1, 2]}') == {"a": [1, 2]}
+
+
+@pytest.mark.parametrize("backend_class", backends)
+def test_backend_pretty(backend_class):
+    pretty = backend_class().dumps({"b": 1, "a": 2}, pretty=True)
+    if isinstance(pretty, bytes):
+        pretty = pretty.decode()
+    assert pretty == '{\n  "a": 2,\n  "b": 1\n}'
+
+
+def test_default_backend_setting(settings, monkeypatch):
+    monkeypatch.setattr(encoders, "_default_backend", None)
+    settings.ARIADNE_EXTENDED_JSON_BACKEND = "ariadne_extended.encoders.StdlibJSONBackend"
+    assert isinstance(get_default_json_backend(), StdlibJSONBackend)
+    monkeypatch.setattr(encoders, "_default_backend", None)
+
+
+def test_default_backend_is_stdlib(settings, monkeypatch):
+    monkeypatch.setattr(encoders, "_default_backend", None)
+    if hasattr(settings, "ARIADNE_EXTENDED_JSON_BACKEND"):
+        del settings.ARIADNE_EXTENDED_JSON_BACKEND
+    # orjson being installed doesn't change the output of existing views
+    monkeypatch.setattr(encoders, "orjson", Mock())
+    assert type(get_default_json_backend()) is StdlibJSONBackend
+    monkeypatch.setattr(encoders, "_default_backend", None)
+
+
+def test_orjson_backend_setting(settings, monkeypatch):
+    if encoders.orjson is None:
+        pytest.skip("orjson isn't installed")
+    monkeypatch.setattr(encoders, "_default_backend", None)
+    settings.ARIADNE_EXTENDED_JSON_BACKEND = "ariadne_extended.encoders.OrjsonBackend"
+    assert isinstance(get_default_json_backend(), OrjsonBackend)
+    monkeypatch.setattr(encoders, "_default_backend", None)
+
+
+def test_batch_is_encoded_in_a_single_pass():
+    backend = StdlibJSONBackend()
+    backend.dumps = Mock(wraps=backend.dumps)
+    view = BatchGraphQLView.as_view(schema=schema, batch=True, json_backend=backend)
+    response = view(
+        batch_request([{"id": 1, "query": "{ hello }"}, {"id": 2, "query": "{ hello }"}])
+    )
+
+    assert backend.dumps.call_count == 1
+    assert [entry["id"] for entry in json.loads(response.content)] == [1, 2]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 64 * 1024])
+def test_iter_json_array(chunk_size):
+    entries = [
+        {"id": 1, "query": '{ hello(name: "]}\\"{[") }'},
+        {"id": 2, "variables": {"list": [1, {"nested": "é"}]}},
+        [],
+    ]
+    body = json.dumps(entries, ensure_ascii=False).encode()
+    assert list(iter_json_array(io.BytesIO(body), json.loads, chunk_size)) == entries
+    assert list(iter_json_array(io.BytesIO(b" [ ] "), json.loads, chunk_size)) == []
+
+
+@pytest.mark.parametrize(
+    "body", [b"", b"{}", b"[1]", b"[{}", b"[{} {}]", b"[{}]]", b'[{"a": "b}]', b"[{},]"]
+)
+def test_iter_json_array_invalid(body):
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.BytesIO(body), json.loads, 2))
@@ -0,0 +1,555 @@
+import asyncio
+
+import pytest
+from ariadne import ObjectType, QueryType, make_executable_schema
+from ariadne.contrib.federation import FederatedObjectType, make_federated_schema
+from django.test import RequestFactory
+from graphql import graphql, graphql_sync
+
+from ariadne_extended.cursor_pagination import RelayModelMixin
+from ariadne_extended.filters import FilterMixin
+from ariadne_extended.resolvers import GenericModelResolver, ListModelResolver, ModelResolver
+from ariadne_extended.resolvers.loaders import ModelLoader, RelationLoader
+
+from .models import Note, Tag
+from .pagination.models import Item, SomeItem
+
+type_defs = """
+    type Query {
+        item(id: ID!): Item
+    }
+
+    type Item {
+        id: ID!
+        number: String!
+    }
+"""
+
+QUERY = """
+    {
+        a: item(id: %s) { number }
+        b: item(id: %s) { number }
+        c: item(id: %s) { number }
+        d: item(id: %s) { number }
+    }
+"""
+
+
+class DenyNumber:
+    def has_permission(self, info, resolver):
+        return True
+
+    def has_object_permission(self, info, resolver, obj):
+        return obj.number != "denied"
+
+
+class ItemResolver(GenericModelResolver):
+    queryset = Item.objects.all()
+    lookup_arg = "id"
+    batched = True
+    permission_classes = [DenyNumber]
+
+
+def make_schema(resolver):
+    query = QueryType()
+    query.set_field("item", resolver)
+    return make_executable_schema(type_defs, [query])
+
+
+@pytest.fixture
+def items():
+    return [Item.objects.create(number=str(index), description="") for index in range(3)]
+
+
+@pytest.mark.django_db
+def test_sync_batched_retrieve(items, django_assert_num_queries):
+    schema = make_schema(ItemResolver.as_resolver())
+    pks = [items[0].pk, items[1].pk, items[0].pk, 0]
+
+    # fields which aren't of listed objects are fetched one by one, the repeated lookup is
+    # served from the cache of the request
+    with django_assert_num_queries(3):
+        result = graphql_sync(
+            schema, QUERY % tuple(pks), context_value=RequestFactory().get("/graphql/")
+        )
+
+    assert result.errors is None
+    assert result.data == {
+        "a": {"number": "0"},
+        "b": {"number": "1"},
+        "c": {"number": "0"},
+        "d": None,
+    }
+
+
+tags_type_defs = """
+    type Query {
+        tags: [Tag!]!
+    }
+
+    type Tag {
+        name: String!
+        item: Item
+    }
+
+    type Item {
+        number: String!
+    }
+"""
+
+
+class TagListResolver(ListModelResolver):
+    queryset = Tag.objects.order_by("name")
+    batched = True
+
+
+class TagItemResolver(ItemResolver):
+    def get_lookup_filter_kwargs(self):
+        return {"pk": self.parent.item_id}
+
+
+@pytest.mark.django_db
+def test_sync_batched_retrieve_of_list_items(items, django_assert_num_queries):
+    for index in range(4):
+        Tag.objects.create(name="tag-%s" % index, item=items[index % 3], position=index)
+    Item.objects.filter(pk=items[1].pk).update(number="denied")
+    query = QueryType()
+    query.set_field("tags", TagListResolver.as_resolver(method="list"))
+    tag = ObjectType("Tag")
+    tag.set_field("item", TagItemResolver.as_resolver())
+    schema = make_executable_schema(tags_type_defs, [query, tag])
+
+    # the tags, then the items of every tag at once
+    with django_assert_num_queries(2):
+        result = graphql_sync(
+            schema,
+            "{ tags { name item { number } } }",
+            context_value=RequestFactory().get("/graphql/"),
+        )
+
+    assert result.data == {
+        "tags": [
+            {"name": "tag-0", "item": {"number": "0"}},
+            {"name": "tag-1", "item": None},
+            {"name": "tag-2", "item": {"number": "2"}},
+            {"name": "tag-3", "item": {"number": "0"}},
+        ]
+    }
+    # object permissions are still checked per object
+    assert [error.path for error in result.errors] == [["tags", 1, "item"]]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_batched_retrieve(items, mocker):
+    fetch = mocker.spy(ModelLoader, "fetch")
+    schema = make_schema(ItemResolver.as_async_resolver())
+    pks = [items[0].pk, items[1].pk, items[2].pk, 0]
+
+    result = asyncio.run(
+        graphql(schema, QUERY % tuple(pks), context_value=RequestFactory().get("/graphql/"))
+    )
+
+    # queries run in the thread of async resolvers, the lookups are fetched together
+    fetch.assert_called_once_with(mocker.ANY, [str(pk) for pk in pks])
+
+    assert result.errors is None
+    assert result.data == {
+        "a": {"number": "0"},
+        "b": {"number": "1"},
+        "c": {"number": "2"},
+        "d": None,
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_batched_object_permissions(items):
+    Item.objects.filter(pk=items[1].pk).update(number="denied")
+    schema = make_schema(ItemResolver.as_async_resolver())
+
+    result = asyncio.run(
+        graphql(
+            schema,
+            QUERY % (items[0].pk, items[1].pk, items[2].pk, '"x"'),
+            context_value=RequestFactory().get("/graphql/"),
+        )
+    )
+
+    assert result.data == {"a": {"number": "0"}, "b": None, "c": {"number": "2"}, "d": None}
+    assert sorted(error.path[0] for error in result.errors) == ["b", "d"]
+
+
+@pytest.mark.django_db
+def test_model_loader(items, django_assert_num_queries):
+    loader = ModelLoader(Item.objects.all(), "number")
+
+    with django_assert_num_queries(1):
+        assert loader.load_many(["0", "1", "2", "missing"]) == items + [None]
+        assert loader.load("1") == items[1]
+
+    Item.objects.create(number="1", description="")
+    duplicates = ModelLoader(Item.objects.all(), "number")
+    with pytest.raises(Item.MultipleObjectsReturned):
+        duplicates.load("1")
+    assert duplicates.load("0") == items[0]
+
+
+nested_type_defs = """
+    type Query {
+        items: [Item!]!
+    }
+
+    type Item {
+        number: String!
+        someItems(filter: SomeItemFilter): [SomeItem!]!
+        notes: [Note!]!
+    }
+
+    type SomeItem {
+        order: Int!
+        notes: [Note!]!
+    }
+
+    input SomeItemFilter {
+        order__gte: Int
+    }
+
+    type Note {
+        text: String!
+    }
+"""
+
+
+class ItemListResolver(ListModelResolver):
+    queryset = Item.objects.order_by("pk")
+    batched = True
+
+
+class SomeItemResolver(FilterMixin, ListModelResolver):
+    queryset = SomeItem.objects.order_by("order")
+    filterset_fields = {"order": ["gte"]}
+    batched = True
+
+
+class NoteResolver(ListModelResolver):
+    queryset = Note.objects.order_by("text")
+    batched = True
+
+
+def make_nested_schema(asynchronous=False):
+    config = dict(method="list", asynchronous=asynchronous)
+    query = QueryType()
+    query.set_field("items", ItemListResolver.as_resolver(**config))
+    item = ObjectType("Item")
+    item.set_field(
+        "someItems",
+        SomeItemResolver.as_nested_resolver(nested_field_name="someitem_set", **config),
+    )
+    item.set_field("notes", NoteResolver.as_nested_resolver(parent_name="object_id", **config))
+    some_item = ObjectType("SomeItem")
+    some_item.set_field(
+        "notes", NoteResolver.as_nested_resolver(parent_name="object_id", **config)
+    )
+    return make_executable_schema(nested_type_defs, [query, item, some_item])
+
+
+NESTED_QUERY = """
+    {
+        items {
+            number
+            someItems(filter: { order__gte: 1 }) { order notes { text } }
+            notes { text }
+        }
+    }
+"""
+
+
+@pytest.fixture
+def nested_items(items):
+    for item in items:
+        for order in range(3):
+            some_item = SomeItem.objects.create(order=order, item=item)
+            Note.objects.create(text="%s-%s" % (item.number, order), content_object=some_item)
+        Note.objects.create(text=item.number, content_object=item)
+
+
+EXPECTED = {
+    "items": [
+        {
+            "number": number,
+            "someItems": [
+                {"order": order, "notes": [{"text": "%s-%s" % (number, order)}]}
+                for order in (1, 2)
+            ],
+            "notes": [{"text": number}],
+        }
+        for number in ("0", "1", "2")
+    ]
+}
+
+
+@pytest.mark.django_db
+def test_sync_batched_nested_lists(nested_items, django_assert_num_queries):
+    schema = make_nested_schema()
+
+    # items, their filtered some items, the notes of items, the notes of some items
+    with django_assert_num_queries(4):
+        result = graphql_sync(
+            schema, NESTED_QUERY, context_value=RequestFactory().get("/graphql/")
+        )
+
+    assert result.errors is None
+    assert result.data == EXPECTED
+
+
+connection_type_defs = """
+    type Query {
+        items(first: Int, after: String): ItemConnection!
+    }
+
+    type ItemConnection {
+        edges: [ItemEdge!]!
+    }
+
+    type ItemEdge {
+        node: Item!
+    }
+
+    type Item {
+        number: String!
+        someItems(filter: SomeItemFilter): [SomeItem!]!
+    }
+
+    type SomeItem {
+        order: Int!
+    }
+
+    input SomeItemFilter {
+        order__gte: Int
+    }
+"""
+
+
+class ItemConnectionResolver(RelayModelMixin, GenericModelResolver):
+    queryset = Item.objects.all()
+    batched = True
+
+
+@pytest.mark.django_db
+def test_sync_batched_nested_lists_of_connections(nested_items, django_assert_num_queries):
+    query = QueryType()
+    query.set_field("items", ItemConnectionResolver.as_resolver(method="list"))
+    item = ObjectType("Item")
+    item.set_field(
+        "someItems",
+        SomeItemResolver.as_nested_resolver(nested_field_name="someitem_set", method="list"),
+    )
+    schema = make_executable_schema(connection_type_defs, [query, item])
+
+    # the count and the items of the page, then the some items of the whole page
+    with django_assert_num_queries(3):
+        result = graphql_sync(
+            schema,
+            "{ items(first: 2) { edges { node { number someItems { order } } } } }",
+            context_value=RequestFactory().get("/graphql/"),
+        )
+
+    assert result.errors is None
+    assert result.data == {
+        "items": {
+            "edges": [
+                {"node": {"number": number, "someItems": [{"order": o} for o in range(3)]}}
+                for number in ("0", "1")
+            ]
+        }
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_batched_nested_lists(nested_items, mocker):
+    fetch = mocker.spy(RelationLoader, "fetch")
+    schema = make_nested_schema(asynchronous=True)
+
+    result = asyncio.run(
+        graphql(schema, NESTED_QUERY, context_value=RequestFactory().get("/graphql/"))
+    )
+
+    assert result.errors is None
+    assert result.data == EXPECTED
+    assert fetch.call_count == 3
+
+
+@pytest.mark.django_db
+def test_batched_generic_relations_per_content_type(nested_items, django_assert_num_queries):
+    loader = RelationLoader(Note.objects.order_by("text"), parent_name="object_id")
+    parents = list(Item.objects.order_by("pk")) + list(SomeItem.objects.filter(order=0))
+
+    with django_assert_num_queries(2):
+        notes = loader.load_many(parents)
+
+    assert [[note.text for note in parent_notes] for parent_notes in notes] == [
+        ["0"],
+        ["1"],
+        ["2"],
+        ["0-0"],
+        ["1-0"],
+        ["2-0"],
+    ]
+
+
+federated_type_defs = """
+    type Query {
+        items: [Item!]!
+    }
+
+    type Item @key(fields: "id") {
+        id: ID!
+        number: String!
+    }
+
+    type SomeItem @key(fields: "id") {
+        id: ID!
+        order: Int!
+    }
+"""
+
+ENTITIES_QUERY = """
+    query ($representations: [_Any!]!) {
+        _entities(representations: $representations) {
+            ... on Item { number }
+            ... on SomeItem { order }
+        }
+    }
+"""
+
+
+class ItemReferenceResolver(ModelResolver):
+    queryset = Item.objects.all()
+    lookup_arg = "id"
+    batched = True
+    permission_classes = [DenyNumber]
+
+
+class SomeItemReferenceResolver(GenericModelResolver):
+    queryset = SomeItem.objects.all()
+    lookup_arg = "id"
+    batched = True
+
+
+def make_federated(asynchronous=False):
+    item = FederatedObjectType("Item")
+    item.reference_resolver(ItemReferenceResolver.as_reference_resolver(asynchronous=asynchronous))
+    some_item = FederatedObjectType("SomeItem")
+    some_item.reference_resolver(
+        SomeItemReferenceResolver.as_reference_resolver(asynchronous=asynchronous)
+    )
+    return make_federated_schema(federated_type_defs, [QueryType(), item, some_item])
+
+
+def get_representations(items, some_items):
+    return [
+        {"__typename": "Item", "id": str(items[2].pk)},
+        {"__typename": "SomeItem", "id": str(some_items[0].pk)},
+        {"__typename": "Item", "id": "0"},
+        {"__typename": "Item", "id": str(items[0].pk)},
+        {"__typename": "SomeItem", "id": str(some_items[1].pk)},
+        {"__typename": "Item", "id": str(items[1].pk)},
+    ]
+
+
+@pytest.fixture
+def some_items(items):
+    return [SomeItem.objects.create(order=order, item=items[0]) for order in range(2)]
+
+
+@pytest.mark.django_db
+def test_sync_batched_references(items, some_items, django_assert_num_queries):
+    schema = make_federated()
+
+    # one query per type, the first reference of a type fetches the other ones
+    with django_assert_num_queries(2):
+        result = graphql_sync(
+            schema,
+            ENTITIES_QUERY,
+            variable_values={"representations": get_representations(items, some_items)},
+            context_value=RequestFactory().get("/graphql/"),
+        )
+
+    # ariadne resolves missing entities to their typename only
+    assert [error.path for error in result.errors] == [["_entities", 2, "number"]]
+    assert result.data == {
+        "_entities": [
+            {"number": "2"},
+            {"order": 0},
+            None,
+            {"number": "0"},
+            {"order": 1},
+            {"number": "1"},
+        ]
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_batched_references(items, some_items, mocker):
+    Item.objects.filter(pk=items[1].pk).update(number="denied")
+    fetch = mocker.spy(ModelLoader, "fetch")
+    schema = make_federated(asynchronous=True)
+
+    result = asyncio.run(
+        graphql(
+            schema,
+            ENTITIES_QUERY,
+            variable_values={"representations": get_representations(items, some_items)},
+            context_value=RequestFactory().get("/graphql/"),
+        )
+    )
+
+    assert fetch.call_count == 2
+    assert result.data == {
+        "_entities": [
+            {"number": "2"},
+            {"order": 0},
+            None,
+            {"number": "0"},
+            {"order": 1},
+            None,
+        ]
+    }
+    assert sorted(error.path for error in result.errors) == [
+        ["_entities", 2, "number"],
+        ["_entities", 5],
+    ]
+
+
+class LimitNotes:
+    def has_permission(self, info, resolver):
+        return True
+
+    def has_objects_permission(self, info, resolver, objs):
+        LimitNotes.checked.append([note.text for note in objs])
+        return len(objs) < 2
+
+
+@pytest.mark.django_db
+def test_batched_objects_permissions(nested_items):
+    Note.objects.create(text="extra", content_object=Item.objects.order_by("pk")[1])
+    LimitNotes.checked = []
+
+    class LimitedNoteResolver(NoteResolver):
+        permission_classes = [LimitNotes]
+
+    query = QueryType()
+    query.set_field("items", ItemListResolver.as_resolver(method="list"))
+    item = ObjectType("Item")
+    item.set_field(
+        "notes", LimitedNoteResolver.as_nested_resolver(method="list", parent_name="object_id")
+    )
+    schema = make_executable_schema(nested_type_defs, [query, item])
+
+    result = graphql_sync(
+        schema, "{ items { notes { text } } }", context_value=RequestFactory().get("/graphql/")
+    )
+
+    # the notes of each parent are checked at once, the error nulls the non null items
+    assert LimitNotes.checked == [["0"], ["1", "extra"]]
+    assert result.data is None
+    assert [error.path for error in result.errors] == [["items", 1, "notes"]]
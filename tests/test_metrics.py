@@ -0,0 +1,138 @@
+import json
+
+import pytest
+from ariadne import QueryType, make_executable_schema
+from django.test import RequestFactory
+
+from ariadne_extended.metrics import (
+    InMemoryExporter,
+    Measurement,
+    Metrics,
+    PrometheusExporter,
+    PrometheusMetricsView,
+)
+from ariadne_extended.views import BaseGraphQLView, BatchGraphQLView
+
+from .pagination.models import Item
+from .test_views import batch_request
+
+type_defs = """
+    type Query {
+        items: Int
+        hello: String
+    }
+"""
+
+query = QueryType()
+
+
+@query.field("items")
+def resolve_items(*_):
+    return Item.objects.count() + Item.objects.filter(number="1").count()
+
+
+@query.field("hello")
+def resolve_hello(*_):
+    return "Hello"
+
+
+schema = make_executable_schema(type_defs, [query])
+
+
+@pytest.mark.django_db
+def test_batch_view_records_operations():
+    exporter = InMemoryExporter()
+    view = BatchGraphQLView.as_view(schema=schema, batch=True, metrics=Metrics([exporter]))
+    response = view(
+        batch_request(
+            [
+                {"id": 1, "query": "query Items { items }", "operationName": "Items"},
+                {"id": 2, "query": "{ hello }"},
+                {"id": 3, "query": "query Nope { nope }"},
+            ]
+        )
+    )
+    assert response.status_code == 400
+    assert [
+        (measurement.operation_name, measurement.failed, measurement.db_queries)
+        for measurement in exporter.operations
+    ] == [("Items", False, 2), ("anonymous", False, 0), ("anonymous", True, 0)]
+    assert all(measurement.duration > 0 for measurement in exporter.operations)
+    assert exporter.operations[0].db_time > 0
+    assert exporter.responses == [("batch", len(response.content))]
+
+
+@pytest.mark.parametrize("concurrent_batch", [False, True])
+def test_batch_view_records_saved_executions(concurrent_batch):
+    exporter = InMemoryExporter()
+    view = BatchGraphQLView.as_view(
+        schema=schema,
+        batch=True,
+        concurrent_batch=concurrent_batch,
+        metrics=Metrics([exporter]),
+    )
+    view(batch_request([{"id": index, "query": "{ hello }"} for index in range(3)]))
+    assert exporter.saved_executions == 2
+
+
+def test_base_view_records_operations():
+    exporter = InMemoryExporter()
+    view = BaseGraphQLView.as_view(schema=schema, metrics=Metrics([exporter]))
+    request = RequestFactory().post(
+        "/graphql/",
+        data=json.dumps({"query": "query Hello { hello }", "operationName": "Hello"}),
+        content_type="application/json",
+    )
+    response = view(request)
+    assert [(m.operation_name, m.failed) for m in exporter.operations] == [("Hello", False)]
+    assert exporter.responses == [("Hello", len(response.content))]
+
+
+def test_operation_names_are_capped():
+    exporter = InMemoryExporter()
+    metrics = Metrics([exporter], track_db=False, max_operations=2)
+    for name in ["A", "B", "C", "A"]:
+        with metrics.measure(name):
+            pass
+    assert [measurement.operation_name for measurement in exporter.operations] == [
+        "A",
+        "B",
+        "other",
+        "A",
+    ]
+
+
+def test_prometheus_exporter():
+    exporter = PrometheusExporter(latency_buckets=(0.1, 1), db_queries_buckets=(1,))
+    for duration, failed, queries in [(0.05, False, 1), (0.5, True, 3)]:
+        measurement = Measurement('Say "hi"')
+        measurement.duration, measurement.failed = duration, failed
+        measurement.db_queries, measurement.db_time = queries, 0.25
+        exporter.record_operation(measurement)
+    exporter.record_response("batch", 300)
+    exporter.record_saved_executions(2)
+    exporter.record_saved_executions(1)
+
+    lines = exporter.render().splitlines()
+    label = 'operation="Say \\"hi\\""'
+    assert "# TYPE graphql_operation_duration_seconds histogram" in lines
+    assert 'graphql_operation_duration_seconds_bucket{%s,le="0.1"} 1' % label in lines
+    assert 'graphql_operation_duration_seconds_bucket{%s,le="1"} 2' % label in lines
+    assert 'graphql_operation_duration_seconds_bucket{%s,le="+Inf"} 2' % label in lines
+    assert "graphql_operation_duration_seconds_count{%s} 2" % label in lines
+    assert "graphql_operation_errors_total{%s} 1" % label in lines
+    assert 'graphql_operation_db_queries_bucket{%s,le="1"} 1' % label in lines
+    assert "graphql_operation_db_queries_sum{%s} 4" % label in lines
+    assert "graphql_operation_db_duration_seconds_total{%s} 0.5" % label in lines
+    assert 'graphql_response_size_bytes_bucket{operation="batch",le="256"} 0' in lines
+    assert 'graphql_response_size_bytes_bucket{operation="batch",le="1024"} 1' in lines
+    assert "# TYPE graphql_batch_saved_executions_total counter" in lines
+    assert "graphql_batch_saved_executions_total 3" in lines
+
+
+def test_prometheus_metrics_view():
+    exporter = PrometheusExporter()
+    exporter.record_response("batch", 10)
+    response = PrometheusMetricsView.as_view(exporter=exporter)(RequestFactory().get("/metrics"))
+    assert response["Content-Type"] == "text/plain; version=0.0.4; charset=utf-8"
+    assert b'graphql_response_size_bytes_count{operation="batch"} 1' in response.content
@@ -0,0 +1,151 @@
+import pytest
+from ariadne import ObjectType, QueryType, make_executable_schema
+from django.test import RequestFactory
+from graphql import graphql_sync
+
+from ariadne_extended.resolvers import ListModelResolver
+from ariadne_extended.resolvers.optimizer import OptimizationHint, QueryOptimizer
+
+from .pagination.models import Item, SomeItem
+
+type_defs = """
+    type Query {
+        someItems: [SomeItem!]!
+        items: [Item!]!
+        itemConnection: ItemConnection!
+    }
+
+    type ItemConnection {
+        edges: [ItemEdge!]!
+    }
+
+    type ItemEdge {
+        node: Item!
+    }
+
+    type SomeItem {
+        order: Int!
+        item: Item
+    }
+
+    type Item {
+        id: ID!
+        number: String!
+        description: String!
+        label: String!
+        shout: String!
+        someItems: [SomeItem!]!
+    }
+"""
+
+optimizer = QueryOptimizer(
+    hints={
+        "Item": {
+            "label": OptimizationHint(only=["number"]),
+            "someItems": OptimizationHint(field="someitem_set"),
+        }
+    }
+)
+
+
+class SomeItemResolver(ListModelResolver):
+    queryset = SomeItem.objects.order_by("order")
+    optimizer = optimizer
+
+
+class ItemResolver(ListModelResolver):
+    queryset = Item.objects.order_by("pk")
+    optimizer = optimizer
+
+
+class ItemConnectionResolver(ItemResolver):
+    def list(self, *args, **kwargs):
+        return {"edges": [{"node": node} for node in super().list(*args, **kwargs)]}
+
+
+query = QueryType()
+query.set_field("someItems", SomeItemResolver.as_resolver(method="list"))
+query.set_field("items", ItemResolver.as_resolver(method="list"))
+query.set_field("itemConnection", ItemConnectionResolver.as_resolver(method="list"))
+
+item = ObjectType("Item")
+item.set_field("label", lambda obj, info: "#%s" % obj.number)
+item.set_field("shout", lambda obj, info: obj.description.upper())
+item.set_field("someItems", lambda obj, info: obj.someitem_set.all())
+
+schema = make_executable_schema(type_defs, [query, item])
+
+
+def execute(document):
+    result = graphql_sync(schema, document, context_value=RequestFactory().get("/graphql/"))
+    assert result.errors is None
+    return result.data
+
+
+@pytest.fixture
+def items():
+    items = [Item.objects.create(number=str(i), description="item %s" % i) for i in range(3)]
+    for item in items:
+        for order in range(2):
+            SomeItem.objects.create(order=order, item=item)
+    return items
+
+
+@pytest.mark.django_db
+def test_select_related_and_only(items, django_assert_num_queries):
+    with django_assert_num_queries(1) as captured:
+        data = execute("{ someItems { order item { number } } }")
+
+    assert data["someItems"][0] == {"order": 0, "item": {"number": "0"}}
+    sql = captured.captured_queries[0]["sql"]
+    assert "JOIN" in sql
+    assert '"description"' not in sql
+
+
+@pytest.mark.django_db
+def test_prefetch_related_with_hints(items, django_assert_num_queries):
+    with django_assert_num_queries(2) as captured:
+        data = execute(
+            """
+                { items { ...ItemFields someItems { order } } }
+                fragment ItemFields on Item { label }
+            """
+        )
+
+    assert data["items"][1] == {"label": "#1", "someItems": [{"order": 0}, {"order": 1}]}
+    assert all('"description"' not in query["sql"] for query in captured.captured_queries)
+
+
+@pytest.mark.django_db
+def test_connection_nodes(items, django_assert_num_queries):
+    with django_assert_num_queries(2):
+        data = execute("{ itemConnection { edges { node { number someItems { order } } } } }")
+
+    assert data["itemConnection"]["edges"][2]["node"] == {
+        "number": "2",
+        "someItems": [{"order": 0}, {"order": 1}],
+    }
+
+
+@pytest.mark.django_db
+def test_unknown_fields_load_every_column(items, django_assert_num_queries):
+    # `shout` reads the description without a hint
+    with django_assert_num_queries(1) as captured:
+        data = execute("{ items { shout } }")
+
+    assert data["items"][0] == {"shout": "ITEM 0"}
+    assert '"description"' in captured.captured_queries[0]["sql"]
+
+
+@pytest.mark.django_db
+def test_plans_are_cached_per_document(items, mocker):
+    optimizer = QueryOptimizer()
+    plan_fields = mocker.spy(optimizer, "plan_fields")
+    mocker.patch.object(ItemResolver, "optimizer", optimizer)
+
+    execute("{ items { number } }")
+    execute("{ items { number } }")
+    assert plan_fields.call_count == 1
+
+    execute("{ items { id number } }")
+    assert plan_fields.call_count == 2
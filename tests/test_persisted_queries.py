@@ -0,0 +1,188 @@
+import json
+from unittest.mock import Mock
+
+import pytest
+from ariadne import MutationType, QueryType, make_executable_schema
+from django.core.cache import cache
+from django.test import RequestFactory
+
+from ariadne_extended.persisted_queries import (
+    CachePersistedQueryStore,
+    InvalidPersistedQuery,
+    LocalPersistedQueryStore,
+    PersistedQueryNotFound,
+    PersistedQueryNotSupported,
+    apply_persisted_query,
+    get_query_hash,
+)
+from ariadne_extended.views import BaseGraphQLView, BatchGraphQLView
+
+type_defs = """
+    type Query {
+        hello: String
+    }
+
+    type Mutation {
+        boom: String
+    }
+"""
+
+query = QueryType()
+query.set_field("hello", lambda *_: "world")
+mutation = MutationType()
+boom = Mock(return_value="boom")
+mutation.set_field("boom", boom)
+
+schema = make_executable_schema(type_defs, [query, mutation])
+
+QUERY = "{ hello }"
+HASH = get_query_hash(QUERY)
+
+
+def persisted(query_hash=HASH, **data):
+    return dict(data, extensions={"persistedQuery": {"version": 1, "sha256Hash": query_hash}})
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+def test_apply_persisted_query_without_extension():
+    data = {"query": QUERY}
+    assert apply_persisted_query(data, LocalPersistedQueryStore()) is data
+
+
+def test_apply_persisted_query_registers_and_loads():
+    store = LocalPersistedQueryStore()
+    with pytest.raises(PersistedQueryNotFound):
+        apply_persisted_query(persisted(), store)
+
+    apply_persisted_query(persisted(query=QUERY), store)
+    assert apply_persisted_query(persisted(), store)["query"] == QUERY
+
+
+def test_apply_persisted_query_errors():
+    store = LocalPersistedQueryStore()
+    with pytest.raises(InvalidPersistedQuery):
+        apply_persisted_query(persisted(query_hash="abc", query=QUERY), store)
+    with pytest.raises(InvalidPersistedQuery):
+        apply_persisted_query({"extensions": {"persistedQuery": {"version": 2}}}, store)
+    with pytest.raises(PersistedQueryNotSupported):
+        apply_persisted_query(persisted(), None)
+    assert apply_persisted_query(persisted(query=QUERY), None)["query"] == QUERY
+
+
+def test_local_store_is_bounded():
+    store = LocalPersistedQueryStore(maxsize=1)
+    store.set("a", "{ a }")
+    store.set("b", "{ b }")
+    assert store.get("a") is None
+    assert store.get("b") == "{ b }"
+
+
+def test_cache_store_falls_back_on_django_cache():
+    store = CachePersistedQueryStore()
+    store.set(HASH, QUERY)
+    assert cache.get(store.get_cache_key(HASH)) == QUERY
+
+    other_process_store = CachePersistedQueryStore()
+    assert other_process_store.get(HASH) == QUERY
+    assert other_process_store.local.get(HASH) == QUERY
+
+
+def test_base_view_persisted_query_over_get():
+    view = BaseGraphQLView.as_view(
+        schema=schema, extensions=[], persisted_query_store=CachePersistedQueryStore()
+    )
+    params = {"extensions": json.dumps(persisted()["extensions"])}
+
+    response = view(RequestFactory().get("/graphql/", params))
+    assert response.status_code == 400
+    assert json.loads(response.content)["errors"][0]["extensions"]["code"] == (
+        "PERSISTED_QUERY_NOT_FOUND"
+    )
+
+    response = view(RequestFactory().get("/graphql/", dict(params, query=QUERY)))
+    assert json.loads(response.content) == {"data": {"hello": "world"}}
+
+    response = view(RequestFactory().get("/graphql/", params))
+    assert response.status_code == 200
+    assert json.loads(response.content) == {"data": {"hello": "world"}}
+
+
+def test_base_view_refuses_mutations_over_get():
+    boom.reset_mock()
+    store = LocalPersistedQueryStore()
+    view = BaseGraphQLView.as_view(schema=schema, extensions=[], persisted_query_store=store)
+
+    response = view(RequestFactory().get("/graphql/", {"query": "mutation { boom }"}))
+    assert response.status_code == 405
+    assert response["Allow"] == "POST"
+
+    query = "query Hello { hello } mutation Boom { boom }"
+    response = view(RequestFactory().get("/graphql/", {"query": query, "operationName": "Boom"}))
+    assert response.status_code == 405
+    response = view(RequestFactory().get("/graphql/", {"query": query, "operationName": "Hello"}))
+    assert json.loads(response.content) == {"data": {"hello": "world"}}
+
+    store.set(get_query_hash("mutation { boom }"), "mutation { boom }")
+    params = persisted(get_query_hash("mutation { boom }"))
+    response = view(
+        RequestFactory().get("/graphql/", {"extensions": json.dumps(params["extensions"])})
+    )
+    assert response.status_code == 405
+    boom.assert_not_called()
+
+
+def test_batch_view_refuses_mutations_over_get():
+    boom.reset_mock()
+    store = LocalPersistedQueryStore()
+    view = BatchGraphQLView.as_view(schema=schema, batch=True, persisted_query_store=store)
+
+    def get(entries):
+        request = RequestFactory().generic(
+            "GET", "/graphql/", data=json.dumps(entries), content_type="application/json"
+        )
+        request.user = Mock(is_authenticated=True)
+        return view(request)
+
+    response = get([{"id": 1, "query": QUERY}, {"id": 2, "query": "mutation { boom }"}])
+    assert response.status_code == 405
+    assert response["Allow"] == "POST"
+
+    store.set(get_query_hash("mutation { boom }"), "mutation { boom }")
+    response = get([persisted(get_query_hash("mutation { boom }"), id=1)])
+    assert response.status_code == 405
+
+    response = get([{"id": 1, "query": QUERY}, persisted(id=2, query=QUERY)])
+    assert [entry["data"] for entry in json.loads(response.content)] == [
+        {"hello": "world"},
+        {"hello": "world"},
+    ]
+
+    # single operations are sent as query params
+    view = BatchGraphQLView.as_view(schema=schema)
+    request = RequestFactory().get("/graphql/", {"query": "mutation { boom }"})
+    request.user = Mock(is_authenticated=True)
+    assert view(request).status_code == 405
+    boom.assert_not_called()
+
+
+def test_batch_view_persisted_query():
+    view = BatchGraphQLView.as_view(
+        schema=schema, batch=True, persisted_query_store=LocalPersistedQueryStore()
+    )
+
+    def post(entries):
+        request = RequestFactory().post(
+            "/graphql/", data=json.dumps(entries), content_type="application/json"
+        )
+        request.user = Mock(is_authenticated=True)
+        return json.loads(view(request).content)
+
+    result = post([persisted(id=1)])
+    assert result[0]["errors"][0]["message"] == "PersistedQueryNotFound"
+
+    result = post([persisted(id=1, query=QUERY), persisted(id=2)])
+    assert [entry["data"] for entry in result] == [{"hello": "world"}, {"hello": "world"}]
@@ -0,0 +1,186 @@
+from unittest.mock import Mock
+
+import pytest
+from ariadne import MutationType, QueryType, make_executable_schema
+from django.core.cache import cache
+from django.test import RequestFactory
+
+from ariadne_extended.graphql import graphql_sync
+from ariadne_extended.resolvers import ListModelResolver
+from ariadne_extended.response_cache import ResponseCache, anonymous_scope
+from ariadne_extended.views import BatchGraphQLView
+
+from .pagination.models import Item
+
+type_defs = """
+    type Query {
+        items: [Item!]!
+        boom: String
+        racing: [Item!]!
+    }
+
+    type Mutation {
+        items: [Item!]!
+    }
+
+    type Item {
+        number: String!
+    }
+"""
+
+
+class ItemResolver(ListModelResolver):
+    queryset = Item.objects.order_by("pk")
+
+
+query = QueryType()
+query.set_field("items", ItemResolver.as_resolver(method="list"))
+
+
+@query.field("boom")
+def resolve_boom(*_):
+    raise ValueError("boom")
+
+
+class RacingResolver(ItemResolver):
+    def list(self, *args, **kwargs):
+        items = list(super().list(*args, **kwargs))
+        # committed by another request while the operation is executing
+        Item.objects.create(number="late", description="")
+        return items
+
+
+query.set_field("racing", RacingResolver.as_resolver(method="list"))
+
+
+mutation = MutationType()
+mutation.set_field("items", ItemResolver.as_resolver(method="list"))
+
+schema = make_executable_schema(type_defs, [query, mutation])
+
+
+def make_request(pk=1):
+    request = RequestFactory().post("/graphql/")
+    request.user = Mock(is_authenticated=True, pk=pk)
+    return request
+
+
+@pytest.fixture
+def response_cache():
+    cache.clear()
+    yield ResponseCache()
+    cache.clear()
+
+
+def execute(response_cache, query_string, request=None):
+    return graphql_sync(
+        schema,
+        {"query": query_string},
+        context_value=request or make_request(),
+        response_cache=response_cache,
+    )
+
+
+@pytest.mark.django_db
+def test_response_cache_hit_and_invalidation(response_cache, django_assert_num_queries):
+    Item.objects.create(number="1", description="")
+
+    with django_assert_num_queries(1):
+        assert execute(response_cache, "{ items { number } }") == (
+            True,
+            {"data": {"items": [{"number": "1"}]}},
+        )
+    with django_assert_num_queries(0):
+        assert execute(response_cache, "{ items { number } }") == (
+            True,
+            {"data": {"items": [{"number": "1"}]}},
+        )
+
+    Item.objects.create(number="2", description="")
+    assert execute(response_cache, "{ items { number } }") == (
+        True,
+        {"data": {"items": [{"number": "1"}, {"number": "2"}]}},
+    )
+
+    Item.objects.all().delete()
+    assert execute(response_cache, "{ items { number } }") == (True, {"data": {"items": []}})
+
+
+@pytest.mark.django_db
+def test_response_cache_skips_mutations(response_cache, django_assert_num_queries):
+    for _ in range(2):
+        with django_assert_num_queries(1):
+            execute(response_cache, "mutation { items { number } }")
+
+
+@pytest.mark.django_db
+def test_response_cache_skips_errors(response_cache, django_assert_num_queries):
+    for _ in range(2):
+        with django_assert_num_queries(1):
+            success, result = execute(response_cache, "{ items { number } boom }")
+            assert result["errors"]
+
+
+@pytest.mark.django_db
+def test_response_cache_scope(response_cache, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        execute(response_cache, "{ items { number } }", make_request(1))
+    with django_assert_num_queries(1):
+        execute(response_cache, "{ items { number } }", make_request(2))
+
+    shared = ResponseCache(scope=anonymous_scope)
+    with django_assert_num_queries(1):
+        execute(shared, "{ items { number } }", make_request(1))
+    with django_assert_num_queries(0):
+        execute(shared, "{ items { number } }", make_request(2))
+
+
+@pytest.mark.django_db
+def test_response_cache_invalidated_while_executing(response_cache):
+    assert execute(response_cache, "{ racing { number } }") == (True, {"data": {"racing": []}})
+    # the stale response was stored under the version read before querying the items
+    assert execute(response_cache, "{ items { number } }")[1] == {
+        "data": {"items": [{"number": "late"}]}
+    }
+    assert execute(response_cache, "{ racing { number } }")[1] == {
+        "data": {"racing": [{"number": "late"}]}
+    }
+
+
+@pytest.mark.django_db
+def test_response_cache_without_request_user(response_cache, django_assert_num_queries):
+    for context_value in [{}, {"request": RequestFactory().post("/graphql/")}]:
+        for _ in range(2):
+            with django_assert_num_queries(1):
+                graphql_sync(
+                    schema,
+                    {"query": "{ items { number } }"},
+                    context_value=context_value,
+                    response_cache=response_cache,
+                )
+
+    with django_assert_num_queries(1):
+        for _ in range(2):
+            execute(response_cache, "{ items { number } }", {"request": make_request()})
+
+
+@pytest.mark.django_db
+def test_response_cache_batch_operation_name(response_cache, django_assert_num_queries):
+    Item.objects.create(number="1", description="")
+    view = BatchGraphQLView(schema=schema, batch=True, response_cache=response_cache)
+    document = "query Items { items { number } } query Typename { __typename }"
+
+    def execute_entry(operation_name):
+        request = make_request()
+        request.method = "POST"
+        [(response, _)] = view.get_batch_responses(
+            request, [{"id": 1, "query": document, "operationName": operation_name}]
+        )
+        return response["data"]
+
+    with django_assert_num_queries(1):
+        assert execute_entry("Items") == {"items": [{"number": "1"}]}
+    with django_assert_num_queries(0):
+        assert execute_entry("Items") == {"items": [{"number": "1"}]}
+    # not answered with the cached response of the other operation
+    assert execute_entry("Typename") == {"__typename": "Query"}
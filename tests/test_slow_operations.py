@@ -0,0 +1,122 @@
+import json
+import time
+
+import pytest
+from ariadne import QueryType, make_executable_schema
+
+from ariadne_extended.slow_operations import SlowOperationLog
+from ariadne_extended.views import BatchGraphQLView
+
+from .pagination.models import Item
+from .test_views import batch_request
+
+type_defs = """
+    type Query {
+        items(password: String, filter: ItemFilter): [Item!]!
+        fast: String
+    }
+
+    input ItemFilter {
+        apiKey: String
+        name: String
+    }
+
+    type Item {
+        number: String
+        slow: String
+    }
+"""
+
+query = QueryType()
+
+
+@query.field("items")
+def resolve_items(*_, **kwargs):
+    return list(Item.objects.order_by("pk"))
+
+
+@query.field("fast")
+def resolve_fast(*_):
+    return "fast"
+
+
+def resolve_slow(item, *_):
+    time.sleep(0.02)
+    return item.number
+
+
+schema = make_executable_schema(type_defs, [query])
+schema.type_map["Item"].fields["slow"].resolve = resolve_slow
+
+QUERY = """
+    # A comment
+    query Items($password: String, $filter: ItemFilter) {
+        items(password: $password, filter: $filter) { number slow }
+    }
+"""
+
+
+def get_view(**kwargs):
+    return BatchGraphQLView.as_view(
+        schema=schema, batch=True, slow_operation_log=SlowOperationLog(**kwargs)
+    )
+
+
+@pytest.mark.django_db
+def test_slow_operation_is_logged(caplog):
+    Item.objects.create(number="1", description="")
+    Item.objects.create(number="2", description="")
+
+    view = get_view(threshold=0.03, top_resolvers=1)
+    variables = {"password": "hunter2", "filter": {"apiKey": "abc", "name": "x"}}
+    view(
+        batch_request(
+            [
+                {"id": 1, "query": "{ fast }"},
+                {"id": 2, "query": QUERY, "variables": variables, "operationName": "Items"},
+            ]
+        )
+    )
+
+    assert len(caplog.records) == 1
+    log = caplog.records[0]
+    assert log.getMessage().startswith("Slow GraphQL operation Items took")
+    record = log.graphql_operation
+    assert record["operationName"] == "Items"
+    assert record["duration"] >= 0.04
+    assert record["variables"] == {
+        "password": "[REDACTED]",
+        "filter": {"apiKey": "[REDACTED]", "name": "x"},
+    }
+    assert record["resolvers"] == [
+        {
+            "path": "items.slow",
+            "count": 2,
+            "duration": pytest.approx(0.04, abs=0.03),
+            "max": pytest.approx(0.02, abs=0.02),
+        }
+    ]
+    assert record["sql"]["count"] == 1
+    assert "pagination_item" in record["sql"]["queries"][0]["sql"]
+    json.dumps(record)
+
+    same_document = (
+        "query Items($password: String, $filter: ItemFilter) "
+        "{ items(password: $password, filter: $filter) { number slow } }"
+    )
+    assert SlowOperationLog.get_document_hash(same_document) == record["documentHash"]
+
+
+@pytest.mark.django_db
+def test_fast_operations_are_not_logged(caplog):
+    view = get_view(threshold=1, log_variables=False)
+    view(batch_request([{"id": 1, "query": QUERY}]))
+    assert not caplog.records
+
+
+@pytest.mark.django_db
+def test_slow_operation_without_variables(caplog):
+    Item.objects.create(number="1", description="")
+    view = get_view(threshold=0, log_variables=False)
+    view(batch_request([{"id": 1, "query": QUERY}]))
+    assert "variables" not in caplog.records[0].graphql_operation
@@ -0,0 +1,295 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+
+import pytest
+from ariadne import QueryType, make_executable_schema
+from django.core.cache import cache
+from django.test import RequestFactory
+from graphql import graphql_sync
+
+from ariadne_extended.graphql import graphql_sync as extended_graphql_sync
+from ariadne_extended.resolvers import Resolver
+from ariadne_extended.resolvers.exceptions import Throttled
+from ariadne_extended.throttling import (
+    FixedWindowThrottle,
+    QueryCostExtensionSync,
+    QueryCostThrottle,
+    TokenBucketThrottle,
+    parse_rate,
+)
+
+type_defs = """
+    type Query {
+        hello: String
+        other: String
+    }
+"""
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def clock(mocker):
+    clock = mocker.patch("ariadne_extended.throttling.time.time")
+    clock.return_value = 1000.0
+    return clock
+
+
+def make_schema(throttle_class):
+    class HelloResolver(Resolver):
+        throttle_classes = [throttle_class]
+
+        def retrieve(self, *args, **kwargs):
+            return "hello"
+
+    query = QueryType()
+    query.set_field("hello", HelloResolver.as_resolver())
+    query.set_field("other", HelloResolver.as_resolver())
+    return make_executable_schema(type_defs, [query])
+
+
+def execute(schema, query="{ hello other }"):
+    return graphql_sync(schema, query, context_value=RequestFactory().get("/graphql/"))
+
+
+def test_parse_rate():
+    assert parse_rate(None) == (None, None)
+    assert parse_rate("100/min") == (100, 60)
+    assert parse_rate("10/5s") == (10, 5)
+    assert parse_rate("1000/day") == (1000, 86400)
+    with pytest.raises(ValueError):
+        parse_rate("10/week")
+
+
+def test_throttled_error():
+    error = Throttled(1.2)
+    assert error.wait == 2
+    assert str(error) == "Request was throttled. Expected available in 2 seconds."
+    assert error.extensions == {"code": "THROTTLED", "retryAfter": 2}
+    assert Throttled().extensions == {"code": "THROTTLED"}
+
+
+def test_get_ident(settings):
+    class Throttle(FixedWindowThrottle):
+        rate = "1/min"
+
+    request = RequestFactory().get(
+        "/graphql/", REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR="1.1.1.1, 2.2.2.2, 3.3.3.3"
+    )
+    throttle = Throttle()
+    # the header is set by clients, it is ignored unless behind proxies
+    assert throttle.get_ident(request) == "ip:10.0.0.1"
+
+    settings.ARIADNE_EXTENDED_NUM_PROXIES = 2
+    assert throttle.get_ident(request) == "ip:2.2.2.2"
+    throttle.num_proxies = 5
+    assert throttle.get_ident(request) == "ip:1.1.1.1"
+    throttle.num_proxies = 0
+    assert throttle.get_ident(request) == "ip:10.0.0.1"
+
+
+def test_fixed_window_per_operation(clock):
+    class Throttle(FixedWindowThrottle):
+        rate = "2/min"
+
+    schema = make_schema(Throttle)
+
+    # both fields of an operation count once
+    assert execute(schema).errors is None
+    assert execute(schema).errors is None
+
+    result = execute(schema)
+    assert result.data == {"hello": None, "other": None}
+    error = result.errors[0]
+    assert error.extensions == {"code": "THROTTLED", "retryAfter": 20}
+    assert error.message == "Request was throttled. Expected available in 20 seconds."
+
+    clock.return_value = 1020.0
+    assert execute(schema).errors is None
+
+
+def test_fixed_window_dict_context(clock):
+    class Throttle(FixedWindowThrottle):
+        rate = "3/min"
+
+    schema = make_schema(Throttle)
+
+    # without a request the outcome can't be reused, every resolution counts
+    assert graphql_sync(schema, "{ hello other }", context_value={}).errors is None
+    result = graphql_sync(schema, "{ hello other }", context_value={})
+    assert result.data == {"hello": "hello", "other": None}
+    assert result.errors[0].extensions["retryAfter"] == 20
+
+
+def test_fixed_window_per_field(clock):
+    class Throttle(FixedWindowThrottle):
+        rate = "3/min"
+        evaluate = "field"
+
+    schema = make_schema(Throttle)
+
+    assert execute(schema).errors is None
+    result = execute(schema)
+    assert result.data == {"hello": "hello", "other": None}
+    assert [error.path for error in result.errors] == [["other"]]
+
+
+def test_fixed_window_local_batch(clock, mocker):
+    class Throttle(FixedWindowThrottle):
+        rate = "5/min"
+        local_batch = 2
+
+    incr = mocker.spy(cache, "incr")
+    add = mocker.spy(cache, "add")
+    throttle = Throttle()
+
+    assert [throttle.consume("key")[0] for _ in range(7)] == [True] * 5 + [False] * 2
+    # reserved by batches of 2 from the shared counter, until it is exhausted
+    assert incr.call_count == 4
+    assert add.call_count == 1
+    assert cache.get("key:16") == 8
+
+
+def test_token_bucket(clock):
+    class Throttle(TokenBucketThrottle):
+        rate = "1/s"
+        burst = 3
+
+    throttle = Throttle()
+    assert [throttle.consume("key")[0] for _ in range(4)] == [True] * 3 + [False]
+    assert throttle.consume("key") == (False, 1.0)
+
+    # a token is refilled every second
+    clock.return_value = 1001.0
+    assert throttle.consume("key") == (True, None)
+    assert throttle.consume("key")[0] is False
+
+    # idle buckets are full again
+    clock.return_value = 1100.0
+    assert [throttle.consume("key")[0] for _ in range(4)] == [True] * 3 + [False]
+
+
+cost_type_defs = """
+    type Thing {
+        id: ID!
+    }
+
+    type Query {
+        things(first: Int): [Thing]
+    }
+"""
+
+
+def make_cost_schema(throttle_classes=()):
+    class ThingsResolver(Resolver):
+        def retrieve(self, *args, first=None, **kwargs):
+            # fewer objects than requested
+            return [dict(id=index) for index in range(2)]
+
+    ThingsResolver.throttle_classes = list(throttle_classes)
+    query = QueryType()
+    query.set_field("things", ThingsResolver.as_resolver())
+    return make_executable_schema(cost_type_defs, [query])
+
+
+def execute_cost(schema, first, **kwargs):
+    return extended_graphql_sync(
+        schema,
+        {"query": "{ things(first: %d) { id } }" % first},
+        context_value=RequestFactory().get("/graphql/"),
+        extensions=[QueryCostExtensionSync],
+        **kwargs,
+    )[1]
+
+
+def test_query_cost_throttle(clock):
+    class Throttle(QueryCostThrottle):
+        rate = "10/min"
+
+    schema = make_cost_schema([Throttle])
+
+    result = execute_cost(schema, 6)
+    assert result["data"] == {"things": [{"id": "0"}, {"id": "1"}]}
+    assert result["extensions"]["queryCost"] == {
+        "cost": 6,
+        "budget": 10,
+        "remaining": 4,
+        "resetAfter": 20,
+    }
+
+    # the cost isn't charged once the budget is exhausted
+    result = execute_cost(schema, 5)
+    assert result["data"] == {"things": None}
+    assert result["errors"][0]["extensions"]["code"] == "THROTTLED"
+    assert result["extensions"]["queryCost"]["remaining"] == 4
+
+    result = execute_cost(schema, 4)
+    assert result["extensions"]["queryCost"]["remaining"] == 0
+
+
+def test_query_cost_throttle_validation_rule(clock):
+    class Throttle(QueryCostThrottle):
+        rate = "10/min"
+
+    schema = make_cost_schema()
+    throttle = Throttle()
+
+    result = execute_cost(schema, 8, validation_rules=[throttle])
+    assert result["extensions"]["queryCost"]["remaining"] == 2
+
+    result = execute_cost(schema, 8, validation_rules=[throttle])
+    assert "data" not in result
+    assert result["errors"][0]["extensions"]["retryAfter"] == 20
+    assert result["extensions"]["queryCost"]["remaining"] == 2
+
+
+def test_query_cost_throttle_concurrent_executions(clock):
+    class Throttle(QueryCostThrottle):
+        rate = "100/min"
+
+    # both operations are charged before either finishes executing
+    barrier = Barrier(2, timeout=5)
+
+    def resolve_things(*args, first=None):
+        barrier.wait()
+        return []
+
+    query = QueryType()
+    query.set_field("things", resolve_things)
+    schema = make_executable_schema(cost_type_defs, [query])
+    throttle = Throttle()
+    request = RequestFactory().get("/graphql/")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = list(
+            executor.map(
+                lambda first: extended_graphql_sync(
+                    schema,
+                    {"query": "{ things(first: %d) { id } }" % first},
+                    context_value=request,
+                    validation_rules=[throttle],
+                    extensions=[QueryCostExtensionSync],
+                )[1],
+                [3, 5],
+            )
+        )
+    assert [result["extensions"]["queryCost"]["cost"] for result in results] == [3, 5]
+
+
+def test_query_cost_throttle_correction(clock):
+    class Throttle(QueryCostThrottle):
+        rate = "10/min"
+        correct_cost = True
+
+    schema = make_cost_schema([Throttle])
+
+    # only 2 things were resolved
+    result = execute_cost(schema, 8)
+    assert result["extensions"]["queryCost"]["cost"] == 2
+    assert result["extensions"]["queryCost"]["remaining"] == 8
+    assert execute_cost(schema, 8)["extensions"]["queryCost"]["remaining"] == 6
@@ -0,0 +1,70 @@
+import json
+from unittest.mock import Mock
+
+from ariadne import QueryType, make_executable_schema
+from django.test import RequestFactory
+
+from ariadne_extended.graphql import graphql_sync
+from ariadne_extended.tracing import SampledApolloTracingExtensionSync, sampled_tracing
+from ariadne_extended.views import BatchGraphQLView
+
+type_defs = """
+    type Query {
+        a: String
+        b: String
+        c: String
+    }
+"""
+
+query = QueryType()
+for field in ["a", "b", "c"]:
+    query.set_field(field, lambda *_: "value")
+
+schema = make_executable_schema(type_defs, [query])
+
+
+def execute(extension, **meta):
+    request = RequestFactory().post("/graphql/", **meta)
+    request.user = Mock(is_staff=False)
+    return graphql_sync(
+        schema, {"query": "{ a b c }"}, context_value=request, extensions=[extension]
+    )[1]
+
+
+def test_not_sampled(settings):
+    settings.DEBUG = False
+    result = execute(SampledApolloTracingExtensionSync)
+    assert "extensions" not in result
+    result = execute(SampledApolloTracingExtensionSync, HTTP_X_APOLLO_TRACING="1")
+    assert "extensions" not in result, "Only staff can force tracing"
+
+
+def test_sampled_summary():
+    result = execute(sampled_tracing(sample_rate=1, summary_size=2))
+    tracing = result["extensions"]["tracing"]
+    assert tracing["resolverCount"] == 3
+    assert len(tracing["execution"]["resolvers"]) == 2
+    assert {"path", "fieldName", "duration", "startOffset"} <= set(
+        tracing["execution"]["resolvers"][0]
+    )
+
+
+def test_forced_full(settings):
+    settings.DEBUG = True
+    result = execute(sampled_tracing(summary_size=1), HTTP_X_APOLLO_TRACING="full")
+    resolvers = result["extensions"]["tracing"]["execution"]["resolvers"]
+    assert [resolver["fieldName"] for resolver in resolvers] == ["a", "b", "c"]
+
+
+def test_batch_view_tracing(settings):
+    settings.DEBUG = True
+    view = BatchGraphQLView.as_view(schema=schema, batch=True)
+    request = RequestFactory().post(
+        "/graphql/",
+        data=json.dumps([{"id": 1, "query": "{ a }"}]),
+        content_type="application/json",
+        HTTP_X_APOLLO_TRACING="1",
+    )
+    request.user = Mock(is_authenticated=True)
+    result = json.loads(view(request).content)
+    assert result[0]["extensions"]["tracing"]["resolverCount"] == 1
@@ -0,0 +1,326 @@
+import json
+import threading
+import time
+from collections import defaultdict
+from unittest.mock import Mock
+
+import pytest
+from ariadne import MutationType, QueryType, make_executable_schema
+from django.test import RequestFactory
+
+from ariadne_extended.views import BatchGraphQLView
+
+type_defs = """
+    type Query {
+        hello(name: String): String
+        slow(delay: Float!): String
+        signal(name: String!): String
+        waitFor(name: String!): String
+        counter: Int
+    }
+
+    type Mutation {
+        counter: Int
+    }
+"""
+
+query = QueryType()
+
+
+@query.field("hello")
+def resolve_hello(*_, name=None):
+    return "Hello %s" % (name or "world")
+
+
+@query.field("slow")
+def resolve_slow(*_, delay):
+    time.sleep(delay)
+    return threading.current_thread().name
+
+
+events = defaultdict(threading.Event)
+
+
+@query.field("signal")
+def resolve_signal(*_, name):
+    events[name].set()
+    return threading.current_thread().name
+
+
+@query.field("waitFor")
+def resolve_wait_for(*_, name):
+    # only set by an entry running at the same time
+    if not events[name].wait(timeout=5):
+        raise Exception("%s was never signaled" % name)
+    return threading.current_thread().name
+
+
+mutation = MutationType()
+calls = []
+
+
+@query.field("counter")
+@mutation.field("counter")
+def resolve_counter(*_):
+    calls.append(1)
+    return len(calls)
+
+
+schema = make_executable_schema(type_defs, [query, mutation])
+
+
+def batch_request(entries, **headers):
+    request = RequestFactory().post(
+        "/graphql/", data=json.dumps(entries), content_type="application/json", **headers
+    )
+    request.user = Mock(is_authenticated=True)
+    return request
+
+
+def test_batch_view_serial():
+    view = BatchGraphQLView.as_view(schema=schema, batch=True)
+    response = view(
+        batch_request(
+            [
+                {"id": 1, "query": '{ hello(name: "one") }'},
+                {"id": 2, "query": "{ hello }"},
+            ]
+        )
+    )
+    assert response.status_code == 200
+    assert json.loads(response.content) == [
+        {"data": {"hello": "Hello one"}, "id": 1, "status": 200},
+        {"data": {"hello": "Hello world"}, "id": 2, "status": 200},
+    ]
+
+
+def test_batch_view_concurrent_keeps_order_and_status():
+    view = BatchGraphQLView.as_view(
+        schema=schema, batch=True, concurrent_batch=True, max_batch_workers=3
+    )
+    events.clear()
+    entries = [
+        {"id": 1, "query": '{ waitFor(name: "second") }'},
+        {"id": 2, "query": '{ signal(name: "second") }'},
+        {"id": 3, "query": "{ nope }"},
+        {"id": 4, "query": "{ slow(delay: 0.05) }"},
+    ]
+    response = view(batch_request(entries))
+
+    results = json.loads(response.content)
+    assert [result["id"] for result in results] == [1, 2, 3, 4]
+    assert [result["status"] for result in results] == [200, 200, 400, 200]
+    assert response.status_code == 400
+    # the first entry waited for the second one, which ran on another worker
+    assert results[0]["data"]["waitFor"] != results[1]["data"]["signal"]
+
+
+@pytest.mark.parametrize("workers", [None, 1])
+def test_batch_view_concurrent_without_workers_is_serial(mocker, workers):
+    view = BatchGraphQLView(schema=schema, batch=True, concurrent_batch=True)
+    view.max_batch_workers = workers
+    executor = mocker.patch("ariadne_extended.views.ThreadPoolExecutor")
+    responses = view.get_batch_responses(
+        batch_request([]), [{"id": 1, "query": "{ hello }"}, {"id": 2, "query": "{ hello }"}]
+    )
+    executor.assert_not_called()
+    assert [status for _, status in responses] == [200, 200]
+
+
+def test_batch_view_stream_json_array():
+    view = BatchGraphQLView.as_view(schema=schema, batch=True, stream_batch=True)
+    response = view(
+        batch_request(
+            [
+                {"id": 1, "query": "{ hello }"},
+                {"id": 2, "query": "{ nope }"},
+                {"id": 3, "query": "{ hello }", "variables": "{invalid"},
+            ]
+        )
+    )
+    assert response.streaming
+    assert response.status_code == 200
+    results = json.loads(b"".join(response.streaming_content))
+    assert [(result["id"], result["status"]) for result in results] == [
+        (1, 200),
+        (2, 400),
+        (3, 400),
+    ]
+    assert results[2]["errors"] == [{"message": "Variables are invalid JSON."}]
+
+
+def test_batch_view_stream_ndjson_in_completion_order():
+    view = BatchGraphQLView.as_view(
+        schema=schema,
+        batch=True,
+        stream_batch=True,
+        stream_format="ndjson",
+        concurrent_batch=True,
+    )
+    response = view(
+        batch_request(
+            [
+                {"id": 1, "query": "{ slow(delay: 0.2) }"},
+                {"id": 2, "query": "{ slow(delay: 0) }"},
+            ]
+        )
+    )
+    assert response["Content-Type"] == "application/x-ndjson"
+    lines = b"".join(response.streaming_content).splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [2, 1]
+
+
+@pytest.mark.parametrize("concurrent_batch", [False, True])
+def test_batch_view_deduplicates_queries(concurrent_batch):
+    calls.clear()
+    view = BatchGraphQLView(schema=schema, batch=True, concurrent_batch=concurrent_batch)
+    request = batch_request([])
+    responses = view.get_batch_responses(
+        request,
+        [
+            {"id": 1, "query": "{ counter }"},
+            {"id": 2, "query": "{ counter }", "variables": {}},
+            {"id": 3, "query": "{ counter hello }"},
+            {"id": 4, "query": "mutation { counter }"},
+            {"id": 5, "query": "mutation { counter }"},
+            {"id": 6, "query": "query Q($name: String) { hello(name: $name) }"},
+            {
+                "id": 7,
+                "query": "query Q($name: String) { hello(name: $name) }",
+                "variables": {"name": "a"},
+            },
+            {"id": 8, "query": "{ counter }"},
+        ],
+    )
+    assert [response["id"] for response, _ in responses] == [1, 2, 3, 4, 5, 6, 7, 8]
+    assert responses[0][0]["data"] == responses[1][0]["data"] == responses[7][0]["data"]
+    assert responses[3][0]["data"] != responses[4][0]["data"]
+    assert responses[5][0]["data"] != responses[6][0]["data"]
+    assert len(calls) == 4
+    assert view.saved_executions == 2
+
+
+@pytest.mark.parametrize("concurrent_batch", [False, True])
+def test_batch_view_operation_name(concurrent_batch):
+    view = BatchGraphQLView(schema=schema, batch=True, concurrent_batch=concurrent_batch)
+    document = 'query A { hello(name: "a") } query B { hello(name: "b") }'
+    responses = view.get_batch_responses(
+        batch_request([]),
+        [
+            {"id": 1, "query": document, "operationName": "A"},
+            {"id": 2, "query": document, "operationName": "B"},
+            {"id": 3, "query": document, "operationName": "A"},
+        ],
+    )
+    assert [response for response, _ in responses] == [
+        {"data": {"hello": "Hello a"}, "id": 1, "status": 200},
+        {"data": {"hello": "Hello b"}, "id": 2, "status": 200},
+        {"data": {"hello": "Hello a"}, "id": 3, "status": 200},
+    ]
+    assert view.saved_executions == 1
+
+
+def test_batch_view_deduplication_disabled():
+    calls.clear()
+    view = BatchGraphQLView.as_view(schema=schema, batch=True, deduplicate_batch=False)
+    response = view(
+        batch_request([{"id": 1, "query": "{ counter }"}, {"id": 2, "query": "{ counter }"}])
+    )
+    assert [result["data"]["counter"] for result in json.loads(response.content)] == [1, 2]
+
+
+def test_batch_view_limits():
+    view = BatchGraphQLView.as_view(
+        schema=schema, batch=True, max_body_size=200, max_batch_length=2, max_query_length=20
+    )
+    response = view(batch_request([{"id": i, "query": "{ hello }"} for i in range(10)]))
+    assert response.status_code == 413
+    assert json.loads(response.content)["errors"][0]["message"] == (
+        "Request body exceeds the maximum size of 200 bytes."
+    )
+
+    response = view(batch_request([{"id": i, "query": "{ hello }"} for i in range(3)]))
+    assert response.status_code == 400
+    assert json.loads(response.content)["errors"][0]["message"] == (
+        "Batch requests are limited to 2 entries."
+    )
+
+    response = view(batch_request([{"id": 1, "query": "{ hello hello: hello }"}]))
+    assert response.status_code == 400
+    assert json.loads(response.content)["errors"][0]["message"] == (
+        "Query exceeds the maximum length of 20 characters."
+    )
+
+
+@pytest.mark.parametrize("concurrent_batch", [False, True])
+def test_batch_view_incremental_parsing(concurrent_batch):
+    view = BatchGraphQLView.as_view(
+        schema=schema,
+        batch=True,
+        incremental_parsing=True,
+        parsing_chunk_size=7,
+        concurrent_batch=concurrent_batch,
+    )
+    entries = [{"id": i, "query": '{ hello(name: "%s") }' % i} for i in range(20)]
+    response = view(batch_request(entries))
+    assert response.status_code == 200
+    assert [result["data"]["hello"] for result in json.loads(response.content)] == [
+        "Hello %s" % i for i in range(20)
+    ]
+
+    for body, message in [
+        ("[]", "Received an empty list in the batch request."),
+        ('{"query": "{ hello }"}', "POST body sent invalid JSON. Expected a JSON array."),
+    ]:
+        request = RequestFactory().post("/graphql/", data=body, content_type="application/json")
+        request.user = Mock(is_authenticated=True)
+        response = view(request)
+        assert response.status_code == 400
+        assert json.loads(response.content)["errors"][0]["message"] == message
+
+
+def test_batch_view_incremental_parsing_stream_errors():
+    view = BatchGraphQLView.as_view(
+        schema=schema, batch=True, incremental_parsing=True, stream_batch=True
+    )
+    request = RequestFactory().post(
+        "/graphql/",
+        data='[{"id": 1, "query": "{ hello }"}, {"id": 2',
+        content_type="application/json",
+    )
+    request.user = Mock(is_authenticated=True)
+    results = json.loads(b"".join(view(request).streaming_content))
+    assert [(result["id"], result["status"]) for result in results] == [(1, 200), (None, 400)]
+
+
+@pytest.mark.parametrize("stream_batch", [False, True])
+def test_batch_view_incremental_parsing_limits(stream_batch):
+    calls.clear()
+    view = BatchGraphQLView.as_view(
+        schema=schema,
+        batch=True,
+        incremental_parsing=True,
+        stream_batch=stream_batch,
+        max_batch_length=2,
+    )
+    # rejected before any entry is executed
+    response = view(batch_request([{"id": i, "query": "mutation { counter }"} for i in range(5)]))
+    assert response.status_code == 400
+    assert json.loads(response.content)["errors"][0]["message"] == (
+        "Batch requests are limited to 2 entries."
+    )
+    assert calls == []
+
+    request = RequestFactory().post(
+        "/graphql/",
+        data='[{"id": 1, "query": "mutation { counter }"}, {"id": 2',
+        content_type="application/json",
+    )
+    request.user = Mock(is_authenticated=True)
+    assert view(request).status_code == 400
+    assert calls == []
+
+    response = view(batch_request([{"id": i, "query": "mutation { counter }"} for i in range(2)]))
+    content = b"".join(response.streaming_content) if stream_batch else response.content
+    assert [result["status"] for result in json.loads(content)] == [200, 200]
+    assert len(calls) == 2